@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The hint streaming endpoint (api/hints/<job_id>/stream/) is an async view that
+holds the connection open while relaying Server-Sent Events, so serve the project
+with an ASGI server, e.g. ``uvicorn AiCooding.asgi:application``.
 """
 
 import os
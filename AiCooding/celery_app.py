@@ -1,3 +1,16 @@
+"""
+Celery 应用
+
+按队列分别启动worker，各自设置并发数和预取数（队列划分见 api/task_routing.py）：
+
+    celery -A AiCooding worker -Q hints -c 16 -P threads -n hints@%h        # 提示：I/O密集，线程池高并发
+    celery -A AiCooding worker -Q grading -c 4 -n grading@%h               # 批改：CPU密集，并发数不超过CPU核数
+    celery -A AiCooding worker -Q scraping -c 2 -n scraping@%h             # 爬取：批量任务，低并发
+    celery -A AiCooding worker -Q default -c 2 -n default@%h
+    celery -A AiCooding beat                                               # 定时同步
+
+预取数统一为1（CELERY_WORKER_PREFETCH_MULTIPLIER），需要时可用 --prefetch-multiplier 单独调整。
+"""
 import os
 from celery import Celery
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'api',
@@ -152,6 +154,68 @@ CACHES = {
 CELERY_BROKER_URL = "redis://:redis_2026@127.0.0.1:6379/2"
 CELERY_RESULT_BACKEND = "redis://:redis_2026@127.0.0.1:6379/2"
 
+# 队列路由：交互式提示、作业批改、批量爬取分别使用独立队列（队列说明见 api/task_routing.py）
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_ROUTES = {
+    "api.tasks.call_qwen_max_task": {"queue": "hints"},
+    "api.tasks.grade_homework_task": {"queue": "grading"},
+    "api.tasks.scrape_coordinator_task": {"queue": "scraping"},
+    "api.tasks.scrape_detail_chunk_task": {"queue": "scraping"},
+    "api.tasks.aggregate_scrape_results_task": {"queue": "scraping"},
+    "api.tasks.scheduled_sync_task": {"queue": "scraping"},
+}
+# 优先级：Redis broker 按 0~9 拆分子队列，数字越小越优先
+CELERY_TASK_DEFAULT_PRIORITY = 3
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+    "visibility_timeout": 3 * 3600,  # 应大于最长任务耗时，否则acks_late的任务会被重复投递
+}
+# 每个worker进程只预取一个任务，避免长任务后面排队的任务被“占住”
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# 每个用户在各队列中同时处理的任务数上限，超出后拒绝提交
+CELERY_USER_MAX_INFLIGHT = {
+    "hints": int(os.environ.get("CELERY_USER_MAX_INFLIGHT_HINTS", 3)),
+    "grading": int(os.environ.get("CELERY_USER_MAX_INFLIGHT_GRADING", 5)),
+}
+
+# 定时增量同步LeetCode题目（celery -A AiCooding beat），周期可通过环境变量调整
+SCRAPE_SYNC_INTERVAL_MINUTES = int(os.environ.get("SCRAPE_SYNC_INTERVAL_MINUTES", 360))
+SCRAPE_SYNC_LIMIT = int(os.environ.get("SCRAPE_SYNC_LIMIT", 5000))
+SCRAPE_SYNC_CONCURRENCY = int(os.environ.get("SCRAPE_SYNC_CONCURRENCY", 2))
+SCRAPE_SYNC_RPS = float(os.environ.get("SCRAPE_SYNC_RPS", 1.0))
+# 同步锁的过期时间（秒），应大于一次同步的最长耗时，防止worker崩溃后锁无法释放
+SCRAPE_SYNC_LOCK_TIMEOUT = int(os.environ.get("SCRAPE_SYNC_LOCK_TIMEOUT", 3 * 3600))
+
+# 大模型配置：LLM_BACKEND 为 stub（本地固定回复）或 qwen（通义千问）
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "stub")
+LLM_API_KEY = os.environ.get("DASHSCOPE_API_KEY", "")
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
+LLM_MODEL = os.environ.get("LLM_MODEL", "qwen-max")
+LLM_TIMEOUT = int(os.environ.get("LLM_TIMEOUT", 60))  # 读取超时（秒）
+
+# 提示响应缓存：相同/相近问题直接复用已生成的提示
+HINT_CACHE_TTL = int(os.environ.get("HINT_CACHE_TTL", 7 * 24 * 3600))
+HINT_CACHE_MAX_ENTRIES = int(os.environ.get("HINT_CACHE_MAX_ENTRIES", 20000))
+HINT_CACHE_SEMANTIC = os.environ.get("HINT_CACHE_SEMANTIC", "true").lower() == "true"  # 是否启用近似匹配
+HINT_CACHE_SIMILARITY = float(os.environ.get("HINT_CACHE_SIMILARITY", 0.9))  # 近似匹配的最低余弦相似度
+
+# 作业判题：每个worker进程的预热进程数（单次提交并行执行的用例数）和单个用例的资源限制
+GRADING_POOL_SIZE = int(os.environ.get("GRADING_POOL_SIZE", min(os.cpu_count() or 1, 4)))
+GRADING_TIME_LIMIT = float(os.environ.get("GRADING_TIME_LIMIT", 2.0))  # CPU时间（秒）
+GRADING_MEMORY_LIMIT_MB = int(os.environ.get("GRADING_MEMORY_LIMIT_MB", 256))
+GRADING_SANDBOX_USER = os.environ.get("GRADING_SANDBOX_USER", "nobody")  # worker以root运行时执行学生代码的低权限用户
+GRADING_ISOLATE_NETWORK = os.environ.get("GRADING_ISOLATE_NETWORK", "true").lower() == "true"  # 学生代码无法访问网络
+GRADING_RESULT_CACHE_TIMEOUT = int(os.environ.get("GRADING_RESULT_CACHE_TIMEOUT", 7 * 24 * 3600))  # 重复提交的判题结果缓存时间
+
+CELERY_BEAT_SCHEDULE = {
+    "leetcode-incremental-sync": {
+        "task": "api.tasks.scheduled_sync_task",
+        "schedule": SCRAPE_SYNC_INTERVAL_MINUTES * 60,
+    },
+}
+
 # REST Framework 配置
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
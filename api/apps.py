@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # 注册 problems_synced 等信号的接收器
+        from . import catalog_snapshot, problem_cache, stats  # noqa: F401
@@ -0,0 +1,257 @@
+# api/catalog_snapshot.py
+"""
+题目列表快照
+
+题目只在爬虫同步时变化，同步后把整个题库预先写进Redis，列表接口（无搜索词时）直接从快照分页，
+不访问PostgreSQL：
+- catalog:{version}:rows            Hash，problem_id -> 列表接口输出的JSON
+- catalog:{version}:idx:all         有序集合，成员和分数都是 problem_id
+- catalog:{version}:idx:difficulty:{难度} / idx:premium:{0|1} / idx:tag:{slug}   各筛选条件的有序集合
+- catalog:current                   当前版本号
+新版本全部写完后才切换 catalog:current，旧版本延迟过期，正在读取旧版本的请求不受影响。
+多个筛选条件同时使用时，用 ZINTERSTORE 求交集并短暂缓存。
+快照不存在或Redis不可用时返回None，由调用方回退到数据库查询。
+后台单独修改、删除题目或调整标签后，事务提交时重新生成快照；生成失败则删除版本指针，
+列表接口回退到数据库，不会继续返回旧数据。
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .fast_serializers import LIST_VALUE_FIELDS, serialize_problem_list
+from .models import LeetCodeProblem
+from .pagination import decode_cursor, encode_cursor, parse_page, parse_page_size
+from .signals import problems_synced
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PREFIX = 'catalog'
+CATALOG_CURRENT_KEY = f'{CATALOG_PREFIX}:current'
+OLD_VERSION_TIMEOUT = 300  # 切换版本后旧快照保留的时间（秒）
+INTERSECTION_TIMEOUT = 300  # 多条件交集的缓存时间（秒）
+BUILD_CHUNK_SIZE = 1000
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _version_key(version: str, suffix: str) -> str:
+    return f'{CATALOG_PREFIX}:{version}:{suffix}'
+
+
+def _delete_version(redis, version: str):
+    keys = list(redis.scan_iter(match=_version_key(version, '*'), count=1000))
+    if keys:
+        redis.delete(*keys)
+
+
+def build_catalog_snapshot() -> str:
+    """从数据库生成新版本的快照并切换为当前版本，返回版本号"""
+    redis = _redis()
+    version = str(int(time.time() * 1000))
+    try:
+        count, index_count = _write_snapshot(redis, version)
+    except Exception:
+        _delete_version(redis, version)  # 清理写了一半的新版本，当前版本不受影响
+        raise
+
+    # 所有数据写完后再切换版本指针（空题库时索引键不存在，按空集合处理）
+    old_version = redis.getset(CATALOG_CURRENT_KEY, version)
+    if old_version:
+        pipe = redis.pipeline(transaction=False)
+        for key in redis.scan_iter(match=_version_key(_decode(old_version), '*'), count=1000):
+            pipe.expire(key, OLD_VERSION_TIMEOUT)
+        pipe.execute()
+
+    logger.info(f"题目列表快照已更新: 版本 {version}，{count} 道题目，{index_count} 个索引")
+    return version
+
+
+def _write_snapshot(redis, version: str) -> Tuple[int, int]:
+    """写入一个版本的行数据和索引，返回 (题目数, 索引数)"""
+    rows_key = _version_key(version, 'rows')
+
+    indexes: Dict[str, Dict[str, int]] = {}
+
+    def add_to_index(name: str, problem_id: int):
+        indexes.setdefault(_version_key(version, f'idx:{name}'), {})[str(problem_id)] = problem_id
+
+    count = 0
+    pipe = redis.pipeline(transaction=False)
+    queryset = LeetCodeProblem.objects.order_by('problem_id').values(*LIST_VALUE_FIELDS)
+    for row in queryset.iterator(chunk_size=BUILD_CHUNK_SIZE):
+        item = serialize_problem_list([row])[0]
+        problem_id = row['problem_id']
+        pipe.hset(rows_key, problem_id, json.dumps(item, ensure_ascii=False))
+        add_to_index('all', problem_id)
+        add_to_index(f"difficulty:{row['difficulty']}", problem_id)
+        add_to_index(f"premium:{int(row['is_premium'])}", problem_id)
+        count += 1
+        if count % BUILD_CHUNK_SIZE == 0:
+            pipe.execute()
+    pipe.execute()
+
+    # 标签索引与接口的 tag 筛选一致，基于题目-标签关联表
+    Through = LeetCodeProblem.problem_tags.through
+    for problem_id, slug in Through.objects.values_list(
+        'leetcodeproblem__problem_id', 'problemtag__slug'
+    ).iterator(chunk_size=BUILD_CHUNK_SIZE):
+        add_to_index(f'tag:{slug}', problem_id)
+
+    for key, members in indexes.items():
+        items = list(members.items())
+        for i in range(0, len(items), BUILD_CHUNK_SIZE):
+            pipe.zadd(key, dict(items[i:i + BUILD_CHUNK_SIZE]))
+        pipe.execute()
+    return count, len(indexes)
+
+
+def _filter_index(redis, version: str, difficulty, is_premium, tag) -> str:
+    """返回筛选条件对应的有序集合键（多个条件时生成交集）"""
+    names = []
+    if difficulty:
+        names.append(f'difficulty:{difficulty}')
+    if is_premium is not None:
+        names.append(f"premium:{int(is_premium.lower() == 'true')}")
+    if tag:
+        names.append(f'tag:{tag}')
+    if not names:
+        return _version_key(version, 'idx:all')
+    if len(names) == 1:
+        return _version_key(version, f'idx:{names[0]}')
+
+    digest = hashlib.sha1('|'.join(names).encode('utf-8')).hexdigest()[:16]
+    key = _version_key(version, f'q:{digest}')
+    if not redis.exists(key):
+        pipe = redis.pipeline()
+        pipe.zinterstore(key, [_version_key(version, f'idx:{name}') for name in names], aggregate='MIN')
+        pipe.expire(key, INTERSECTION_TIMEOUT)
+        pipe.execute()
+    return key
+
+
+def _load_rows(redis, version: str, ids, fields: Optional[Sequence[str]]) -> List[Dict]:
+    if not ids:
+        return []
+    rows = [json.loads(raw) for raw in redis.hmget(_version_key(version, 'rows'), ids) if raw is not None]
+    if fields is not None:
+        rows = [{name: row[name] for name in fields} for row in rows]
+    return rows
+
+
+def query_catalog_snapshot(params, difficulty=None, is_premium=None, tag=None,
+                           fields: Optional[Sequence[str]] = None,
+                           cursor_mode: bool = False) -> Optional[Tuple[List[Dict], Dict]]:
+    """
+    从快照中读取一页题目，返回值与 paginate_offset / paginate_keyset 相同：(题目列表, 分页信息)
+    快照不可用时返回None
+    :param params: 请求参数（page / page_size / cursor）
+    :param fields: 只输出的字段，None表示全部字段
+    :raises PaginationError: 游标非法
+    """
+    page_size = parse_page_size(params)
+    cursor = params.get('cursor') if cursor_mode else None
+    key, direction = decode_cursor(cursor) if cursor else (None, 'n')
+
+    try:
+        redis = _redis()
+        version = redis.get(CATALOG_CURRENT_KEY)
+        if version is None:
+            return None
+        version = _decode(version)
+        index_key = _filter_index(redis, version, difficulty, is_premium, tag)
+
+        if not cursor_mode:
+            page = parse_page(params)
+            start = (page - 1) * page_size
+            pipe = redis.pipeline()
+            pipe.zcard(index_key)
+            pipe.zrange(index_key, start, start + page_size - 1)
+            total_count, ids = pipe.execute()
+            items = _load_rows(redis, version, ids, fields)
+            return items, {
+                'current_page': page,
+                'page_size': page_size,
+                'total_count': total_count,
+                'total_pages': (total_count + page_size - 1) // page_size
+            }
+
+        # 游标分页：分数即 problem_id，按分数区间取数据，多取一条判断是否还有更多
+        if direction == 'n':
+            low = '-inf' if key is None else f'({key}'
+            ids = redis.zrangebyscore(index_key, low, '+inf', start=0, num=page_size + 1)
+        else:
+            ids = redis.zrevrangebyscore(index_key, f'({key}', '-inf', start=0, num=page_size + 1)
+        has_more = len(ids) > page_size
+        ids = [int(_decode(problem_id)) for problem_id in ids[:page_size]]
+        if direction == 'p':
+            ids.reverse()
+        items = _load_rows(redis, version, ids, fields)
+    except Exception as e:
+        logger.warning(f"读取题目列表快照失败: {e}")
+        return None
+
+    next_cursor = prev_cursor = None
+    if ids:
+        if direction == 'n':
+            has_next, has_prev = has_more, key is not None
+        else:
+            has_next, has_prev = True, has_more
+        if has_next:
+            next_cursor = encode_cursor(ids[-1], 'n')
+        if has_prev:
+            prev_cursor = encode_cursor(ids[0], 'p')
+
+    return items, {
+        'page_size': page_size,
+        'next': next_cursor,
+        'prev': prev_cursor
+    }
+
+
+@receiver(problems_synced)
+def rebuild_snapshot_on_sync(sender, **kwargs):
+    """爬虫写入题目后重新生成快照"""
+    try:
+        build_catalog_snapshot()
+    except Exception as e:
+        logger.error(f"生成题目列表快照失败: {e}")
+
+
+def _rebuild_or_invalidate():
+    try:
+        build_catalog_snapshot()
+    except Exception as e:
+        logger.error(f"重新生成题目列表快照失败，停用当前快照: {e}")
+        try:
+            _redis().delete(CATALOG_CURRENT_KEY)
+        except Exception as delete_error:
+            logger.error(f"停用题目列表快照失败: {delete_error}")
+
+
+@receiver(post_save, sender=LeetCodeProblem)
+@receiver(post_delete, sender=LeetCodeProblem)
+def rebuild_snapshot_on_change(sender, instance, **kwargs):
+    """单独修改或删除题目（如后台编辑）后，在事务提交时重新生成快照"""
+    transaction.on_commit(_rebuild_or_invalidate)
+
+
+@receiver(m2m_changed, sender=LeetCodeProblem.problem_tags.through)
+def rebuild_snapshot_on_tags_change(sender, action, **kwargs):
+    """题目标签变化会影响标签索引"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(_rebuild_or_invalidate)
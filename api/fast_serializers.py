@@ -0,0 +1,161 @@
+# api/fast_serializers.py
+"""
+题目列表/详情的快速序列化
+
+ModelSerializer 每行要为每个字段走一遍字段对象（get_difficulty_display、url 属性等），
+列表页500行时这部分开销占主导。这里直接用 .values() 读取需要的列，
+按与 LeetCodeProblemListSerializer / LeetCodeProblemSerializer 相同的字段顺序和格式拼出字典：
+- 难度显示名用预先生成的映射表
+- url 由 title_slug 拼接（与 LeetCodeProblem.url 一致）
+- 时间字段按 DRF DateTimeField 的规则输出（时区转换 + ISO 8601，UTC 以 Z 结尾）
+
+列表接口支持 fields= 参数只返回部分字段，查询时也只读取这些字段依赖的列。
+"""
+
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+
+from .models import LeetCodeProblem
+
+DIFFICULTY_DISPLAY = dict(LeetCodeProblem.DIFFICULTY_CHOICES)
+PROBLEM_URL_TEMPLATE = 'https://leetcode.cn/problems/{}/'
+
+# 与 LeetCodeProblemListSerializer.Meta.fields 对应（去掉计算字段）
+LIST_VALUE_FIELDS = (
+    'id', 'problem_id', 'title', 'title_slug', 'difficulty', 'is_premium', 'acceptance_rate', 'tags',
+)
+# 与 LeetCodeProblemSerializer.Meta.fields 对应（去掉计算字段）
+DETAIL_VALUE_FIELDS = (
+    'id', 'problem_id', 'title', 'title_slug', 'difficulty', 'is_premium', 'content',
+    'acceptance_rate', 'submission_count', 'accepted_count', 'tags', 'created_at', 'updated_at',
+)
+
+
+# 列表接口可选的输出字段 -> 依赖的数据库列
+LIST_FIELD_SOURCES = {
+    'id': ('id',),
+    'problem_id': ('problem_id',),
+    'title': ('title',),
+    'title_slug': ('title_slug',),
+    'difficulty': ('difficulty',),
+    'difficulty_display': ('difficulty',),
+    'is_premium': ('is_premium',),
+    'acceptance_rate': ('acceptance_rate',),
+    'tags': ('tags',),
+    'url': ('title_slug',),
+}
+LIST_FIELD_GETTERS = {
+    'id': lambda row: row['id'],
+    'problem_id': lambda row: row['problem_id'],
+    'title': lambda row: row['title'],
+    'title_slug': lambda row: row['title_slug'],
+    'difficulty': lambda row: row['difficulty'],
+    'difficulty_display': lambda row: DIFFICULTY_DISPLAY.get(row['difficulty'], row['difficulty']),
+    'is_premium': lambda row: row['is_premium'],
+    'acceptance_rate': lambda row: float(row['acceptance_rate']),
+    'tags': lambda row: row['tags'],
+    'url': lambda row: PROBLEM_URL_TEMPLATE.format(row['title_slug']),
+}
+
+
+class FieldSelectionError(ValueError):
+    """fields 参数中包含不支持的字段"""
+
+
+def parse_list_fields(value: Optional[str]) -> Optional[List[str]]:
+    """
+    解析列表接口的 fields 参数（逗号分隔），未指定时返回None表示全部字段
+    输出顺序与默认输出一致，与参数中的顺序无关
+    """
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(LIST_FIELD_SOURCES)
+    if unknown:
+        raise FieldSelectionError(f"不支持的字段: {', '.join(sorted(unknown))}")
+    return [name for name in LIST_FIELD_SOURCES if name in requested] or None
+
+
+def list_value_fields(fields: Optional[Sequence[str]], key_field: str = 'problem_id') -> tuple:
+    """
+    输出字段对应的数据库列（始终包含分页键）
+    :param fields: parse_list_fields 的结果，None表示全部字段
+    """
+    if fields is None:
+        return LIST_VALUE_FIELDS
+    columns = {key_field}
+    for name in fields:
+        columns.update(LIST_FIELD_SOURCES[name])
+    return tuple(column for column in LIST_VALUE_FIELDS if column in columns)
+
+
+def format_datetime(value):
+    """与 DRF DateTimeField.to_representation 相同的时间格式"""
+    if not value:
+        return None
+    output_format = api_settings.DATETIME_FORMAT
+    if output_format is None or isinstance(value, str):
+        return value
+    if settings.USE_TZ:
+        value = value.astimezone(timezone.get_current_timezone())
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    if output_format.lower() == ISO_8601:
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return value.strftime(output_format)
+
+
+def serialize_problem_list(rows: Iterable[Dict], fields: Optional[Sequence[str]] = None) -> List[Dict]:
+    """
+    把 .values(*list_value_fields(fields)) 的结果转换为列表接口的输出
+    :param fields: 只输出的字段，None表示全部字段
+    """
+    if fields is not None:
+        getters = [(name, LIST_FIELD_GETTERS[name]) for name in fields]
+        return [{name: getter(row) for name, getter in getters} for row in rows]
+
+    display = DIFFICULTY_DISPLAY
+    return [
+        {
+            'id': row['id'],
+            'problem_id': row['problem_id'],
+            'title': row['title'],
+            'title_slug': row['title_slug'],
+            'difficulty': row['difficulty'],
+            'difficulty_display': display.get(row['difficulty'], row['difficulty']),
+            'is_premium': row['is_premium'],
+            'acceptance_rate': float(row['acceptance_rate']),
+            'tags': row['tags'],
+            'url': PROBLEM_URL_TEMPLATE.format(row['title_slug']),
+        }
+        for row in rows
+    ]
+
+
+def serialize_problem_detail(row: Dict) -> Dict:
+    """把 .values(*DETAIL_VALUE_FIELDS) 的一行转换为详情接口的输出"""
+    return {
+        'id': row['id'],
+        'problem_id': row['problem_id'],
+        'title': row['title'],
+        'title_slug': row['title_slug'],
+        'difficulty': row['difficulty'],
+        'difficulty_display': DIFFICULTY_DISPLAY.get(row['difficulty'], row['difficulty']),
+        'is_premium': row['is_premium'],
+        'content': row['content'],
+        'acceptance_rate': float(row['acceptance_rate']),
+        'submission_count': row['submission_count'],
+        'accepted_count': row['accepted_count'],
+        'tags': row['tags'],
+        'url': PROBLEM_URL_TEMPLATE.format(row['title_slug']),
+        'created_at': format_datetime(row['created_at']),
+        'updated_at': format_datetime(row['updated_at']),
+    }
@@ -0,0 +1,324 @@
+# api/grading.py
+"""
+作业判题引擎
+
+- 每个worker进程维护一个预热进程池（api/grading_worker.py），进程常驻，避免每次提交都启动解释器
+- 一次提交的测试用例分成若干份，由线程并行交给不同的预热进程执行
+- 预热进程为每个测试用例fork子进程，设置CPU/内存/时间限制（详见 grading_worker.py）
+- 隔离：预热进程只带 PATH/LANG 启动（不继承worker中的API密钥、数据库/Redis配置），
+  子进程清空环境变量、进入独立的网络命名空间，root运行时切换到 GRADING_SANDBOX_USER；
+  无法保证隔离时拒绝判题（system_error），不会在没有隔离的情况下执行学生代码
+- 结果按用例汇总为结构化反馈：通过数、得分、每个用例的状态/耗时/内存
+- 判题结果按 (测试用例内容哈希, 归一化代码哈希, 时间/内存限制) 缓存，重复提交相同代码时直接返回；
+  测试用例或资源限制修改后键随之变化，旧结果自然失效。超时、内存超限受机器负载影响，这类结果不缓存
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import pwd
+import queue
+import selectors
+import subprocess
+import sys
+import threading
+import tokenize
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).resolve().parent / 'grading_worker.py'
+# 预热进程的全部环境变量
+WORKER_ENV = {'PATH': '/usr/local/bin:/usr/bin:/bin', 'LANG': 'C.UTF-8'}
+GRADING_RESULT_CACHE_PREFIX = 'grading:result'
+# 含这些状态的结果不缓存：判题系统错误，以及受机器负载影响、重新判题可能不同的超时/内存超限
+UNCACHEABLE_STATUSES = {'system_error', 'timeout', 'memory_limit'}
+
+STATUS_MESSAGES = {
+    'passed': '通过',
+    'wrong_answer': '答案错误',
+    'runtime_error': '运行错误',
+    'timeout': '运行超时',
+    'memory_limit': '内存超限',
+    'system_error': '判题系统错误',
+}
+
+# 未通过时按失败类型给出的引导建议（不直接给出答案）
+GUIDE_MESSAGES = {
+    'wrong_answer': '对照未通过用例的输入手动推演一遍，重点检查边界条件（空输入、单个元素、重复值）',
+    'runtime_error': '根据错误信息定位出错的行，检查下标越界、空值和类型转换',
+    'timeout': '估算算法的时间复杂度，考虑用哈希表、双指针或二分等方法降低复杂度',
+    'memory_limit': '检查是否保存了不必要的中间结果，或递归层数过深',
+}
+
+
+class GradingError(Exception):
+    """判题进程异常（启动失败、无响应等）"""
+
+
+def sandbox_args(sandbox_user: Optional[str], isolate_network: bool = True) -> List[str]:
+    """
+    预热进程的隔离参数
+    :param sandbox_user: 以root运行时执行学生代码的低权限用户
+    :raises GradingError: 以root运行但没有可用的低权限用户
+    """
+    args = []
+    if os.geteuid() == 0:
+        if not sandbox_user:
+            raise GradingError('以root运行判题时必须配置 GRADING_SANDBOX_USER')
+        try:
+            user = pwd.getpwnam(sandbox_user)
+        except KeyError:
+            raise GradingError(f'判题用户不存在: {sandbox_user}')
+        if user.pw_uid == 0:
+            raise GradingError('GRADING_SANDBOX_USER 不能是root')
+        args += ['--uid', str(user.pw_uid), '--gid', str(user.pw_gid)]
+    if not isolate_network:
+        args.append('--no-network-isolation')
+    return args
+
+
+class ZygoteProcess:
+    """一个常驻的判题预热进程"""
+
+    def __init__(self, sandbox: List[str]):
+        """:param sandbox: sandbox_args 生成的隔离参数"""
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', str(WORKER_SCRIPT), *sandbox],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', bufsize=1, env=WORKER_ENV, cwd='/'
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, code: str, cases: List[Dict], limits: Dict, timeout: float) -> List[Dict]:
+        """
+        执行一组测试用例
+        :param timeout: 整组用例的最长等待时间，超时后结束预热进程
+        """
+        try:
+            self.process.stdin.write(json.dumps({'code': code, 'cases': cases, 'limits': limits}) + '\n')
+            self.process.stdin.flush()
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.process.stdout, selectors.EVENT_READ)
+                if not selector.select(timeout):
+                    raise GradingError('判题进程无响应')
+            line = self.process.stdout.readline()
+        except (OSError, ValueError) as e:
+            self.close()
+            raise GradingError(f'判题进程通信失败: {e}') from e
+        except GradingError:
+            self.close()
+            raise
+
+        if not line:
+            self.close()
+            raise GradingError('判题进程已退出')
+        response = json.loads(line)
+        if 'error' in response:
+            raise GradingError(response['error'])
+        return response['results']
+
+    def close(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+
+
+class GradingPool:
+    """判题预热进程池"""
+
+    def __init__(self, size: int, time_limit: float, memory_limit_mb: int,
+                 sandbox_user: Optional[str] = 'nobody', isolate_network: bool = True):
+        """
+        :param size: 预热进程数，即单次提交内最多并行执行的用例数
+        :param time_limit: 单个用例的CPU时间上限（秒）
+        :param memory_limit_mb: 单个用例的内存上限（MB）
+        :param sandbox_user: 以root运行时执行学生代码的低权限用户
+        :param isolate_network: 是否为学生代码隔离网络
+        """
+        self.size = size
+        self.limits = {'time_limit': time_limit, 'memory_limit_mb': memory_limit_mb}
+        self.sandbox_user = sandbox_user
+        self.isolate_network = isolate_network
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)  # 延迟启动，首次使用时创建
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix='grading')
+
+    def _run_chunk(self, code: str, cases: List[Dict]) -> List[Dict]:
+        zygote = self._idle.get()
+        try:
+            if zygote is None or not zygote.alive:
+                zygote = ZygoteProcess(sandbox_args(self.sandbox_user, self.isolate_network))
+            timeout = len(cases) * (self.limits['time_limit'] * 2 + 1) + 5
+            return zygote.run(code, cases, self.limits, timeout)
+        except (GradingError, OSError) as e:
+            logger.error(f"判题失败: {e}")
+            zygote = None
+            return [{'id': case['id'], 'status': 'system_error', 'error': str(e)} for case in cases]
+        finally:
+            self._idle.put(zygote if zygote is not None and zygote.alive else None)
+
+    def run(self, code: str, cases: List[Dict]) -> List[Dict]:
+        """并行执行全部测试用例，按输入顺序返回结果"""
+        if not cases:
+            return []
+        chunk_count = min(self.size, len(cases))
+        chunks = [cases[i::chunk_count] for i in range(chunk_count)]
+        results = {}
+        for chunk_results in self._executor.map(lambda chunk: self._run_chunk(code, chunk), chunks):
+            for result in chunk_results:
+                results[result['id']] = result
+        return [results[case['id']] for case in cases]
+
+    def close(self):
+        while not self._idle.empty():
+            zygote = self._idle.get_nowait()
+            if zygote is not None:
+                zygote.close()
+        self._executor.shutdown(wait=False)
+
+
+_pool: Optional[GradingPool] = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_grading_pool() -> GradingPool:
+    """获取当前进程的判题进程池（Celery prefork 子进程中首次调用时创建）"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = GradingPool(
+                size=settings.GRADING_POOL_SIZE,
+                time_limit=settings.GRADING_TIME_LIMIT,
+                memory_limit_mb=settings.GRADING_MEMORY_LIMIT_MB,
+                sandbox_user=settings.GRADING_SANDBOX_USER,
+                isolate_network=settings.GRADING_ISOLATE_NETWORK
+            )
+            _pool_pid = os.getpid()
+    return _pool
+
+
+def _normalize(value):
+    """统一JSON表示（元组转列表等），用于比较答案"""
+    return json.loads(json.dumps(value, default=repr))
+
+
+def build_feedback(test_cases, results: List[Dict]) -> Dict:
+    """
+    汇总判题结果
+    :param test_cases: ProblemTestCase 列表（与results顺序一致）
+    """
+    cases = []
+    for test_case, result in zip(test_cases, results):
+        status = result.get('status')
+        if status == 'ok':
+            status = 'passed' if _normalize(result.get('result')) == _normalize(test_case.expected) else 'wrong_answer'
+        item = {
+            'case_id': test_case.id,
+            'status': status,
+            'status_display': STATUS_MESSAGES.get(status, status),
+            'time_ms': result.get('time_ms'),
+            'memory_kb': result.get('memory_kb'),
+        }
+        if status != 'passed' and result.get('error'):
+            item['error'] = result['error']
+        if not test_case.is_hidden:
+            item.update(input=test_case.args, expected=test_case.expected,
+                        output=result.get('result'), stdout=result.get('stdout', ''))
+        cases.append(item)
+
+    total = len(cases)
+    passed = sum(1 for item in cases if item['status'] == 'passed')
+    failed_statuses = {item['status'] for item in cases if item['status'] != 'passed'}
+    if not total:
+        analysis = '该题目暂无测试用例'
+    elif passed == total:
+        analysis = '全部测试用例通过'
+    else:
+        analysis = f"{total - passed} 个测试用例未通过：" + '、'.join(
+            STATUS_MESSAGES.get(status, status) for status in sorted(failed_statuses)
+        )
+
+    return {
+        'score': round(passed * 100 / total) if total else 0,
+        'passed': passed,
+        'total': total,
+        'error_analysis': analysis,
+        'guide': '；'.join(GUIDE_MESSAGES[status] for status in sorted(failed_statuses) if status in GUIDE_MESSAGES),
+        'cases': cases,
+    }
+
+
+def test_suite_hash(test_cases) -> str:
+    """测试用例内容的哈希（入口、参数、期望值、是否隐藏），用作题目测试集的版本号"""
+    suite = [
+        [test_case.id, test_case.entry_point, test_case.args, test_case.expected, test_case.is_hidden]
+        for test_case in test_cases
+    ]
+    raw = json.dumps(suite, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def code_hash(code: str) -> str:
+    """
+    归一化代码的哈希：忽略注释、空行和行尾空白
+    按Python词法切分后比较，字符串中的 # 等内容不受影响；无法切分时退化为按行去除空白
+    """
+    try:
+        tokens = [
+            [token.type, token.string]
+            for token in tokenize.generate_tokens(io.StringIO(code).readline)
+            if token.type not in (tokenize.COMMENT, tokenize.NL)
+        ]
+        raw = json.dumps(tokens, ensure_ascii=False)
+    except (tokenize.TokenError, SyntaxError):
+        raw = '\n'.join(line.rstrip() for line in code.splitlines() if line.strip())
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def grade_submission(code: str, test_cases) -> Dict:
+    """
+    用题目的测试用例判定学生代码，相同测试集下的相同代码直接返回缓存结果
+    :param test_cases: ProblemTestCase 列表
+    :return: 结构化反馈（见 build_feedback），命中缓存时 cached 为True
+    """
+    test_cases = list(test_cases)
+    pool = get_grading_pool()
+    cache_key = None
+    if test_cases:
+        limits = pool.limits
+        cache_key = (f"{GRADING_RESULT_CACHE_PREFIX}:{test_suite_hash(test_cases)}:{code_hash(code)}:"
+                     f"{limits['time_limit']}:{limits['memory_limit_mb']}")
+        try:
+            feedback = cache.get(cache_key)
+        except Exception as e:
+            logger.warning(f"读取判题缓存失败: {e}")
+            feedback = None
+        if feedback is not None:
+            return dict(feedback, cached=True)
+
+    cases = [
+        {'id': test_case.id, 'entry_point': test_case.entry_point, 'args': test_case.args}
+        for test_case in test_cases
+    ]
+    results = pool.run(code, cases)
+    feedback = build_feedback(test_cases, results)
+
+    if cache_key and not any(item['status'] in UNCACHEABLE_STATUSES for item in feedback['cases']):
+        try:
+            cache.set(cache_key, feedback, settings.GRADING_RESULT_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"写入判题缓存失败: {e}")
+    return dict(feedback, cached=False)
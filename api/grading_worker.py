@@ -0,0 +1,244 @@
+# api/grading_worker.py
+"""
+判题预热进程（zygote）
+
+由 api/grading.py 以独立解释器启动并长期驻留，避免每次提交都重新启动Python。
+通过stdin/stdout按行交换JSON：
+
+    输入  {"code": "...", "cases": [{"id", "entry_point", "args"}, ...], "limits": {...}}
+    输出  {"results": [{"id", "status", "result", "stdout", "error", "time_ms", "memory_kb"}, ...]}
+
+每个测试用例fork一个子进程执行，子进程中：
+- 清空环境变量（预热进程本身也只以 PATH/LANG 启动，不继承worker的密钥等配置）
+- 进入新的网络命名空间（unshare CLONE_NEWNET，只有未启用的回环网卡），无法访问网络
+- 以root运行时切换到低权限用户（--uid/--gid），不能读取项目目录等只对部署用户开放的文件
+- 设置资源限制：CPU时间（RLIMIT_CPU）、虚拟内存（RLIMIT_AS）、文件写入（RLIMIT_FSIZE=0）、打开文件数、进程数
+- 新的会话、独立的临时工作目录、标准输入输出重定向到 /dev/null
+任一隔离步骤失败时不执行学生代码，返回 system_error；以root运行却没有指定低权限用户时拒绝判题。
+父进程另外按墙钟时间超时强制结束子进程。
+
+本文件不依赖Django，以 python -I 启动：
+    python -I grading_worker.py [--uid UID --gid GID] [--no-network-isolation]
+"""
+
+import argparse
+import ctypes
+import io
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+MAX_RESULT_BYTES = 1024 * 1024
+MAX_STDOUT_CHARS = 4096
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+
+class SandboxError(Exception):
+    """无法建立隔离环境"""
+
+
+def _unshare(flags):
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.unshare(flags) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+
+
+def _isolate_network():
+    """进入新的网络命名空间；非root时借助用户命名空间获得权限"""
+    flags = CLONE_NEWNET if os.geteuid() == 0 else CLONE_NEWUSER | CLONE_NEWNET
+    try:
+        _unshare(flags)
+    except OSError as e:
+        raise SandboxError(f'无法隔离网络: {e}')
+
+
+def _drop_privileges(uid, gid):
+    """root运行时切换到低权限用户（先切换组，再切换用户，之后无法再切回root）"""
+    if os.geteuid() != 0:
+        return
+    if uid is None or uid == 0:
+        raise SandboxError('以root运行时必须指定低权限用户')
+    try:
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    except OSError as e:
+        raise SandboxError(f'无法切换到低权限用户: {e}')
+    if os.geteuid() == 0 or os.getuid() == 0:
+        raise SandboxError('切换低权限用户失败')
+
+
+def _enter_sandbox(sandbox, workdir):
+    os.environ.clear()
+    if sandbox['isolate_network']:
+        _isolate_network()
+    if os.geteuid() == 0 and sandbox['uid'] is not None:
+        os.chown(workdir, sandbox['uid'], sandbox['gid'])
+    _drop_privileges(sandbox['uid'], sandbox['gid'])
+
+
+def _set_limits(limits):
+    cpu_seconds = max(1, int(limits['time_limit'] + 0.999))
+    memory_bytes = limits['memory_limit_mb'] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (16, 16))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))  # 禁止再创建子进程（root用户下无效）
+    signal.signal(signal.SIGXFSZ, signal.SIG_IGN)  # 写文件超限时抛出OSError而不是直接结束进程
+
+
+def _resolve_entry(namespace, entry_point):
+    """entry_point 为 'Solution.twoSum'（实例方法）或 'solve'（函数）"""
+    name, _, method_name = entry_point.partition('.')
+    if name not in namespace:
+        raise NameError(f"未找到 {name}，请检查类名/函数名是否与题目要求一致")
+    if method_name:
+        return getattr(namespace[name](), method_name)
+    return namespace[name]
+
+
+def _run_child(code, case, limits, sandbox, write_fd, workdir):
+    """子进程：进入隔离环境、设置限制后执行学生代码，把结果写入管道"""
+    os.setsid()
+    os.chdir(workdir)
+    try:
+        _enter_sandbox(sandbox, workdir)
+    except (SandboxError, OSError) as e:
+        os.write(write_fd, json.dumps({'status': 'system_error', 'error': str(e)}).encode('utf-8'))
+        return
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    _set_limits(limits)
+
+    captured = io.StringIO()
+    sys.stdout = sys.stderr = captured
+    try:
+        namespace = {'__name__': '__solution__'}
+        exec(compile(code, '<submission>', 'exec'), namespace)
+        result = _resolve_entry(namespace, case['entry_point'])(*case['args'])
+        payload = {'status': 'ok', 'result': result}
+    except MemoryError:
+        payload = {'status': 'memory_limit', 'error': '内存超限'}
+    except RecursionError:
+        payload = {'status': 'runtime_error', 'error': '递归深度超限'}
+    except BaseException:
+        lines = traceback.format_exc().strip().splitlines()
+        payload = {'status': 'runtime_error', 'error': '\n'.join(lines[-3:])}
+
+    payload['stdout'] = captured.getvalue()[:MAX_STDOUT_CHARS]
+    try:
+        data = json.dumps(payload, ensure_ascii=False, default=repr)
+    except (TypeError, ValueError):
+        data = json.dumps({'status': 'runtime_error', 'error': '返回值无法序列化'})
+    os.write(write_fd, data.encode('utf-8')[:MAX_RESULT_BYTES])
+
+
+def run_case(code, case, limits, sandbox):
+    """
+    fork子进程执行一个测试用例，返回结果字典
+    :param sandbox: {'uid', 'gid', 'isolate_network'}
+    """
+    read_fd, write_fd = os.pipe()
+    workdir = tempfile.mkdtemp(prefix='grade_')
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            _run_child(code, case, limits, sandbox, write_fd, workdir)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    chunks, size, timed_out = [], 0, False
+    deadline = started + limits['time_limit'] * 2 + 0.5  # 墙钟时间上限（sleep等不占CPU的情况）
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        ready, _, _ = select.select([read_fd], [], [], remaining)
+        if not ready:
+            continue
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size <= MAX_RESULT_BYTES:
+            chunks.append(chunk)
+
+    if timed_out:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            os.kill(pid, signal.SIGKILL)
+    _, wait_status, usage = os.wait4(pid, 0)
+    os.close(read_fd)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+    result = {
+        'id': case['id'],
+        'time_ms': int((usage.ru_utime + usage.ru_stime) * 1000) or elapsed_ms,
+        'memory_kb': usage.ru_maxrss,
+    }
+    if timed_out or (os.WIFSIGNALED(wait_status) and os.WTERMSIG(wait_status) in (signal.SIGXCPU, signal.SIGKILL)):
+        result.update(status='timeout', error='运行超时')
+        return result
+    try:
+        result.update(json.loads(b''.join(chunks).decode('utf-8')))
+    except (UnicodeDecodeError, ValueError):
+        result.update(status='runtime_error', error='进程异常退出（可能超出内存限制）')
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='判题预热进程')
+    parser.add_argument('--uid', type=int, default=None, help='执行学生代码的低权限用户ID（以root运行时必填）')
+    parser.add_argument('--gid', type=int, default=None, help='执行学生代码的低权限组ID')
+    parser.add_argument('--no-network-isolation', action='store_true',
+                        help='不隔离网络（仅用于已经没有网络的容器）')
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    # 以root运行却没有低权限用户时拒绝执行任何代码
+    refusal = '以root运行时必须通过 --uid 指定低权限用户' if os.geteuid() == 0 and not args.uid else None
+    sandbox = {
+        'uid': args.uid,
+        'gid': args.gid if args.gid is not None else args.uid,
+        'isolate_network': not args.no_network_isolation,
+    }
+
+    # 预先导入学生代码常用的标准库，fork后的子进程直接复用
+    import bisect, collections, functools, heapq, itertools, math, re, string  # noqa: F401
+
+    for line in sys.stdin:
+        try:
+            if refusal:
+                raise SandboxError(refusal)
+            job = json.loads(line)
+            results = [run_case(job['code'], case, job['limits'], sandbox) for case in job['cases']]
+            response = {'results': results}
+        except Exception as e:
+            response = {'error': f'{type(e).__name__}: {e}'}
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+# api/hint_cache.py
+"""
+学习提示的响应缓存
+
+很多学生会就同一道题问几乎相同的问题，命中缓存时无需再调用大模型：
+- 精确匹配：键为 (题目ID, 归一化问题+代码的哈希)，归一化会去掉大小写、全半角、标点和多余空白
+- 近似匹配（可选）：问题不带代码时，用本地哈希n-gram向量在同一道题的已缓存问题中找余弦相似度最高的一条
+- 每条缓存带TTL；条目数超过上限时按最近访问时间（有序集合）淘汰
+Redis不可用时视为未命中，不影响提示生成。
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import time
+import unicodedata
+import zlib
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+HINT_CACHE_PREFIX = 'hint:cache'
+HINT_CACHE_LRU_KEY = f'{HINT_CACHE_PREFIX}:lru'
+EMBEDDING_DIM = 512
+# 每道题最多保留的向量数，限制近似匹配时的扫描量
+MAX_VECTORS_PER_PROBLEM = 500
+
+_PUNCT_RE = re.compile(r'[^\w]+')
+
+
+def normalize_question(text: str) -> str:
+    """归一化问题文本：全角转半角、转小写、标点和空白统一为单个空格"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return _PUNCT_RE.sub(' ', text).strip()
+
+
+def question_digest(question: str, code: str = '') -> str:
+    """问题（及代码）归一化后的哈希"""
+    # 去掉空白，使“两数之和 怎么做”与“两数之和怎么做”得到相同的哈希
+    raw = normalize_question(question).replace(' ', '') + '\0' + '\n'.join(
+        line.rstrip() for line in (code or '').strip().splitlines()
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+def embed_question(question: str) -> Dict[str, float]:
+    """
+    把问题映射为稀疏的哈希n-gram向量（L2归一化）
+    分词规则与全文检索一致：英文按单词，中文为单字 + bigram
+    """
+    vector: Dict[str, float] = {}
+    for token in tokenize(normalize_question(question)):
+        h = zlib.crc32(token.encode('utf-8'))
+        index = str(h % EMBEDDING_DIM)
+        vector[index] = vector.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if not norm:
+        return {}
+    return {index: round(v / norm, 4) for index, v in vector.items() if v}
+
+
+def cosine_similarity(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """两个已归一化稀疏向量的余弦相似度"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(index, 0.0) for index, v in a.items())
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class HintCache:
+    """基于Redis的提示响应缓存"""
+
+    def __init__(self, redis_client, ttl: int, max_entries: int,
+                 similarity_threshold: float, semantic: bool = True):
+        """
+        :param redis_client: redis-py 客户端
+        :param ttl: 缓存有效期（秒）
+        :param max_entries: 缓存条目上限，超出后淘汰最久未访问的条目
+        :param similarity_threshold: 近似匹配的最低余弦相似度
+        :param semantic: 是否启用近似匹配
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.semantic = semantic
+
+    @staticmethod
+    def _entry_key(problem_id, digest: str) -> str:
+        return f'{HINT_CACHE_PREFIX}:entry:{problem_id or 0}:{digest}'
+
+    @staticmethod
+    def _vector_key(problem_id) -> str:
+        return f'{HINT_CACHE_PREFIX}:vec:{problem_id or 0}'
+
+    @staticmethod
+    def _member(problem_id, digest: str) -> str:
+        return f'{problem_id or 0}:{digest}'
+
+    def get(self, problem_id: Optional[int], question: str, code: str = '') -> Optional[str]:
+        """
+        查找缓存的提示，未命中返回None
+        :param problem_id: 题目ID（没有关联题目时为None）
+        """
+        try:
+            digest = question_digest(question, code)
+            answer = self.redis.get(self._entry_key(problem_id, digest))
+            if answer is None and self.semantic and not code:
+                digest, answer = self._nearest(problem_id, question)
+            if answer is None:
+                return None
+            self.redis.zadd(HINT_CACHE_LRU_KEY, {self._member(problem_id, digest): time.time()})
+            return _decode(answer)
+        except Exception as e:
+            logger.warning(f"读取提示缓存失败: {e}")
+            return None
+
+    def _nearest(self, problem_id, question: str):
+        """在同一道题的已缓存问题中查找最相似的一条，返回 (digest, answer)"""
+        vector = embed_question(question)
+        if not vector:
+            return None, None
+
+        best_digest, best_score = None, self.similarity_threshold
+        for digest, raw in self.redis.hgetall(self._vector_key(problem_id)).items():
+            score = cosine_similarity(vector, json.loads(raw))
+            if score >= best_score:
+                best_digest, best_score = _decode(digest), score
+        if best_digest is None:
+            return None, None
+
+        answer = self.redis.get(self._entry_key(problem_id, best_digest))
+        if answer is None:
+            # 条目已过期，顺带清理向量
+            self.redis.hdel(self._vector_key(problem_id), best_digest)
+        return best_digest, answer
+
+    def set(self, problem_id: Optional[int], question: str, answer: str, code: str = ''):
+        """写入提示缓存，超出条目上限时淘汰最久未访问的条目"""
+        try:
+            digest = question_digest(question, code)
+            pipe = self.redis.pipeline()
+            pipe.set(self._entry_key(problem_id, digest), answer, ex=self.ttl)
+            pipe.zadd(HINT_CACHE_LRU_KEY, {self._member(problem_id, digest): time.time()})
+            if self.semantic and not code:
+                vector = embed_question(question)
+                if vector:
+                    vector_key = self._vector_key(problem_id)
+                    pipe.hset(vector_key, digest, json.dumps(vector))
+                    pipe.expire(vector_key, self.ttl)
+            pipe.zcard(HINT_CACHE_LRU_KEY)
+            size = pipe.execute()[-1]
+
+            if size > self.max_entries:
+                self._evict(size - self.max_entries)
+            if self.semantic and self.redis.hlen(self._vector_key(problem_id)) > MAX_VECTORS_PER_PROBLEM:
+                self._trim_vectors(problem_id)
+        except Exception as e:
+            logger.warning(f"写入提示缓存失败: {e}")
+
+    def _evict(self, count: int):
+        """淘汰最久未访问的条目"""
+        pipe = self.redis.pipeline()
+        for member, _ in self.redis.zpopmin(HINT_CACHE_LRU_KEY, count):
+            problem_id, digest = _decode(member).split(':', 1)
+            pipe.delete(self._entry_key(problem_id, digest))
+            pipe.hdel(self._vector_key(problem_id), digest)
+        pipe.execute()
+
+    def _trim_vectors(self, problem_id):
+        """
+        清理已过期条目的向量；仍超过 MAX_VECTORS_PER_PROBLEM 时按LRU时间删除最久未访问的向量
+        （只删除向量，条目本身仍可精确命中，由全局LRU淘汰）
+        """
+        vector_key = self._vector_key(problem_id)
+        digests = [_decode(digest) for digest in self.redis.hkeys(vector_key)]
+        pipe = self.redis.pipeline()
+        for digest in digests:
+            pipe.exists(self._entry_key(problem_id, digest))
+            pipe.zscore(HINT_CACHE_LRU_KEY, self._member(problem_id, digest))
+        results = pipe.execute()
+
+        stale, live = [], []
+        for digest, exists, score in zip(digests, results[::2], results[1::2]):
+            if exists:
+                live.append((score or 0, digest))
+            else:
+                stale.append(digest)
+        if len(live) > MAX_VECTORS_PER_PROBLEM:
+            live.sort()
+            stale.extend(digest for _, digest in live[:len(live) - MAX_VECTORS_PER_PROBLEM])
+        if stale:
+            self.redis.hdel(vector_key, *stale)
+
+
+def get_hint_cache() -> HintCache:
+    """按配置创建提示缓存（使用默认缓存的Redis连接）"""
+    from django_redis import get_redis_connection
+
+    return HintCache(
+        get_redis_connection('default'),
+        ttl=settings.HINT_CACHE_TTL,
+        max_entries=settings.HINT_CACHE_MAX_ENTRIES,
+        similarity_threshold=settings.HINT_CACHE_SIMILARITY,
+        semantic=settings.HINT_CACHE_SEMANTIC
+    )
@@ -0,0 +1,130 @@
+# api/hint_stream.py
+"""
+提示内容的流式推送
+
+    Celery任务 --XADD--> Redis Stream (hint:stream:{job_id}) --XREAD--> ASGI视图 --SSE--> 浏览器
+
+- 任务每生成一段文本就写入一条 token 事件，结束时写入 done / error 事件
+- 模型调用失败准备重试时写入 reset 事件，前端清空已显示的内容
+- Stream 会保留到任务结束后一段时间，浏览器晚于任务连接或断线重连（Last-Event-ID）都能从头/断点补齐
+- 结束事件推送失败、任务丢失或重连时已读过结束事件，都不会再有新事件：视图在心跳超时时检查数据库中的状态，
+  补发最终结果后结束；单个连接另有最长时间限制
+"""
+
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HINT_STREAM_PREFIX = 'hint:stream'
+HINT_STREAM_MAXLEN = 5000
+HINT_STREAM_TTL = 3600  # 生成过程中的过期时间（秒）
+HINT_STREAM_DONE_TTL = 600  # 结束后保留的时间（秒），供晚到或重连的客户端读取
+HINT_STREAM_BLOCK_MS = 15000  # 每次XREAD最长阻塞时间，超时后发送心跳
+HINT_STREAM_MAX_DURATION = 600  # 单个SSE连接的最长时间（秒），避免连接被无限期占用
+
+FINAL_EVENTS = ('done', 'error')
+
+
+def hint_stream_key(hint_id) -> str:
+    return f'{HINT_STREAM_PREFIX}:{hint_id}'
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class HintStreamPublisher:
+    """把提示生成过程写入Redis Stream（在Celery任务中使用）"""
+
+    def __init__(self, redis_client, hint_id):
+        self.redis = redis_client
+        self.key = hint_stream_key(hint_id)
+
+    def _add(self, event: str, data: str = '', ttl: int = HINT_STREAM_TTL):
+        try:
+            pipe = self.redis.pipeline()
+            pipe.xadd(self.key, {'event': event, 'data': data}, maxlen=HINT_STREAM_MAXLEN, approximate=True)
+            pipe.expire(self.key, ttl)
+            pipe.execute()
+        except Exception as e:
+            # 推送失败不影响结果入库，客户端仍可通过轮询接口获取
+            logger.warning(f"推送提示流失败 {self.key}: {e}")
+
+    def token(self, text: str):
+        self._add('token', text)
+
+    def reset(self):
+        self._add('reset')
+
+    def done(self):
+        self._add('done', ttl=HINT_STREAM_DONE_TTL)
+
+    def error(self, message: str):
+        self._add('error', message, ttl=HINT_STREAM_DONE_TTL)
+
+
+def get_hint_stream_publisher(hint_id) -> HintStreamPublisher:
+    """使用默认缓存的Redis连接创建推送器"""
+    from django_redis import get_redis_connection
+
+    return HintStreamPublisher(get_redis_connection('default'), hint_id)
+
+
+_async_redis = None
+
+
+def get_async_redis():
+    """获取 redis.asyncio 客户端（与默认缓存使用同一个Redis库）"""
+    global _async_redis
+    if _async_redis is None:
+        import redis.asyncio as aioredis
+
+        _async_redis = aioredis.from_url(settings.CACHES['default']['LOCATION'], decode_responses=True)
+    return _async_redis
+
+
+async def read_hint_events(hint_id, last_id: str = '0-0',
+                           max_duration: float = None) -> AsyncIterator[Tuple[str, Dict]]:
+    """
+    异步读取提示事件，读到 done / error 后结束
+    Stream 不存在（已过期或任务丢失）或超过 max_duration 时也会结束，此时没有结束事件，
+    由调用方根据数据库中的状态补发结果
+    :param last_id: 从该消息ID之后开始读取（断线重连时为 Last-Event-ID）
+    :param max_duration: 最长读取时间（秒），默认 HINT_STREAM_MAX_DURATION
+    :return: 依次产出 (消息ID, {'event', 'data'})；阻塞超时时产出 (None, {}) 作为心跳
+    """
+    redis = get_async_redis()
+    key = hint_stream_key(hint_id)
+    deadline = time.monotonic() + (HINT_STREAM_MAX_DURATION if max_duration is None else max_duration)
+    while True:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            return
+        response = await redis.xread({key: last_id}, block=min(HINT_STREAM_BLOCK_MS, remaining_ms), count=100)
+        if not response:
+            # XREAD 在键不存在时也会一直阻塞，需要单独检查
+            if not await redis.exists(key):
+                return
+            yield None, {}
+            continue
+        for message_id, fields in response[0][1]:
+            last_id = _decode(message_id)
+            fields = {_decode(k): _decode(v) for k, v in fields.items()}
+            yield last_id, fields
+            if fields.get('event') in FINAL_EVENTS:
+                return
+
+
+def format_sse(event: str, data, event_id: str = None) -> str:
+    """格式化一条SSE消息（data统一为JSON，便于前端解析含换行的文本）"""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
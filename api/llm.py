@@ -0,0 +1,181 @@
+# api/llm.py
+"""
+大模型客户端
+
+- 通过 settings.LLM_BACKEND 选择后端：'stub' 为本地固定回复（开发/测试用），'qwen' 为通义千问
+- 客户端按进程缓存，Celery worker 中多次任务复用同一个 HTTP 连接池
+- 提示词遵循PF教学策略：引导学生思考，不直接给出完整答案
+"""
+
+import json
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .search import strip_html
+
+# 题目描述过长时截断，控制提示词长度
+MAX_PROBLEM_CONTENT_CHARS = 2000
+
+HINT_SYSTEM_PROMPT = (
+    "你是一名编程课程助教，采用引导式教学：不要直接给出完整代码或最终答案，"
+    "而是指出问题涉及的核心知识点，给出思考方向、伪代码思路或调试建议，"
+    "引导学生自己完成。回答使用中文，简洁清晰。"
+)
+
+
+class LLMError(Exception):
+    """大模型调用失败（网络错误、限流、返回格式异常等），可以重试"""
+
+
+class BaseLLMClient:
+    """大模型客户端基类"""
+    name = 'base'
+
+    def complete(self, messages: List[Dict]) -> str:
+        """
+        发送对话消息，返回模型回复文本
+        :param messages: [{'role': 'system'|'user'|'assistant', 'content': ...}, ...]
+        """
+        raise NotImplementedError
+
+    def stream(self, messages: List[Dict]) -> Iterator[str]:
+        """流式生成回复，逐段返回文本；默认一次性返回完整回复"""
+        yield self.complete(messages)
+
+
+class StubLLMClient(BaseLLMClient):
+    """本地固定回复，不访问网络"""
+    name = 'stub'
+
+    def complete(self, messages: List[Dict]) -> str:
+        question = messages[-1]['content'] if messages else ''
+        return (
+            f"你问的问题是：{question.splitlines()[-1] if question else ''}\n"
+            "提示：先思考这个问题涉及的核心知识点（如循环/函数/数据结构），尝试写伪代码，再逐步调试。\n"
+            "例如：如果是循环问题，先确认循环条件是否正确，再测试边界值。"
+        )
+
+    def stream(self, messages: List[Dict]) -> Iterator[str]:
+        answer = self.complete(messages)
+        for i in range(0, len(answer), 8):
+            yield answer[i:i + 8]
+
+
+class QwenLLMClient(BaseLLMClient):
+    """通义千问（DashScope OpenAI兼容接口）"""
+    name = 'qwen'
+
+    def __init__(self, api_key: str, base_url: str, model: str, timeout=(5, 60), pool_size: int = 10):
+        """
+        :param api_key: DashScope API Key
+        :param base_url: 兼容接口地址，如 https://dashscope.aliyuncs.com/compatible-mode/v1
+        :param model: 模型名称，如 qwen-max
+        :param timeout: (连接超时, 读取超时)
+        :param pool_size: 连接池大小，应不小于worker并发数
+        """
+        if not api_key:
+            raise LLMError("未配置 LLM_API_KEY")
+        self.url = base_url.rstrip('/') + '/chat/completions'
+        self.model = model
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def complete(self, messages: List[Dict]) -> str:
+        try:
+            response = self.session.post(
+                self.url,
+                json={'model': self.model, 'messages': messages},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()['choices'][0]['message']['content']
+        except requests.RequestException as e:
+            raise LLMError(f"请求大模型失败: {e}") from e
+        except (KeyError, IndexError, ValueError) as e:
+            raise LLMError(f"大模型返回格式异常: {e}") from e
+
+    def stream(self, messages: List[Dict]) -> Iterator[str]:
+        """使用 stream=True 的SSE响应，逐段返回 delta.content"""
+        try:
+            with self.session.post(
+                self.url,
+                json={'model': self.model, 'messages': messages, 'stream': True},
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                response.encoding = 'utf-8'  # text/event-stream 未声明编码时requests默认按latin-1解码
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[len('data:'):].strip()
+                    if data == '[DONE]':
+                        break
+                    choices = json.loads(data).get('choices') or []
+                    content = choices[0].get('delta', {}).get('content') if choices else None
+                    if content:
+                        yield content
+        except requests.RequestException as e:
+            raise LLMError(f"请求大模型失败: {e}") from e
+        except (KeyError, IndexError, ValueError) as e:
+            raise LLMError(f"大模型返回格式异常: {e}") from e
+
+
+_client: Optional[BaseLLMClient] = None
+_client_lock = threading.Lock()
+
+
+def create_llm_client(backend: str = None) -> BaseLLMClient:
+    """根据配置创建大模型客户端"""
+    backend = backend or settings.LLM_BACKEND
+    if backend == 'stub':
+        return StubLLMClient()
+    if backend == 'qwen':
+        return QwenLLMClient(
+            api_key=settings.LLM_API_KEY,
+            base_url=settings.LLM_BASE_URL,
+            model=settings.LLM_MODEL,
+            timeout=(5, settings.LLM_TIMEOUT)
+        )
+    raise LLMError(f"不支持的大模型后端: {backend}")
+
+
+def get_llm_client() -> BaseLLMClient:
+    """获取本进程共享的大模型客户端（首次调用时创建）"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_llm_client()
+    return _client
+
+
+def build_hint_messages(question: str, problem=None, code: str = '') -> List[Dict]:
+    """
+    构造提示请求的对话消息
+    :param question: 学生的问题
+    :param problem: 关联的 LeetCodeProblem（可选）
+    :param code: 学生当前的代码（可选）
+    """
+    parts = []
+    if problem is not None:
+        content = strip_html(problem.content)[:MAX_PROBLEM_CONTENT_CHARS]
+        parts.append(f"题目：{problem.problem_id}. {problem.title}\n{content}")
+    if code:
+        parts.append(f"我的代码：\n```\n{code}\n```")
+    parts.append(question)
+    return [
+        {'role': 'system', 'content': HINT_SYSTEM_PROMPT},
+        {'role': 'user', 'content': '\n\n'.join(parts)},
+    ]
@@ -0,0 +1,18 @@
+# api/management/commands/build_catalog_snapshot.py
+from django.core.management.base import BaseCommand
+from api.catalog_snapshot import build_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = '生成题目列表的Redis快照（爬虫同步后会自动生成，首次部署或Redis数据丢失时手动执行）'
+
+    def handle(self, *args, **options):
+        try:
+            version = build_catalog_snapshot()
+            self.stdout.write(
+                self.style.SUCCESS(f'题目列表快照已生成，版本: {version}')
+            )
+        except Exception as e:
+            self.stdout.write(
+                self.style.ERROR(f'生成快照失败: {str(e)}')
+            )
@@ -1,7 +1,8 @@
 # api/management/commands/scrape_leetcode.py
-import json
 from django.core.management.base import BaseCommand
-from tools.leetcode_scraper import run_scraper
+from tools.http_cache import ResponseCache, DEFAULT_CACHE_TTL
+from tools.leetcode_scraper import (run_scraper, DEFAULT_CONCURRENCY, DEFAULT_RPS,
+                                    DEFAULT_DETAIL_BATCH_SIZE)
 
 class Command(BaseCommand):
     help = '爬取LeetCode题目并保存到数据库'
@@ -13,6 +14,61 @@ class Command(BaseCommand):
             default=200,
             help='爬取题目数量限制 (默认: 200)'
         )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help=f'并发获取题目详情的线程数 (默认: {DEFAULT_CONCURRENCY})'
+        )
+        parser.add_argument(
+            '--rps',
+            type=float,
+            default=DEFAULT_RPS,
+            help=f'初始每秒请求数，之后按上游状况自适应调整，0表示不限速 (默认: {DEFAULT_RPS})'
+        )
+        parser.add_argument(
+            '--max-rps',
+            type=float,
+            default=None,
+            help='自适应限流的速率上限 (默认: rps的4倍)'
+        )
+        parser.add_argument(
+            '--detail-batch',
+            type=int,
+            default=DEFAULT_DETAIL_BATCH_SIZE,
+            help=f'每次GraphQL请求获取的题目详情数，1表示逐题请求 (默认: {DEFAULT_DETAIL_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='全量模式，重新抓取所有题目详情（默认只抓取新增或变化的题目）'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='从上次中断的断点继续爬取'
+        )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='使用磁盘响应缓存（短时间内重跑时复用已抓取的响应）'
+        )
+        parser.add_argument(
+            '--cache-ttl',
+            type=int,
+            default=DEFAULT_CACHE_TTL,
+            help=f'响应缓存有效期，单位秒 (默认: {DEFAULT_CACHE_TTL})'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='离线模式，只从响应缓存回放，不访问网络'
+        )
+        parser.add_argument(
+            '--distributed',
+            action='store_true',
+            help='分发到Celery worker执行（协调任务 + 分片抓取任务），立即返回任务ID'
+        )
         parser.add_argument(
             '--test',
             action='store_true',
@@ -30,11 +86,56 @@ class Command(BaseCommand):
             )
 
         self.stdout.write(
-            self.style.SUCCESS(f'开始爬取LeetCode题目，数量限制: {limit}')
+            self.style.SUCCESS(f'开始爬取LeetCode题目，数量限制: {limit}，'
+                               f'并发数: {options["concurrency"]}，限速: {options["rps"]} 次/秒')
         )
 
+        # 与定时同步共用锁：两者使用同一个断点，同时运行会互相覆盖
+        from api.tasks import (SCRAPE_LOCK_HELD_MESSAGE, acquire_scrape_sync_lock,
+                               is_scrape_sync_locked, release_scrape_sync_lock)
+
+        if options['distributed']:
+            from api.tasks import scrape_coordinator_task
+
+            # 分布式爬取跨多个任务执行，无法持有锁，只在提交前检查
+            if is_scrape_sync_locked():
+                self.stdout.write(self.style.ERROR(SCRAPE_LOCK_HELD_MESSAGE))
+                return
+            result = scrape_coordinator_task.delay(
+                limit=limit,
+                full=options['full'],
+                rps=options['rps'],
+                detail_batch_size=options['detail_batch']
+            )
+            self.stdout.write(self.style.SUCCESS(f'已提交分布式爬取任务: {result.id}'))
+            return
+
+        cache = None
+        if options['cache'] or options['offline']:
+            cache = ResponseCache(ttl=options['cache_ttl'])
+
+        # Redis不可用（或缓存后端不支持锁）时仍允许手动爬取，此时定时同步也无法运行
         try:
-            result = run_scraper(limit=limit)
+            lock = acquire_scrape_sync_lock()
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'无法获取同步锁，跳过加锁继续爬取: {e}'))
+            lock = False
+        if lock is None:
+            self.stdout.write(self.style.ERROR(SCRAPE_LOCK_HELD_MESSAGE))
+            return
+
+        try:
+            result = run_scraper(
+                limit=limit,
+                concurrency=options['concurrency'],
+                rps=options['rps'],
+                full=options['full'],
+                resume=options['resume'],
+                cache=cache,
+                offline=options['offline'],
+                detail_batch_size=options['detail_batch'],
+                max_rps=options['max_rps']
+            )
 
             if result['success']:
                 self.stdout.write(
@@ -49,6 +150,9 @@ class Command(BaseCommand):
                 self.stdout.write(
                     f"失败数量: {result['fail_count']} 道题目"
                 )
+                self.stdout.write(
+                    f"未变化: {result['unchanged_count']} 道题目"
+                )
             else:
                 self.stdout.write(
                     self.style.ERROR(f"爬取失败: {result['message']}")
@@ -58,3 +162,6 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.ERROR(f'执行过程中发生错误: {str(e)}')
             )
+        finally:
+            if lock:
+                release_scrape_sync_lock(lock)
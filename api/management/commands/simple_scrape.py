@@ -1,7 +1,7 @@
 # api/management/commands/simple_scrape.py
-import json
 from django.core.management.base import BaseCommand
 from simple_scraper import run_simple_scraper
+from tools.http_cache import ResponseCache, DEFAULT_CACHE_TTL
 
 class Command(BaseCommand):
     help = '简化版爬取LeetCode题目（只获取基础信息）'
@@ -13,6 +13,22 @@ class Command(BaseCommand):
             default=200,
             help='爬取题目数量限制 (默认: 200)'
         )
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='使用磁盘响应缓存（短时间内重跑时复用已抓取的响应）'
+        )
+        parser.add_argument(
+            '--cache-ttl',
+            type=int,
+            default=DEFAULT_CACHE_TTL,
+            help=f'响应缓存有效期，单位秒 (默认: {DEFAULT_CACHE_TTL})'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='离线模式，只从响应缓存回放，不访问网络'
+        )
 
     def handle(self, *args, **options):
         limit = options['limit']
@@ -21,8 +37,12 @@ class Command(BaseCommand):
             self.style.SUCCESS(f'开始简化版爬取LeetCode题目，数量限制: {limit}')
         )
 
+        cache = None
+        if options['cache'] or options['offline']:
+            cache = ResponseCache(ttl=options['cache_ttl'])
+
         try:
-            result = run_simple_scraper(limit=limit)
+            result = run_simple_scraper(limit=limit, cache=cache, offline=options['offline'])
 
             if result['success']:
                 self.stdout.write(
@@ -0,0 +1,72 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+from api.search import build_search_document
+
+
+SEARCH_TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION leetcode_problem_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.search_title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.search_content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS leetcode_problem_search_vector_trigger ON leetcode_problem;
+CREATE TRIGGER leetcode_problem_search_vector_trigger
+    BEFORE INSERT OR UPDATE ON leetcode_problem
+    FOR EACH ROW EXECUTE FUNCTION leetcode_problem_search_vector_update();
+"""
+
+DROP_SEARCH_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS leetcode_problem_search_vector_trigger ON leetcode_problem;
+DROP FUNCTION IF EXISTS leetcode_problem_search_vector_update();
+"""
+
+
+def backfill_search_document(apps, schema_editor):
+    """为已有题目生成检索词，UPDATE会触发search_vector的计算"""
+    LeetCodeProblem = apps.get_model('api', 'LeetCodeProblem')
+    batch = []
+    for problem in LeetCodeProblem.objects.only('id', 'title', 'content').iterator(chunk_size=500):
+        problem.search_title, problem.search_content = build_search_document(problem.title, problem.content)
+        batch.append(problem)
+        if len(batch) >= 500:
+            LeetCodeProblem.objects.bulk_update(batch, ['search_title', 'search_content'])
+            batch = []
+    if batch:
+        LeetCodeProblem.objects.bulk_update(batch, ['search_title', 'search_content'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_leetcodeproblem_problemtag_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leetcodeproblem',
+            name='search_title',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='标题检索词'),
+        ),
+        migrations.AddField(
+            model_name='leetcodeproblem',
+            name='search_content',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='描述检索词'),
+        ),
+        migrations.AddField(
+            model_name='leetcodeproblem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='检索向量'),
+        ),
+        migrations.RunSQL(SEARCH_TRIGGER_SQL, DROP_SEARCH_TRIGGER_SQL),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='leetcodeproblem',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='leetcode_problem_search_gin'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+
+def backfill_problem_tags(apps, schema_editor):
+    """根据题目的tags列表（slug）回填题目-标签关联"""
+    LeetCodeProblem = apps.get_model('api', 'LeetCodeProblem')
+    ProblemTag = apps.get_model('api', 'ProblemTag')
+    Through = LeetCodeProblem.problem_tags.through
+
+    tag_ids = dict(ProblemTag.objects.values_list('slug', 'id'))
+
+    # 补齐只出现在题目tags中、标签表里没有的slug
+    missing = set()
+    for tags in LeetCodeProblem.objects.values_list('tags', flat=True).iterator(chunk_size=1000):
+        missing.update(slug for slug in (tags or []) if slug not in tag_ids)
+    if missing:
+        ProblemTag.objects.bulk_create(
+            [ProblemTag(name=slug, slug=slug) for slug in sorted(missing)],
+            ignore_conflicts=True
+        )
+        tag_ids = dict(ProblemTag.objects.values_list('slug', 'id'))
+
+    rows = []
+    for problem_pk, tags in LeetCodeProblem.objects.values_list('id', 'tags').iterator(chunk_size=1000):
+        for slug in set(tags or []):
+            if slug in tag_ids:
+                rows.append(Through(leetcodeproblem_id=problem_pk, problemtag_id=tag_ids[slug]))
+        if len(rows) >= 1000:
+            Through.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    if rows:
+        Through.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_leetcodeproblem_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leetcodeproblem',
+            name='problem_tags',
+            field=models.ManyToManyField(blank=True, db_table='leetcode_problem_tags', related_name='problems', to='api.problemtag', verbose_name='标签关联'),
+        ),
+        migrations.RunPython(backfill_problem_tags, migrations.RunPython.noop),
+    ]
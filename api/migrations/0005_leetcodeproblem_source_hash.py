@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_leetcodeproblem_problem_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leetcodeproblem',
+            name='source_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='列表数据指纹'),
+        ),
+    ]
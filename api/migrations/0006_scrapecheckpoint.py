@@ -0,0 +1,30 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_leetcodeproblem_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='任务名称')),
+                ('limit', models.IntegerField(verbose_name='题目数量限制')),
+                ('full', models.BooleanField(default=False, verbose_name='是否全量')),
+                ('list_skip', models.IntegerField(default=0, verbose_name='下一页列表偏移')),
+                ('list_done', models.BooleanField(default=False, verbose_name='列表是否抓取完成')),
+                ('pending', models.JSONField(blank=True, default=list, verbose_name='待抓取详情的题目')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '爬虫断点',
+                'verbose_name_plural': '爬虫断点列表',
+                'db_table': 'scrape_checkpoint',
+            },
+        ),
+    ]
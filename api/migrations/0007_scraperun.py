@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_scrapecheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger', models.CharField(choices=[('manual', '手动'), ('beat', '定时')], default='manual', max_length=10, verbose_name='触发方式')),
+                ('status', models.CharField(choices=[('running', '运行中'), ('success', '成功'), ('failed', '失败')], default='running', max_length=10, verbose_name='状态')),
+                ('full', models.BooleanField(default=False, verbose_name='是否全量')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('duration_seconds', models.FloatField(default=0.0, verbose_name='耗时（秒）')),
+                ('total_count', models.IntegerField(default=0, verbose_name='列表题目数')),
+                ('changed_count', models.IntegerField(default=0, verbose_name='需要更新的题目数')),
+                ('success_count', models.IntegerField(default=0, verbose_name='成功数')),
+                ('fail_count', models.IntegerField(default=0, verbose_name='失败数')),
+                ('request_count', models.IntegerField(default=0, verbose_name='HTTP请求数')),
+                ('requests_per_second', models.FloatField(default=0.0, verbose_name='每秒请求数')),
+                ('message', models.TextField(blank=True, verbose_name='结果信息')),
+                ('metrics', models.JSONField(blank=True, default=dict, verbose_name='各阶段指标')),
+            ],
+            options={
+                'verbose_name': '爬虫运行记录',
+                'verbose_name_plural': '爬虫运行记录列表',
+                'db_table': 'scrape_run',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_scraperun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HintRequest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='任务ID')),
+                ('question', models.TextField(verbose_name='学生问题')),
+                ('code', models.TextField(blank=True, default='', verbose_name='学生代码')),
+                ('status', models.CharField(choices=[('pending', '排队中'), ('running', '生成中'), ('success', '已完成'), ('failed', '失败')], default='pending', max_length=10, verbose_name='状态')),
+                ('answer', models.TextField(blank=True, default='', verbose_name='提示内容')),
+                ('error', models.TextField(blank=True, default='', verbose_name='错误信息')),
+                ('backend', models.CharField(blank=True, default='', max_length=20, verbose_name='模型后端')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('problem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hint_requests', to='api.leetcodeproblem', verbose_name='关联题目')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hint_requests', to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+            ],
+            options={
+                'verbose_name': '提示请求',
+                'verbose_name_plural': '提示请求列表',
+                'db_table': 'hint_request',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='hint_request_user_created')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_hintrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProblemTestCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_point', models.CharField(default='Solution.solve', max_length=100, verbose_name='调用入口')),
+                ('args', models.JSONField(default=list, verbose_name='调用参数')),
+                ('expected', models.JSONField(blank=True, null=True, verbose_name='期望返回值')),
+                ('is_hidden', models.BooleanField(default=False, verbose_name='是否隐藏')),
+                ('order', models.IntegerField(default=0, verbose_name='排序')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_cases', to='api.leetcodeproblem', verbose_name='题目')),
+            ],
+            options={
+                'verbose_name': '测试用例',
+                'verbose_name_plural': '测试用例列表',
+                'db_table': 'problem_test_case',
+                'ordering': ['problem', 'order', 'id'],
+            },
+        ),
+    ]
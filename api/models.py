@@ -1,5 +1,11 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from .search import build_search_document
 
 # Create your models here.
 class CustomUser(AbstractUser):
@@ -59,8 +65,20 @@ class LeetCodeProblem(models.Model):
     submission_count = models.IntegerField(default=0, verbose_name='提交次数')
     accepted_count = models.IntegerField(default=0, verbose_name='通过次数')
 
-    # 标签
+    # 标签（tags保留slug列表用于接口输出，problem_tags为可索引的关联关系）
     tags = models.JSONField(default=list, blank=True, verbose_name='标签')
+    problem_tags = models.ManyToManyField(
+        'ProblemTag', related_name='problems', blank=True,
+        db_table='leetcode_problem_tags', verbose_name='标签关联'
+    )
+
+    # 增量同步：列表接口返回字段的指纹，用于判断题目是否变化
+    source_hash = models.CharField(max_length=64, blank=True, default='', verbose_name='列表数据指纹')
+
+    # 全文检索（分词后的文本由save维护，search_vector由数据库触发器维护）
+    search_title = models.TextField(blank=True, default='', editable=False, verbose_name='标题检索词')
+    search_content = models.TextField(blank=True, default='', editable=False, verbose_name='描述检索词')
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name='检索向量')
 
     # 时间戳
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
@@ -71,16 +89,53 @@ class LeetCodeProblem(models.Model):
         verbose_name = 'LeetCode题目'
         verbose_name_plural = 'LeetCode题目列表'
         ordering = ['problem_id']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='leetcode_problem_search_gin'),
+        ]
 
     def __str__(self):
         return f"{self.problem_id}. {self.title}"
 
+    def refresh_search_document(self):
+        """根据标题和描述重新生成检索词"""
+        self.search_title, self.search_content = build_search_document(self.title, self.content)
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_document()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'search_title', 'search_content'}
+        super().save(*args, **kwargs)
+
     @property
     def url(self):
         """返回LeetCode题目链接"""
         return f"https://leetcode.cn/problems/{self.title_slug}/"
 
 
+class ProblemTestCase(models.Model):
+    """题目测试用例：以 args 调用学生代码中的 entry_point，返回值与 expected 比较"""
+    problem = models.ForeignKey(LeetCodeProblem, on_delete=models.CASCADE,
+                                related_name='test_cases', verbose_name='题目')
+    entry_point = models.CharField(max_length=100, default='Solution.solve',
+                                   verbose_name='调用入口')  # 'Solution.twoSum' 或函数名 'solve'
+    args = models.JSONField(default=list, verbose_name='调用参数')
+    expected = models.JSONField(null=True, blank=True, verbose_name='期望返回值')
+    is_hidden = models.BooleanField(default=False, verbose_name='是否隐藏')  # 隐藏用例不向学生展示输入和期望输出
+    order = models.IntegerField(default=0, verbose_name='排序')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'problem_test_case'
+        verbose_name = '测试用例'
+        verbose_name_plural = '测试用例列表'
+        ordering = ['problem', 'order', 'id']
+
+    def __str__(self):
+        return f"{self.problem_id} #{self.order}"
+
+
 class ProblemTag(models.Model):
     """题目标签模型"""
     name = models.CharField(max_length=50, unique=True, verbose_name='标签名称')
@@ -94,4 +149,98 @@ class ProblemTag(models.Model):
         ordering = ['name']
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class ScrapeCheckpoint(models.Model):
+    """爬虫断点：记录列表抓取进度和待抓取详情的题目，用于中断后续跑"""
+    name = models.CharField(max_length=50, unique=True, verbose_name='任务名称')
+    limit = models.IntegerField(verbose_name='题目数量限制')
+    full = models.BooleanField(default=False, verbose_name='是否全量')
+    list_skip = models.IntegerField(default=0, verbose_name='下一页列表偏移')
+    list_done = models.BooleanField(default=False, verbose_name='列表是否抓取完成')
+    pending = models.JSONField(default=list, blank=True, verbose_name='待抓取详情的题目')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'scrape_checkpoint'
+        verbose_name = '爬虫断点'
+        verbose_name_plural = '爬虫断点列表'
+
+    def __str__(self):
+        return f"{self.name} (skip={self.list_skip}, pending={len(self.pending)})"
+
+
+class ScrapeRun(models.Model):
+    """爬虫运行记录，用于容量规划和发现吞吐量退化"""
+    TRIGGER_CHOICES = (
+        ('manual', '手动'),
+        ('beat', '定时'),
+    )
+    STATUS_CHOICES = (
+        ('running', '运行中'),
+        ('success', '成功'),
+        ('failed', '失败'),
+    )
+
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES, default='manual', verbose_name='触发方式')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running', verbose_name='状态')
+    full = models.BooleanField(default=False, verbose_name='是否全量')
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='开始时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='结束时间')
+    duration_seconds = models.FloatField(default=0.0, verbose_name='耗时（秒）')
+    total_count = models.IntegerField(default=0, verbose_name='列表题目数')
+    changed_count = models.IntegerField(default=0, verbose_name='需要更新的题目数')
+    success_count = models.IntegerField(default=0, verbose_name='成功数')
+    fail_count = models.IntegerField(default=0, verbose_name='失败数')
+    request_count = models.IntegerField(default=0, verbose_name='HTTP请求数')
+    requests_per_second = models.FloatField(default=0.0, verbose_name='每秒请求数')
+    message = models.TextField(blank=True, verbose_name='结果信息')
+    metrics = models.JSONField(default=dict, blank=True, verbose_name='各阶段指标')
+
+    class Meta:
+        db_table = 'scrape_run'
+        verbose_name = '爬虫运行记录'
+        verbose_name_plural = '爬虫运行记录列表'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M} {self.get_trigger_display()} {self.get_status_display()}"
+
+
+class HintRequest(models.Model):
+    """学生的提示请求：提交后由Celery任务调用大模型生成引导式回复"""
+    STATUS_CHOICES = (
+        ('pending', '排队中'),
+        ('running', '生成中'),
+        ('success', '已完成'),
+        ('failed', '失败'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False, verbose_name='任务ID')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='hint_requests', verbose_name='用户')
+    problem = models.ForeignKey(LeetCodeProblem, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='hint_requests', verbose_name='关联题目')
+    question = models.TextField(verbose_name='学生问题')
+    code = models.TextField(blank=True, default='', verbose_name='学生代码')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='状态')
+    answer = models.TextField(blank=True, default='', verbose_name='提示内容')
+    error = models.TextField(blank=True, default='', verbose_name='错误信息')
+    backend = models.CharField(max_length=20, blank=True, default='', verbose_name='模型后端')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成时间')
+
+    class Meta:
+        db_table = 'hint_request'
+        verbose_name = '提示请求'
+        verbose_name_plural = '提示请求列表'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='hint_request_user_created'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.get_status_display()} {self.question[:20]}"
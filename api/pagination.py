@@ -0,0 +1,131 @@
+# api/pagination.py
+"""
+题目列表分页
+
+- 偏移分页（page/page_size）：在 SQL 中做 LIMIT/OFFSET，只取当前页的数据
+- 游标分页（cursor）：基于 problem_id 的 keyset 分页，深翻页和第一页代价相同
+"""
+
+import base64
+import binascii
+import json
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500  # 限制最大页面大小
+
+
+class PaginationError(ValueError):
+    """分页参数非法（如游标被篡改）"""
+
+
+def parse_page_size(params) -> int:
+    """解析page_size参数，非法时回退到默认值"""
+    try:
+        page_size = int(params.get('page_size', DEFAULT_PAGE_SIZE))
+    except (ValueError, TypeError):
+        return DEFAULT_PAGE_SIZE
+    if page_size < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def parse_page(params) -> int:
+    """解析page参数，非法时回退到第一页"""
+    try:
+        page = int(params.get('page', 1))
+    except (ValueError, TypeError):
+        return 1
+    return max(page, 1)
+
+
+def encode_cursor(key: int, direction: str) -> str:
+    """生成不透明游标：direction为 'n'（向后）或 'p'（向前）"""
+    raw = json.dumps({'k': key, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """解析游标，返回 (key, direction)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        key, direction = int(data['k']), data['d']
+    except (ValueError, TypeError, KeyError, UnicodeEncodeError, binascii.Error):
+        raise PaginationError('无效的分页游标')
+    if direction not in ('n', 'p'):
+        raise PaginationError('无效的分页游标')
+    return key, direction
+
+
+def wants_cursor_pagination(params) -> bool:
+    """请求是否使用游标分页模式"""
+    return params.get('pagination') == 'cursor' or 'cursor' in params
+
+
+def _item_key(item, key_field: str):
+    """读取模型对象或 values() 字典的分页键"""
+    return item[key_field] if isinstance(item, dict) else getattr(item, key_field)
+
+
+def paginate_offset(queryset, params):
+    """偏移分页，返回 (当前页对象列表, 分页信息)；queryset 也可以是 .values() 查询集"""
+    page = parse_page(params)
+    page_size = parse_page_size(params)
+
+    start = (page - 1) * page_size
+    end = start + page_size
+
+    total_count = queryset.count()
+    items = list(queryset[start:end])
+
+    return items, {
+        'current_page': page,
+        'page_size': page_size,
+        'total_count': total_count,
+        'total_pages': (total_count + page_size - 1) // page_size
+    }
+
+
+def paginate_keyset(queryset, params, key_field: str = 'problem_id'):
+    """
+    基于唯一有序字段的keyset分页，返回 (当前页对象列表, 分页信息)
+    :param queryset: 未切片的查询集（也可以是 .values() 查询集，需包含 key_field）
+    :param params: 请求参数（cursor / page_size）
+    :param key_field: 唯一且有索引的排序字段
+    """
+    page_size = parse_page_size(params)
+    cursor = params.get('cursor')
+    key, direction = decode_cursor(cursor) if cursor else (None, 'n')
+
+    if direction == 'n':
+        if key is not None:
+            queryset = queryset.filter(**{f'{key_field}__gt': key})
+        items = list(queryset.order_by(key_field)[:page_size + 1])
+    else:
+        queryset = queryset.filter(**{f'{key_field}__lt': key})
+        items = list(queryset.order_by(f'-{key_field}')[:page_size + 1])
+
+    # 多取一条用于判断是否还有更多数据
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if direction == 'p':
+        items.reverse()
+
+    next_cursor = prev_cursor = None
+    if items:
+        first_key = _item_key(items[0], key_field)
+        last_key = _item_key(items[-1], key_field)
+        if direction == 'n':
+            has_next, has_prev = has_more, key is not None
+        else:
+            has_next, has_prev = True, has_more
+        if has_next:
+            next_cursor = encode_cursor(last_key, 'n')
+        if has_prev:
+            prev_cursor = encode_cursor(first_key, 'p')
+
+    return items, {
+        'page_size': page_size,
+        'next': next_cursor,
+        'prev': prev_cursor
+    }
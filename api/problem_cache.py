@@ -0,0 +1,107 @@
+# api/problem_cache.py
+"""
+题目详情缓存
+
+题目只在爬虫同步时变化，详情接口把序列化后的结果缓存进Redis：
+- 缓存内容带上行的 updated_at，ETag 由 (problem_id, updated_at) 生成，Last-Modified 即 updated_at
+- 客户端带 If-None-Match / If-Modified-Since 且未变化时返回 304，不再传输题目描述
+- 爬虫写入（problems_synced 信号）或单独保存/删除题目时删除对应缓存
+"""
+
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .models import LeetCodeProblem
+from .fast_serializers import DETAIL_VALUE_FIELDS, serialize_problem_detail
+from .signals import problems_synced
+
+logger = logging.getLogger(__name__)
+
+PROBLEM_DETAIL_CACHE_PREFIX = 'leetcode:problem'
+PROBLEM_DETAIL_CACHE_TIMEOUT = 24 * 3600  # 兜底过期时间，正常由爬虫写入时失效
+
+
+def problem_detail_cache_key(problem_id) -> str:
+    return f'{PROBLEM_DETAIL_CACHE_PREFIX}:{problem_id}'
+
+
+def build_problem_detail(row: Dict) -> Dict:
+    """
+    生成详情缓存条目 {'data', 'etag', 'last_modified', 'last_modified_ts'}
+    :param row: .values(*DETAIL_VALUE_FIELDS) 的一行
+    """
+    updated_at = row['updated_at']
+    version = f"{row['problem_id']}:{updated_at.isoformat()}"
+    return {
+        'data': serialize_problem_detail(row),
+        'etag': '"{}"'.format(hashlib.sha256(version.encode('utf-8')).hexdigest()[:32]),
+        'last_modified': http_date(updated_at.timestamp()),
+        'last_modified_ts': int(updated_at.timestamp()),
+    }
+
+
+def get_problem_detail(problem_id: int) -> Optional[Dict]:
+    """读取题目详情（缓存未命中时查库并回填），题目不存在时返回None"""
+    key = problem_detail_cache_key(problem_id)
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"读取题目详情缓存失败: {e}")
+        entry = None
+    if entry is not None:
+        return entry
+
+    row = LeetCodeProblem.objects.filter(problem_id=problem_id).values(*DETAIL_VALUE_FIELDS).first()
+    if row is None:
+        return None
+    entry = build_problem_detail(row)
+    try:
+        cache.set(key, entry, PROBLEM_DETAIL_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"写入题目详情缓存失败: {e}")
+    return entry
+
+
+def _weak(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(headers, entry: Dict) -> bool:
+    """
+    根据条件请求头判断客户端缓存是否仍然有效
+    有 If-None-Match 时只比较ETag（按RFC 9110使用弱比较：忽略 W/ 前缀，
+    代理或GZip中间件会把ETag改为弱校验值），否则比较 If-Modified-Since
+    """
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        tags = parse_etags(if_none_match)
+        return '*' in tags or _weak(entry['etag']) in {_weak(tag) for tag in tags}
+    if_modified_since = parse_http_date_safe(headers.get('If-Modified-Since') or '')
+    return if_modified_since is not None and entry['last_modified_ts'] <= if_modified_since
+
+
+def invalidate_problem_details(problem_ids):
+    try:
+        cache.delete_many([problem_detail_cache_key(problem_id) for problem_id in problem_ids])
+    except Exception as e:
+        logger.warning(f"删除题目详情缓存失败: {e}")
+
+
+@receiver(problems_synced)
+def invalidate_details_on_sync(sender, problem_ids=None, **kwargs):
+    """爬虫写入题目后删除对应的详情缓存"""
+    if problem_ids:
+        invalidate_problem_details(problem_ids)
+
+
+@receiver(post_save, sender=LeetCodeProblem)
+@receiver(post_delete, sender=LeetCodeProblem)
+def invalidate_detail_on_change(sender, instance, **kwargs):
+    """单独保存或删除题目（如后台编辑）时删除详情缓存"""
+    invalidate_problem_details([instance.problem_id])
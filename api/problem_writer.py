@@ -0,0 +1,157 @@
+# api/problem_writer.py
+"""
+题目批量写入
+
+爬虫解析出的题目先缓存在内存中，攒够一批后：
+- 标签在内存中去重，一次 bulk_create(ignore_conflicts=True) 写入
+- 题目一次 bulk_create(update_conflicts=True) 按 problem_id 做 upsert
+- 题目-标签关联按批整体替换
+每批固定几次查询，不再随题目数和标签数线性增长。
+"""
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+
+from .models import LeetCodeProblem, ProblemTag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200
+
+# 冲突时需要更新的字段（created_at 保持首次写入的值）
+UPSERT_UPDATE_FIELDS = [
+    'title', 'title_slug', 'difficulty', 'is_premium', 'content',
+    'acceptance_rate', 'submission_count', 'accepted_count', 'tags',
+    'search_title', 'search_content', 'source_hash', 'updated_at',
+]
+
+
+def compute_source_hash(entry: Dict) -> str:
+    """
+    计算题目列表项的指纹（标题、难度、会员、通过率、标签）
+    通过率保留一位小数，避免每次提交带来的微小波动触发重新抓取
+    """
+    fingerprint = {
+        'title': entry.get('title'),
+        'titleSlug': entry.get('titleSlug'),
+        'difficulty': entry.get('difficulty'),
+        'paidOnly': bool(entry.get('paidOnly')),
+        'acRate': round(float(entry.get('acRate') or 0), 1),
+        'tags': sorted(tag['slug'] for tag in entry.get('topicTags') or []),
+    }
+    raw = json.dumps(fingerprint, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def filter_changed(entries: List[Dict]) -> List[Dict]:
+    """
+    从题目列表项中筛选出新增或变化的题目（一次查询，不读取content）
+    库中没有描述的题目（如简化版爬虫写入的）也视为需要抓取
+    """
+    stored = dict(LeetCodeProblem.objects.filter(
+        problem_id__in=[int(entry['frontendQuestionId']) for entry in entries]
+    ).exclude(content='').values_list('problem_id', 'source_hash'))
+    return [
+        entry for entry in entries
+        if stored.get(int(entry['frontendQuestionId'])) != compute_source_hash(entry)
+    ]
+
+
+class ProblemBatchWriter:
+    """题目和标签的批量upsert写入器"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._problems: Dict[int, Dict] = {}
+        self._problem_tags: Dict[int, List[str]] = {}
+        self._tags: Dict[str, str] = {}
+        self.written_ids: List[int] = []
+        self.success_count = 0
+        self.fail_count = 0
+
+    def __len__(self):
+        """缓冲区中尚未写入的题目数"""
+        return len(self._problems)
+
+    def add(self, problem_dict: Dict, tags: List[Tuple[str, str]]) -> List[int]:
+        """
+        加入一道题目，缓冲区满时自动写入
+        :param problem_dict: LeetCodeProblem 字段字典
+        :param tags: [(slug, name), ...]
+        :return: 本次触发写入的题目ID列表（未触发写入时为空）
+        """
+        problem_id = problem_dict['problem_id']
+        self._problems[problem_id] = problem_dict
+        self._problem_tags[problem_id] = [slug for slug, _ in tags]
+        for slug, name in tags:
+            self._tags.setdefault(slug, name)
+
+        if len(self._problems) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self) -> List[int]:
+        """写入缓冲区中的题目，返回成功写入的题目ID列表"""
+        if not self._problems:
+            return []
+
+        problems, problem_tags, tags = self._problems, self._problem_tags, self._tags
+        self._problems, self._problem_tags, self._tags = {}, {}, {}
+
+        try:
+            with transaction.atomic():
+                self._write_batch(problems, problem_tags, tags)
+        except Exception as e:
+            logger.error(f"批量保存 {len(problems)} 道题目失败: {e}")
+            self.fail_count += len(problems)
+            return []
+
+        written = list(problems)
+        self.written_ids.extend(written)
+        self.success_count += len(written)
+        logger.info(f"批量保存 {len(written)} 道题目，{len(tags)} 个标签")
+        return written
+
+    def close(self) -> List[int]:
+        """写入剩余数据，返回全部成功写入的题目ID"""
+        self.flush()
+        return self.written_ids
+
+    def _write_batch(self, problems, problem_tags, tags):
+        if tags:
+            ProblemTag.objects.bulk_create(
+                [ProblemTag(slug=slug, name=name) for slug, name in tags.items()],
+                ignore_conflicts=True
+            )
+
+        objs = []
+        for problem_dict in problems.values():
+            obj = LeetCodeProblem(**problem_dict)
+            obj.refresh_search_document()
+            objs.append(obj)
+        LeetCodeProblem.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['problem_id'],
+            update_fields=UPSERT_UPDATE_FIELDS
+        )
+
+        # 整批替换题目-标签关联
+        pk_map = dict(LeetCodeProblem.objects.filter(
+            problem_id__in=list(problems)
+        ).values_list('problem_id', 'id'))
+        tag_map = dict(ProblemTag.objects.filter(
+            slug__in=list(tags)
+        ).values_list('slug', 'id'))
+
+        Through = LeetCodeProblem.problem_tags.through
+        Through.objects.filter(leetcodeproblem_id__in=pk_map.values()).delete()
+        Through.objects.bulk_create([
+            Through(leetcodeproblem_id=pk_map[problem_id], problemtag_id=tag_map[slug])
+            for problem_id, slugs in problem_tags.items() if problem_id in pk_map
+            for slug in set(slugs) if slug in tag_map
+        ], ignore_conflicts=True)
@@ -0,0 +1,36 @@
+# api/renderers.py
+"""
+基于 orjson 的 JSON 渲染器
+
+输出与 DRF 默认的 JSONRenderer（UNICODE_JSON + COMPACT_JSON）一致：不转义中文、无多余空白，
+U+2028/U+2029 同样转义（唯一差别是极小/极大浮点数的指数写法，如 1e-7 与 1e-07）。orjson 未安装、请求要求缩进或数据中有 orjson 不支持的类型时，
+回退到 DRF 的实现。
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """使用 orjson 编码的 JSONRenderer"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # 时间类型交给DRF的编码器处理，保证格式一致（毫秒精度、UTC以Z结尾）
+            ret = orjson.dumps(data, default=encoders.JSONEncoder().default,
+                               option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # 与DRF一致：转义JavaScript中非法的行分隔符/段分隔符
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
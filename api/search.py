@@ -0,0 +1,79 @@
+# api/search.py
+"""
+题目全文检索
+
+PostgreSQL 自带的分词器不支持中文，这里在 Python 端先做分词：
+- 去掉题目描述中的 HTML 标签和实体
+- 英文/数字按单词切分并转小写
+- 连续的中日韩字符切成单字 + 相邻二元组（bigram）
+
+分好的词以空格拼接存进 search_title / search_content，再由数据库触发器
+用 'simple' 配置生成 search_vector（GIN 索引），查询时用同样的规则切分检索词。
+"""
+
+import html
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+SEARCH_CONFIG = 'simple'
+
+_CJK_RANGES = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_TAG_RE = re.compile(r'<[^>]+>')
+_CJK_RE = re.compile('[{}]+'.format(_CJK_RANGES))
+_WORD_RE = re.compile(r'[{0}]+|[^\W_{0}]+'.format(_CJK_RANGES))
+
+
+def strip_html(text: str) -> str:
+    """去除HTML标签和实体，返回纯文本"""
+    if not text:
+        return ''
+    return html.unescape(_TAG_RE.sub(' ', text))
+
+
+def tokenize(text: str, for_query: bool = False) -> list:
+    """
+    切分文本为检索词
+    :param text: 纯文本
+    :param for_query: 检索词模式下中文只生成bigram（单字时生成单字），避免匹配过宽
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text or ''):
+        if not _CJK_RE.fullmatch(word):
+            tokens.append(word.lower())
+            continue
+        bigrams = [word[i:i + 2] for i in range(len(word) - 1)]
+        if for_query:
+            tokens.extend(bigrams or [word])
+        else:
+            tokens.extend(word)
+            tokens.extend(bigrams)
+    return tokens
+
+
+def build_search_document(title: str, content: str):
+    """生成 (search_title, search_content)，供保存题目时写入"""
+    return (
+        ' '.join(tokenize(title)),
+        ' '.join(tokenize(strip_html(content)))
+    )
+
+
+def build_search_query(term: str):
+    """把用户输入转换为tsquery，没有有效检索词时返回None"""
+    tokens = list(dict.fromkeys(tokenize(term, for_query=True)))
+    if not tokens:
+        return None
+    raw = ' & '.join("'{}'".format(token.replace("'", "''")) for token in tokens)
+    return SearchQuery(raw, search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_problems(queryset, term: str):
+    """按相关度检索题目，标题命中权重高于描述"""
+    query = build_search_query(term)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    ).order_by('-rank', 'problem_id')
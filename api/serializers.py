@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import CustomUser, LeetCodeProblem, ProblemTag
+from .models import CustomUser, LeetCodeProblem, ProblemTag, HintRequest
 
 class UserRegisterSerializer(serializers.ModelSerializer):
     """用户注册序列化器"""
@@ -121,4 +121,43 @@ class LeetCodeProblemListSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'problem_id', 'title', 'title_slug', 'difficulty', 'difficulty_display',
             'is_premium', 'acceptance_rate', 'tags', 'url'
-        )
\ No newline at end of file
+        )
+
+
+class HintRequestCreateSerializer(serializers.Serializer):
+    """提交提示请求序列化器"""
+    question = serializers.CharField(required=True, max_length=2000, help_text='学生问题')
+    problem_id = serializers.IntegerField(required=False, help_text='关联的LeetCode题目ID')
+    code = serializers.CharField(required=False, allow_blank=True, max_length=20000, help_text='学生当前代码')
+
+    def validate_problem_id(self, value):
+        problem = LeetCodeProblem.objects.filter(problem_id=value).first()
+        if problem is None:
+            raise serializers.ValidationError("题目不存在")
+        return problem
+
+
+class HomeworkSubmitSerializer(serializers.Serializer):
+    """提交作业批改序列化器"""
+    problem_id = serializers.IntegerField(required=True, help_text='LeetCode题目ID')
+    code = serializers.CharField(required=True, max_length=20000, help_text='学生代码')
+
+    def validate_problem_id(self, value):
+        problem = LeetCodeProblem.objects.filter(problem_id=value).first()
+        if problem is None:
+            raise serializers.ValidationError("题目不存在")
+        return problem
+
+
+class HintRequestSerializer(serializers.ModelSerializer):
+    """提示请求结果序列化器"""
+    job_id = serializers.UUIDField(source='id', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    problem_id = serializers.IntegerField(source='problem.problem_id', read_only=True, default=None)
+
+    class Meta:
+        model = HintRequest
+        fields = (
+            'job_id', 'problem_id', 'question', 'status', 'status_display',
+            'answer', 'error', 'created_at', 'finished_at'
+        )
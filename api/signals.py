@@ -0,0 +1,6 @@
+# api/signals.py
+from django.dispatch import Signal
+
+# 爬虫写入题目后发送，参数 problem_ids 为本次写入的题目ID列表
+# 统计快照等派生缓存监听该信号进行刷新
+problems_synced = Signal()
@@ -0,0 +1,85 @@
+# api/stats.py
+"""
+题目统计快照
+
+统计数据只在爬虫写入题目时变化，因此预先计算好整份结果放进Redis，
+统计接口只需一次缓存读取；爬虫写入后通过 problems_synced 信号刷新快照。
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.dispatch import receiver
+
+from .models import LeetCodeProblem, ProblemTag
+from .signals import problems_synced
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY = 'leetcode:stats'
+STATS_CACHE_TIMEOUT = 24 * 3600  # 兜底过期时间，正常由爬虫写入时刷新
+
+
+def build_problem_stats() -> dict:
+    """从数据库计算统计数据（难度/会员分布合并为一次条件聚合查询）"""
+    counts = LeetCodeProblem.objects.aggregate(
+        total=Count('id'),
+        easy=Count('id', filter=Q(difficulty='easy')),
+        medium=Count('id', filter=Q(difficulty='medium')),
+        hard=Count('id', filter=Q(difficulty='hard')),
+        premium=Count('id', filter=Q(is_premium=True)),
+    )
+
+    # 获取热门标签
+    popular_tags = ProblemTag.objects.annotate(
+        problem_count=Count('problems')
+    ).filter(problem_count__gt=0).order_by('-problem_count')[:10]
+
+    tag_stats = [
+        {
+            'name': tag.name,
+            'slug': tag.slug,
+            'count': tag.problem_count
+        }
+        for tag in popular_tags
+    ]
+
+    return {
+        'total_problems': counts['total'],
+        'difficulty_distribution': {
+            'easy': counts['easy'],
+            'medium': counts['medium'],
+            'hard': counts['hard']
+        },
+        'premium_problems': counts['premium'],
+        'popular_tags': tag_stats
+    }
+
+
+def refresh_problem_stats() -> dict:
+    """重新计算并写入统计快照"""
+    stats = build_problem_stats()
+    try:
+        cache.set(STATS_CACHE_KEY, stats, STATS_CACHE_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"写入统计快照失败: {e}")
+    return stats
+
+
+def get_problem_stats() -> dict:
+    """读取统计快照，缓存缺失或不可用时回源数据库"""
+    try:
+        stats = cache.get(STATS_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f"读取统计快照失败: {e}")
+        return build_problem_stats()
+    if stats is None:
+        stats = refresh_problem_stats()
+    return stats
+
+
+@receiver(problems_synced)
+def refresh_stats_on_sync(sender, **kwargs):
+    """爬虫写入题目后刷新统计快照"""
+    refresh_problem_stats()
@@ -0,0 +1,111 @@
+# api/task_routing.py
+"""
+Celery 队列与优先级
+
+队列划分（路由规则见 settings.CELERY_TASK_ROUTES）：
+- hints：学生提示，交互式请求，对延迟最敏感
+- grading：作业批改，CPU密集
+- scraping：题目爬取/同步，批量任务
+- default：其他任务
+每个队列由独立的worker消费，并发数和预取数分别配置（见 AiCooding/celery_app.py）。
+
+优先级：Redis broker 按 priority_steps 把每个队列拆成多个子队列，数字越小越先被消费。
+
+按用户公平调度：提交任务时按 (队列, 用户) 记录在途任务数，
+- 用户的在途任务越多，新任务的优先级越低，其他用户的任务会先被执行
+- 超过上限时拒绝提交（UserQuotaExceeded）
+任务结束后（task_postrun）计数减一；计数键带过期时间，worker异常退出时也能自动恢复。
+"""
+
+import logging
+
+from celery.signals import task_postrun
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_HINTS = 'hints'
+QUEUE_GRADING = 'grading'
+QUEUE_SCRAPING = 'scraping'
+QUEUE_DEFAULT = 'default'
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 3
+PRIORITY_LOW = 6
+PRIORITY_LOWEST = 9
+
+INFLIGHT_KEY_PREFIX = 'celery:inflight'
+INFLIGHT_KEY_TIMEOUT = 3600  # 在途计数的兜底过期时间（秒）
+FAIRNESS_HEADER = 'fairness_key'
+
+
+class UserQuotaExceeded(Exception):
+    """用户在该队列的在途任务数已达上限"""
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def inflight_key(queue: str, user_id) -> str:
+    return f'{INFLIGHT_KEY_PREFIX}:{queue}:{user_id}'
+
+
+def dispatch_user_task(task, args=(), kwargs=None, user_id=None, queue: str = QUEUE_DEFAULT,
+                       priority: int = PRIORITY_NORMAL):
+    """
+    按用户公平地投递任务
+    :param task: Celery任务
+    :param user_id: 提交任务的用户
+    :param queue: 任务所在队列（用于区分各队列的在途上限）
+    :param priority: 用户没有在途任务时的优先级，每多一个在途任务降低一级
+    :return: AsyncResult
+    :raises UserQuotaExceeded: 在途任务数超过 settings.CELERY_USER_MAX_INFLIGHT[queue]
+    """
+    limit = settings.CELERY_USER_MAX_INFLIGHT.get(queue)
+    if user_id is None or limit is None:
+        return task.apply_async(args, kwargs, queue=queue, priority=priority)
+
+    key = inflight_key(queue, user_id)
+    try:
+        redis = _redis()
+        pipe = redis.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, INFLIGHT_KEY_TIMEOUT)
+        inflight = pipe.execute()[0]
+    except Exception as e:
+        # Redis不可用时不做公平调度，直接投递
+        logger.warning(f"更新在途任务数失败: {e}")
+        return task.apply_async(args, kwargs, queue=queue, priority=priority)
+
+    if inflight > limit:
+        redis.decr(key)
+        raise UserQuotaExceeded(f"当前已有 {limit} 个任务在处理中，请稍后再试")
+
+    priority = min(priority + inflight - 1, PRIORITY_LOWEST)
+    try:
+        return task.apply_async(args, kwargs, queue=queue, priority=priority,
+                                headers={FAIRNESS_HEADER: key})
+    except Exception:
+        redis.decr(key)
+        raise
+
+
+@task_postrun.connect
+def release_inflight_slot(sender=None, task=None, state=None, **kwargs):
+    """任务结束后释放用户的在途计数（重试中的任务仍算在途）"""
+    if task is None or state == 'RETRY':
+        return
+    # 自定义消息头在不同Celery版本中位于 request 属性或 request.headers 中
+    request = task.request
+    key = getattr(request, FAIRNESS_HEADER, None) or (getattr(request, 'headers', None) or {}).get(FAIRNESS_HEADER)
+    if not key:
+        return
+    try:
+        redis = _redis()
+        if redis.decr(key) <= 0:
+            redis.delete(key)
+    except Exception as e:
+        logger.warning(f"释放在途任务数失败: {e}")
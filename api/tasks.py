@@ -1,8 +1,13 @@
 # api/tasks.py
-from celery import shared_task
+from celery import shared_task, chord, group
 from django.core.cache import cache
+import logging
 import time
 
+import api.task_routing  # noqa: F401 注册任务结束时释放用户在途计数的信号
+
+logger = logging.getLogger(__name__)
+
 # ===================== 测试任务（先验证Celery是否能跑通） =====================
 @shared_task
 def test_celery_task():
@@ -11,44 +16,317 @@ def test_celery_task():
     cache.set("celery_test", "Celery任务执行成功", 60)  # 往Redis写缓存标记
     return "Celery任务执行完成"
 
-# ===================== 毕业设计核心任务：模拟LLM调用（后续替换为真实Qwen Max） =====================
-@shared_task(bind=True, retry_backoff=3, retry_kwargs={"max_retries": 2})
-def call_qwen_max_task(self, user_id, question):
+# ===================== 毕业设计核心任务：调用大模型生成引导式提示 =====================
+HINT_MAX_RETRIES = 2
+HINT_RETRY_BACKOFF = 3  # 重试间隔为 3 * 2**已重试次数 秒（3秒、6秒）
+
+
+@shared_task(bind=True, max_retries=HINT_MAX_RETRIES)
+def call_qwen_max_task(self, hint_id):
     """
-    异步调用Qwen Max（适配PF教学策略，不直接给答案）
-    :param user_id: 用户ID
-    :param question: 学生的编程问题
+    异步调用大模型生成提示（适配PF教学策略，不直接给答案）
+    :param hint_id: HintRequest 的ID，结果写回该记录
     :return: 引导式回复
     """
+    from celery.exceptions import Retry
+
+    try:
+        return _generate_hint(self, hint_id)
+    except Retry:
+        raise
+    except Exception as e:
+        # 非LLM错误（数据库、序列化等）也要结束请求，否则前端会一直轮询/等待推送
+        _fail_hint_request(hint_id, f"生成提示时发生错误: {e}")
+        raise
+
+
+def _fail_hint_request(hint_id, error):
+    """把未完成的提示请求标记为失败并通知前端（已成功的请求保持不变）"""
+    from django.utils import timezone
+    from api.hint_stream import get_hint_stream_publisher
+    from api.models import HintRequest
+
+    logger.error(f"提示请求失败 {hint_id}: {error}")
+    now = timezone.now()
     try:
-        time.sleep(2)  # 模拟LLM调用耗时
-        # 引导式回复示例（符合PF教学策略）
-        guide_response = f"""
-        你问的问题是：{question}
-        提示：先思考这个问题涉及的核心知识点（如Python循环/函数），尝试写伪代码，再逐步调试。
-        例如：如果是循环问题，先确认循环条件是否正确，再测试边界值。
-        """
-        cache.set(f"llm_response_{user_id}", guide_response, 3600)  # 缓存结果
-        return guide_response
+        updated = HintRequest.objects.filter(id=hint_id).exclude(status__in=("success", "failed")).update(
+            status="failed", error=error, finished_at=now, updated_at=now
+        )
+        if not updated:
+            return
     except Exception as e:
-        self.retry(exc=e)  # 失败自动重试（3秒后重试，最多2次）
+        logger.error(f"标记提示请求失败状态出错 {hint_id}: {e}")
+    try:
+        get_hint_stream_publisher(hint_id).error(error)
+    except Exception as e:
+        logger.error(f"推送提示错误事件失败 {hint_id}: {e}")
+
+
+def _generate_hint(task, hint_id):
+    from django.utils import timezone
+    from api.hint_cache import get_hint_cache
+    from api.hint_stream import get_hint_stream_publisher
+    from api.llm import LLMError, build_hint_messages, get_llm_client
+    from api.models import HintRequest
+
+    hint = HintRequest.objects.select_related("problem").filter(id=hint_id).first()
+    if hint is None or hint.status in ("success", "failed"):
+        return None
+    HintRequest.objects.filter(id=hint_id).update(status="running", updated_at=timezone.now())
+    publisher = get_hint_stream_publisher(hint_id)
+
+    # 排队期间可能已有相同问题生成了提示
+    problem_id = hint.problem.problem_id if hint.problem else None
+    hint_cache = get_hint_cache()
+    answer = hint_cache.get(problem_id, hint.question, hint.code)
+    if answer is not None:
+        hint.status, hint.answer, hint.backend = "success", answer, "cache"
+        hint.finished_at = timezone.now()
+        hint.save(update_fields=["status", "answer", "backend", "finished_at", "updated_at"])
+        publisher.token(answer)
+        publisher.done()
+        return answer
+
+    chunks = []
+    try:
+        client = get_llm_client()  # 进程内复用，避免每次任务重新建立连接
+        # 边生成边推送，前端通过SSE接口实时显示
+        for chunk in client.stream(build_hint_messages(hint.question, hint.problem, hint.code)):
+            chunks.append(chunk)
+            publisher.token(chunk)
+    except LLMError as e:
+        if task.request.retries < task.max_retries:
+            if chunks:
+                publisher.reset()  # 重试会重新生成，通知前端清空已显示的内容
+            # 指数退避重试，学生在等待结果，不能使用Celery默认的180秒间隔
+            raise task.retry(exc=e, countdown=HINT_RETRY_BACKOFF * 2 ** task.request.retries)
+        hint.status, hint.error = "failed", str(e)
+        hint.finished_at = timezone.now()
+        hint.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        publisher.error(str(e))
+        return None
+
+    answer = "".join(chunks)
+    hint_cache.set(problem_id, hint.question, answer, hint.code)
+    hint.status, hint.answer, hint.backend = "success", answer, client.name
+    hint.finished_at = timezone.now()
+    hint.save(update_fields=["status", "answer", "backend", "finished_at", "updated_at"])
+    publisher.done()
+    return answer
 
-# ===================== 毕业设计核心任务：模拟作业批改 =====================
+# ===================== 毕业设计核心任务：作业批改（预热进程池并行执行测试用例） =====================
 @shared_task
-def grade_homework_task(homework_id, student_code):
+def grade_homework_task(homework_id, student_code, problem_id=None):
     """
-    异步批改作业（模拟代码运行+结构化反馈）
+    异步批改作业：用题目的测试用例运行学生代码，生成结构化反馈
     :param homework_id: 作业ID
     :param student_code: 学生提交的代码
-    :return: 批改结果
-    """
-    time.sleep(4)  # 模拟批改耗时
-    # 结构化反馈示例（适配PF教学策略）
-    feedback = {
-        "score": 85,
-        "error_analysis": "代码逻辑正确，但缺少异常处理（如输入非数字时的报错）",
-        "guide": "建议添加try-except语句捕获异常，提升代码健壮性",
-        "standard_solution": "def solve():\n    try:\n        num = int(input())\n        print(num*2)\n    except ValueError:\n        print('请输入有效数字')"
-    }
+    :param problem_id: LeetCode题目ID，用于查找测试用例
+    :return: 批改结果（score/passed/total/error_analysis/guide/cases）
+    """
+    from api.grading import grade_submission
+    from api.models import ProblemTestCase
+
+    test_cases = ProblemTestCase.objects.filter(problem__problem_id=problem_id) if problem_id else []
+    feedback = grade_submission(student_code, test_cases)
     cache.set(f"homework_feedback_{homework_id}", feedback, 86400)  # 缓存批改结果
-    return feedback
\ No newline at end of file
+    return feedback
+
+# ===================== 分布式爬取：协调任务 -> 分片抓取任务（chord） -> 汇总任务 =====================
+SCRAPE_RATE_LIMIT_KEY = "scrape:rate_limiter"
+DEFAULT_SCRAPE_CHUNK_SIZE = 50
+
+
+def _build_distributed_scraper(rps, detail_batch_size=None):
+    """创建使用Redis全局令牌桶的爬虫（所有worker共享同一个速率上限）"""
+    from django_redis import get_redis_connection
+    from tools.leetcode_scraper import LeetCodeScraper, DEFAULT_DETAIL_BATCH_SIZE
+    from tools.rate_limiter import RedisTokenBucket
+
+    rate_limiter = RedisTokenBucket(get_redis_connection("default"), SCRAPE_RATE_LIMIT_KEY, rps)
+    return LeetCodeScraper(
+        rate_limiter=rate_limiter,
+        detail_batch_size=detail_batch_size or DEFAULT_DETAIL_BATCH_SIZE
+    )
+
+
+@shared_task(bind=True)
+def scrape_coordinator_task(self, limit=200, full=False, chunk_size=DEFAULT_SCRAPE_CHUNK_SIZE,
+                            rps=None, detail_batch_size=None):
+    """
+    分布式爬取协调任务：获取题目列表，按分片分发详情抓取任务，最后由汇总任务生成结果
+    :param limit: 爬取题目数量限制
+    :param full: 为False时只抓取新增或变化的题目
+    :param chunk_size: 每个抓取任务处理的题目数
+    :param rps: 所有worker共享的每秒请求数上限
+    :return: 与 run_scraper 相同结构的结果字典（通过replace由汇总任务返回）
+    """
+    from api.problem_writer import filter_changed
+    from tools.leetcode_scraper import DEFAULT_RPS
+
+    rps = DEFAULT_RPS if rps is None else rps
+    scraper = _build_distributed_scraper(rps)
+    problems_list = scraper.get_problems_list(limit)
+    if not problems_list:
+        return {"success": False, "message": "无法获取题目列表"}
+
+    total = len(problems_list)
+    changed = problems_list if full else filter_changed(problems_list)
+    chunks = [changed[i:i + chunk_size] for i in range(0, len(changed), chunk_size)]
+    body = aggregate_scrape_results_task.s(total=total, unchanged_count=total - len(changed))
+    if not chunks:
+        return aggregate_scrape_results_task([], total=total, unchanged_count=total - len(changed))
+
+    # 用chord替换当前任务：协调任务的结果即为汇总任务的结果
+    header = group(scrape_detail_chunk_task.s(chunk, rps, detail_batch_size) for chunk in chunks)
+    return self.replace(chord(header, body))
+
+
+@shared_task(acks_late=True)
+def scrape_detail_chunk_task(entries, rps=None, detail_batch_size=None):
+    """
+    抓取一个分片的题目详情并批量写库
+    :param entries: 题目列表项
+    :return: {'success_count', 'fail_count', 'problem_ids'}
+    """
+    from api.problem_writer import ProblemBatchWriter
+    from tools.leetcode_scraper import DEFAULT_RPS
+
+    scraper = _build_distributed_scraper(DEFAULT_RPS if rps is None else rps, detail_batch_size)
+    writer = ProblemBatchWriter(batch_size=len(entries) or 1)
+    fail_count = 0
+
+    size = scraper.detail_batch_size
+    for i in range(0, len(entries), size):
+        batch = entries[i:i + size]
+        details = scraper.get_problem_details([entry['titleSlug'] for entry in batch])
+        for entry in batch:
+            detail = details.get(entry['titleSlug'])
+            if not detail:
+                fail_count += 1
+                continue
+            try:
+                writer.add(*scraper.parse_problem(scraper.merge_list_entry(detail, entry)))
+            except Exception as e:
+                logger.error(f"处理题目失败 {entry['titleSlug']}: {e}")
+                fail_count += 1
+
+    problem_ids = writer.close()
+    return {
+        "success_count": writer.success_count,
+        "fail_count": fail_count + writer.fail_count,
+        "problem_ids": problem_ids,
+    }
+
+
+@shared_task
+def aggregate_scrape_results_task(chunk_results, total=0, unchanged_count=0):
+    """汇总各分片结果，通知派生缓存刷新，返回与 run_scraper 相同结构的结果"""
+    from api.signals import problems_synced
+
+    success_count = sum(result["success_count"] for result in chunk_results)
+    fail_count = sum(result["fail_count"] for result in chunk_results)
+    problem_ids = [pid for result in chunk_results for pid in result["problem_ids"]]
+
+    if problem_ids:
+        problems_synced.send(sender=aggregate_scrape_results_task, problem_ids=problem_ids)
+
+    return {
+        "success": True,
+        "total": total,
+        "success_count": success_count,
+        "fail_count": fail_count,
+        "unchanged_count": unchanged_count,
+        "message": f"爬取完成！成功: {success_count}, 失败: {fail_count}, 未变化: {unchanged_count}"
+    }
+
+
+# ===================== 定时增量同步：Redis锁防止重叠，记录每次运行情况 =====================
+SCRAPE_SYNC_LOCK_KEY = "scrape:sync_lock"
+SCRAPE_LOCK_HELD_MESSAGE = "已有同步正在运行（定时同步或其他手动爬取），请稍后再试"
+
+
+def acquire_scrape_sync_lock():
+    """
+    获取同步锁（不等待）：定时同步和手动爬取共用同一把锁和同一个断点，不能同时运行
+    :return: 锁对象，已被占用时返回None
+    """
+    from django.conf import settings
+
+    lock = cache.lock(SCRAPE_SYNC_LOCK_KEY, timeout=settings.SCRAPE_SYNC_LOCK_TIMEOUT)
+    return lock if lock.acquire(blocking=False) else None
+
+
+def is_scrape_sync_locked() -> bool:
+    return cache.lock(SCRAPE_SYNC_LOCK_KEY).locked()
+
+
+def release_scrape_sync_lock(lock):
+    from redis.exceptions import LockError
+
+    try:
+        lock.release()
+    except LockError:
+        pass  # 同步耗时超过锁的过期时间，锁已被自动释放
+    except Exception as e:
+        logger.warning(f"释放同步锁失败: {e}")  # 锁会在过期后自动释放
+
+
+def _finish_scrape_run(run, result, started):
+    """根据爬虫结果补全运行记录"""
+    from django.utils import timezone
+
+    duration = time.monotonic() - started
+    metrics = result.get("metrics", {})
+    request_count = metrics.get("http", {}).get("requests", 0)
+    total = result.get("total", 0)
+
+    run.status = "success" if result.get("success") else "failed"
+    run.finished_at = timezone.now()
+    run.duration_seconds = round(duration, 3)
+    run.total_count = total
+    run.changed_count = total - result.get("unchanged_count", 0)
+    run.success_count = result.get("success_count", 0)
+    run.fail_count = result.get("fail_count", 0)
+    run.request_count = request_count
+    run.requests_per_second = round(request_count / duration, 3) if duration > 0 else 0.0
+    run.message = result.get("message", "")
+    run.metrics = metrics
+    run.save()
+
+
+@shared_task
+def scheduled_sync_task(limit=None):
+    """
+    定时增量同步（由celery beat按 SCRAPE_SYNC_INTERVAL_MINUTES 触发）
+    上一次同步仍在运行时直接跳过，保证任意时刻最多只有一个同步
+    :param limit: 爬取题目数量限制，默认取 SCRAPE_SYNC_LIMIT
+    :return: 与 run_scraper 相同结构的结果字典，额外包含运行记录ID
+    """
+    from django.conf import settings
+    from api.models import ScrapeRun
+    from tools.leetcode_scraper import run_scraper
+
+    lock = acquire_scrape_sync_lock()
+    if lock is None:
+        return {"success": False, "message": "上一次同步仍在运行，本次跳过"}
+
+    run = ScrapeRun.objects.create(trigger="beat", full=False)
+    started = time.monotonic()
+    try:
+        result = run_scraper(
+            limit=limit or settings.SCRAPE_SYNC_LIMIT,
+            concurrency=settings.SCRAPE_SYNC_CONCURRENCY,
+            rps=settings.SCRAPE_SYNC_RPS,
+            full=False
+        )
+    except Exception as e:
+        result = {"success": False, "message": f"同步异常: {e}"}
+        _finish_scrape_run(run, result, started)
+        raise
+    finally:
+        release_scrape_sync_lock(lock)
+
+    _finish_scrape_run(run, result, started)
+    result["run_id"] = run.id
+    return result
@@ -0,0 +1,169 @@
+import unittest
+from unittest import mock
+
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+from api import catalog_snapshot
+from api.catalog_snapshot import CATALOG_CURRENT_KEY, build_catalog_snapshot, query_catalog_snapshot
+from api.models import CustomUser, LeetCodeProblem, ProblemTag
+from api.views import LeetCodeProblemListView
+
+try:
+    import fakeredis
+except ImportError:  # fakeredis 为测试可选依赖
+    fakeredis = None
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+
+def create_problems(count=23):
+    array = ProblemTag.objects.create(name='数组', slug='array')
+    graph = ProblemTag.objects.create(name='图', slug='graph')
+    # 题号不连续，游标分页不能依赖题号相邻
+    for i in range(count):
+        problem_id = i * 3 + 1
+        problem = LeetCodeProblem.objects.create(
+            problem_id=problem_id,
+            title=f'Problem {problem_id}',
+            title_slug=f'problem-{problem_id}',
+            difficulty=DIFFICULTIES[i % 3],
+            is_premium=i % 4 == 0,
+            acceptance_rate=round(30 + i * 1.37, 2),
+            tags=['array'] if i % 2 else ['array', 'graph'],
+        )
+        problem.problem_tags.add(array)
+        if i % 2 == 0:
+            problem.problem_tags.add(graph)
+
+
+@unittest.skipIf(fakeredis is None, '需要安装 fakeredis')
+class CatalogSnapshotTestCase(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(catalog_snapshot, '_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class SnapshotParityTests(CatalogSnapshotTestCase):
+    """快照分页结果与数据库查询一致"""
+
+    FILTERS = [
+        {},
+        {'difficulty': 'medium'},
+        {'is_premium': 'true'},
+        {'is_premium': 'false'},
+        {'tag': 'graph'},
+        {'difficulty': 'easy', 'tag': 'graph'},
+        {'difficulty': 'hard', 'is_premium': 'False', 'tag': 'array'},
+        {'tag': 'missing'},
+    ]
+
+    def setUp(self):
+        super().setUp()
+        create_problems()
+        build_catalog_snapshot()
+        self.view = LeetCodeProblemListView()
+
+    def assert_same_page(self, params, filters, fields=None, cursor_mode=False):
+        snapshot = query_catalog_snapshot(params, fields=fields, cursor_mode=cursor_mode, **filters)
+        database = self.view._query_database(
+            params, filters.get('difficulty'), filters.get('is_premium'), None, filters.get('tag'),
+            fields, cursor_mode
+        )
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(snapshot, database)
+        return snapshot
+
+    def test_offset_pages(self):
+        for filters in self.FILTERS:
+            for page in (1, 2, 3, 10):
+                with self.subTest(filters=filters, page=page):
+                    self.assert_same_page({'page': str(page), 'page_size': '4'}, filters)
+
+    def test_fields_projection(self):
+        for fields in (['problem_id'], ['title', 'tags'], ['difficulty', 'acceptance_rate']):
+            with self.subTest(fields=fields):
+                self.assert_same_page({'page_size': '5'}, {'tag': 'graph'}, fields=fields)
+                self.assert_same_page({'page_size': '5'}, {'difficulty': 'easy'}, fields=fields,
+                                      cursor_mode=True)
+
+    def test_cursor_walk_forward_and_back(self):
+        for filters in self.FILTERS:
+            with self.subTest(filters=filters):
+                params = {'page_size': '3'}
+                pages = []
+                while True:
+                    items, pagination = self.assert_same_page(params, filters, cursor_mode=True)
+                    pages.append(pagination)
+                    if not pagination['next']:
+                        break
+                    params = {'page_size': '3', 'cursor': pagination['next']}
+
+                # 从最后一页沿 prev 游标走回第一页
+                pagination = pages[-1]
+                while pagination['prev']:
+                    params = {'page_size': '3', 'cursor': pagination['prev']}
+                    _, pagination = self.assert_same_page(params, filters, cursor_mode=True)
+
+
+class SnapshotInvalidationTests(CatalogSnapshotTestCase):
+    """单独修改题目后重新生成快照"""
+
+    def setUp(self):
+        super().setUp()
+        create_problems(count=5)
+        build_catalog_snapshot()
+
+    def snapshot_titles(self, **filters):
+        items, _ = query_catalog_snapshot({'page_size': '50'}, fields=['title'], **filters)
+        return [item['title'] for item in items]
+
+    def test_save_rebuilds_on_commit(self):
+        problem = LeetCodeProblem.objects.get(problem_id=1)
+        problem.title = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            problem.save()
+        self.assertEqual(self.snapshot_titles()[0], 'Renamed')
+
+    def test_delete_rebuilds_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            LeetCodeProblem.objects.get(problem_id=1).delete()
+        self.assertNotIn('Problem 1', self.snapshot_titles())
+
+    def test_tag_change_rebuilds_on_commit(self):
+        problem = LeetCodeProblem.objects.get(problem_id=4)
+        with self.captureOnCommitCallbacks(execute=True):
+            problem.problem_tags.add(ProblemTag.objects.get(slug='graph'))
+        self.assertIn('Problem 4', self.snapshot_titles(tag='graph'))
+
+    def test_failed_rebuild_disables_snapshot(self):
+        problem = LeetCodeProblem.objects.get(problem_id=1)
+        with mock.patch.object(catalog_snapshot, '_write_snapshot', side_effect=RuntimeError('boom')):
+            with self.captureOnCommitCallbacks(execute=True):
+                problem.save()
+        self.assertIsNone(self.redis.get(CATALOG_CURRENT_KEY))
+        self.assertIsNone(query_catalog_snapshot({}))
+
+
+class PublicListViewTests(CatalogSnapshotTestCase):
+    """列表接口不依赖认证，数据库不可用时仍可从快照返回"""
+
+    def setUp(self):
+        super().setUp()
+        create_problems(count=5)
+        build_catalog_snapshot()
+
+    def test_logged_in_request_does_not_touch_database(self):
+        user = CustomUser.objects.create_user(username='student', password='secret123')
+        self.client.force_login(user)
+        with mock.patch.object(LeetCodeProblemListView, '_query_database',
+                               side_effect=OperationalError('database unavailable')):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('leetcode-problem-list'), {'page_size': '2'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual([item['problem_id'] for item in data['problems']], [1, 4])
+        self.assertEqual(data['pagination']['total_count'], 5)
@@ -0,0 +1,134 @@
+import time
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api import tasks
+from tools.rate_limiter import RedisTokenBucket
+
+try:
+    import fakeredis
+except ImportError:  # fakeredis 为测试可选依赖
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, '需要安装 fakeredis')
+class RedisTokenBucketTests(SimpleTestCase):
+    """Redis全局令牌桶"""
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+    def bucket(self, rate, **kwargs):
+        return RedisTokenBucket(self.redis, 'test:bucket', rate, **kwargs)
+
+    def test_limits_rate_across_instances(self):
+        # 两个实例（相当于两个worker）共享同一个桶：容量1，之后每秒20个
+        workers = [self.bucket(20, capacity=1, increase_step=0) for _ in range(2)]
+        start = time.monotonic()
+        for i in range(11):
+            workers[i % 2].acquire()
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.45)
+        self.assertLess(elapsed, 2)
+
+    def test_unlimited(self):
+        bucket = self.bucket(0)
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(self.redis.exists('test:bucket'))
+
+    def test_retry_after_pauses_all_workers(self):
+        self.bucket(100).on_throttle(retry_after=0.3)
+        self.assertGreater(self.redis.pttl('test:bucket:pause'), 0)
+        start = time.monotonic()
+        self.bucket(100).acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_pause_is_not_extended_by_later_throttles(self):
+        bucket = self.bucket(100)
+        bucket.on_throttle(retry_after=0.3)
+        bucket.on_throttle(retry_after=30)
+        self.assertLessEqual(self.redis.pttl('test:bucket:pause'), 300)
+
+    def test_throttle_decreases_shared_rate(self):
+        first, second = self.bucket(8, min_rate=1), self.bucket(8, min_rate=1)
+        first.on_throttle()
+        self.assertEqual(second.current_rate(), 4)
+        second.on_throttle()
+        second.on_throttle()
+        second.on_throttle()
+        self.assertEqual(first.current_rate(), 1)
+
+    def test_acquire_increases_rate_up_to_limit(self):
+        bucket = self.bucket(100, increase_step=10)
+        bucket.on_throttle()
+        self.assertEqual(bucket.current_rate(), 50)
+        bucket.acquire()
+        self.assertEqual(bucket.current_rate(), 60)
+        for _ in range(10):
+            bucket.acquire()
+        self.assertEqual(bucket.current_rate(), 100)
+
+
+def list_entries(count):
+    return [{'titleSlug': f'problem-{i}', 'frontendQuestionId': str(i)} for i in range(count)]
+
+
+class CoordinatorChunkingTests(SimpleTestCase):
+    """协调任务按分片分发详情抓取任务"""
+
+    def run_coordinator(self, entries, changed=None, **kwargs):
+        scraper = mock.Mock()
+        scraper.get_problems_list.return_value = entries
+        with mock.patch.object(tasks, '_build_distributed_scraper', return_value=scraper), \
+                mock.patch('api.problem_writer.filter_changed',
+                           return_value=entries if changed is None else changed), \
+                mock.patch.object(tasks, 'chord', side_effect=lambda header, body: (header, body)), \
+                mock.patch.object(tasks.scrape_coordinator_task, 'replace', side_effect=lambda sig: sig):
+            return tasks.scrape_coordinator_task(**kwargs)
+
+    def test_splits_changed_entries_into_chunks(self):
+        entries = list_entries(7)
+        header, body = self.run_coordinator(entries, changed=entries[:5], limit=7, chunk_size=2, rps=3)
+        chunks = [signature.args for signature in header.tasks]
+        self.assertEqual([len(chunk) for chunk, _, _ in chunks], [2, 2, 1])
+        self.assertEqual([entry for chunk, _, _ in chunks for entry in chunk], entries[:5])
+        self.assertTrue(all(rps == 3 for _, rps, _ in chunks))
+        self.assertEqual(body.kwargs, {'total': 7, 'unchanged_count': 2})
+
+    def test_full_ignores_change_filter(self):
+        entries = list_entries(4)
+        header, _ = self.run_coordinator(entries, changed=entries[:1], full=True, chunk_size=3)
+        self.assertEqual([len(signature.args[0]) for signature in header.tasks], [3, 1])
+
+    def test_nothing_changed_aggregates_directly(self):
+        with mock.patch('api.signals.problems_synced.send') as send:
+            result = self.run_coordinator(list_entries(3), changed=[], chunk_size=2)
+        self.assertEqual(result['unchanged_count'], 3)
+        self.assertEqual(result['success_count'], 0)
+        send.assert_not_called()
+
+    def test_list_failure(self):
+        self.assertFalse(self.run_coordinator([])['success'])
+
+
+class DetailChunkTaskTests(SimpleTestCase):
+    """分片任务记录处理失败的题目"""
+
+    def test_parse_failure_is_logged_with_slug(self):
+        scraper = mock.Mock(detail_batch_size=10)
+        scraper.get_problem_details.return_value = {'problem-0': {'titleSlug': 'problem-0'}}
+        scraper.parse_problem.side_effect = ValueError('bad content')
+        writer = mock.Mock(success_count=0, fail_count=0)
+        writer.close.return_value = []
+        with mock.patch.object(tasks, '_build_distributed_scraper', return_value=scraper), \
+                mock.patch('api.problem_writer.ProblemBatchWriter', return_value=writer), \
+                self.assertLogs('api.tasks', level='ERROR') as logs:
+            result = tasks.scrape_detail_chunk_task(list_entries(2))
+
+        self.assertEqual(result['fail_count'], 2)
+        self.assertIn('处理题目失败 problem-0: bad content', logs.output[0])
@@ -0,0 +1,123 @@
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from api.grading import GradingPool, build_feedback, get_grading_pool, grade_submission
+from api.models import LeetCodeProblem, ProblemTestCase
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), '判题沙箱依赖Linux的fork/rlimit/命名空间')
+class GradingSandboxTests(SimpleTestCase):
+    """在预热进程池中实际执行学生代码"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = GradingPool(size=2, time_limit=1.0, memory_limit_mb=128)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        super().tearDownClass()
+
+    def _run(self, code, *args, entry_point='solve'):
+        return self.pool.run(code, [{'id': 1, 'entry_point': entry_point, 'args': list(args)}])[0]
+
+    def test_correct_answer_is_accepted(self):
+        code = 'class Solution:\n    def twoSum(self, nums, target):\n        seen = {}\n' \
+               '        for i, n in enumerate(nums):\n            if target - n in seen:\n' \
+               '                return [seen[target - n], i]\n            seen[n] = i\n'
+        test_case = SimpleNamespace(id=1, args=[[2, 7, 11, 15], 9], expected=[0, 1], is_hidden=False)
+        results = self.pool.run(code, [{'id': 1, 'entry_point': 'Solution.twoSum', 'args': test_case.args}])
+
+        feedback = build_feedback([test_case], results)
+        self.assertEqual(feedback['cases'][0]['status'], 'passed')
+        self.assertEqual(feedback['score'], 100)
+
+    def test_wrong_answer(self):
+        test_case = SimpleNamespace(id=1, args=[1], expected=2, is_hidden=True)
+        results = self.pool.run('def solve(x):\n    return x\n', [{'id': 1, 'entry_point': 'solve', 'args': [1]}])
+        self.assertEqual(build_feedback([test_case], results)['cases'][0]['status'], 'wrong_answer')
+
+    def test_infinite_loop_times_out(self):
+        result = self._run('def solve():\n    while True:\n        pass\n')
+        self.assertEqual(result['status'], 'timeout')
+
+    def test_sleep_times_out(self):
+        result = self._run('import time\ndef solve():\n    time.sleep(30)\n')
+        self.assertEqual(result['status'], 'timeout')
+
+    def test_excess_allocation_hits_memory_limit(self):
+        result = self._run('def solve():\n    return len(bytearray(512 * 1024 * 1024))\n')
+        self.assertEqual(result['status'], 'memory_limit')
+
+    def test_child_environment_is_empty(self):
+        result = self._run('import os\ndef solve():\n    return dict(os.environ)\n')
+        self.assertEqual(result['status'], 'ok', result.get('error'))
+        self.assertEqual(result['result'], {})
+
+    def test_network_is_unreachable(self):
+        code = ('import socket\n'
+                'def solve():\n'
+                '    try:\n'
+                '        socket.create_connection(("1.1.1.1", 53), timeout=0.5).close()\n'
+                '        return "connected"\n'
+                '    except OSError:\n'
+                '        return "blocked"\n')
+        result = self._run(code)
+        self.assertEqual(result['status'], 'ok', result.get('error'))
+        self.assertEqual(result['result'], 'blocked')
+
+    @unittest.skipUnless(os.geteuid() == 0, '只有root运行时才会切换用户')
+    def test_runs_as_unprivileged_user(self):
+        result = self._run('import os\ndef solve():\n    return [os.getuid(), os.geteuid(), os.getgid()]\n')
+        self.assertEqual(result['status'], 'ok', result.get('error'))
+        self.assertNotIn(0, result['result'])
+
+    @unittest.skipUnless(os.geteuid() == 0, '只有root运行时才会检查低权限用户')
+    def test_refuses_root_without_sandbox_user(self):
+        pool = GradingPool(size=1, time_limit=1.0, memory_limit_mb=128, sandbox_user=None)
+        try:
+            result = pool.run('def solve():\n    return 1\n', [{'id': 1, 'entry_point': 'solve', 'args': []}])[0]
+        finally:
+            pool.close()
+        self.assertEqual(result['status'], 'system_error')
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), '判题沙箱依赖Linux的fork/rlimit/命名空间')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GradingResultCacheTests(TestCase):
+    """重复提交的结果缓存"""
+
+    @classmethod
+    def setUpTestData(cls):
+        problem = LeetCodeProblem.objects.create(problem_id=1, title='Echo', title_slug='echo', difficulty='easy')
+        ProblemTestCase.objects.create(problem=problem, entry_point='solve', args=[1], expected=1)
+        ProblemTestCase.objects.create(problem=problem, entry_point='solve', args=[2], expected=2)
+        cls.problem = problem
+
+    def _grade(self, code):
+        return grade_submission(code, self.problem.test_cases.all())
+
+    def test_identical_resubmission_is_cached(self):
+        first = self._grade('def solve(x):\n    return x\n')
+        second = self._grade('def solve(x):\n    # 注释不影响缓存\n    return x\n')
+        self.assertEqual(first['score'], 100)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+
+    def test_timeouts_are_not_cached(self):
+        code = 'def solve(x):\n    while x:\n        pass\n'
+        self.assertEqual(self._grade(code)['cases'][0]['status'], 'timeout')
+        self.assertFalse(self._grade(code)['cached'])
+
+    def test_changed_limits_bypass_cache(self):
+        code = 'def solve(x):\n    return x + 0\n'
+        self._grade(code)
+        with mock.patch.dict(get_grading_pool().limits, memory_limit_mb=64):
+            self.assertFalse(self._grade(code)['cached'])
+        self.assertTrue(self._grade(code)['cached'])
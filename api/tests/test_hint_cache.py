@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api.hint_cache import HintCache, _decode, normalize_question, question_digest
+
+try:
+    import fakeredis
+except ImportError:  # fakeredis 为测试可选依赖
+    fakeredis = None
+
+
+class NormalizeQuestionTests(SimpleTestCase):
+    """问题文本归一化"""
+
+    def test_case_width_and_punctuation(self):
+        self.assertEqual(normalize_question('  ＴＷＯ　Sum，怎么做？？ '), 'two sum 怎么做')
+        self.assertEqual(normalize_question('Two-Sum!!!'), 'two sum')
+
+    def test_digest_ignores_spacing_and_punctuation(self):
+        self.assertEqual(question_digest('两数之和 怎么做？'), question_digest('两数之和怎么做'))
+        self.assertEqual(question_digest('How to start?'), question_digest('how  to START'))
+        self.assertNotEqual(question_digest('两数之和怎么做'), question_digest('三数之和怎么做'))
+
+    def test_digest_includes_code(self):
+        code = 'def solve(nums):\n    return nums\n'
+        self.assertEqual(question_digest('为什么错', code), question_digest('为什么错', code.replace('\n', '   \n')))
+        self.assertNotEqual(question_digest('为什么错', code), question_digest('为什么错'))
+        self.assertNotEqual(question_digest('为什么错', code), question_digest('为什么错', 'def solve(): pass'))
+
+
+@unittest.skipIf(fakeredis is None, '需要安装 fakeredis')
+class HintCacheTests(SimpleTestCase):
+    """缓存命中/未命中与淘汰"""
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        self.cache = HintCache(self.redis, ttl=60, max_entries=100, similarity_threshold=0.9)
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get(1, '两数之和应该怎么入手'))
+        self.cache.set(1, '两数之和应该怎么入手', '先想想哈希表')
+        self.assertEqual(self.cache.get(1, '两数之和应该怎么入手'), '先想想哈希表')
+        self.assertEqual(self.cache.get(1, '两数之和，应该怎么入手？'), '先想想哈希表')
+
+    def test_scoped_by_problem(self):
+        self.cache.set(1, '应该怎么入手', '提示1')
+        self.assertIsNone(self.cache.get(2, '应该怎么入手'))
+        self.assertIsNone(self.cache.get(None, '应该怎么入手'))
+
+    def test_near_duplicate_question(self):
+        self.cache.set(1, '这道题用双指针应该怎么做', '先排序')
+        self.assertEqual(self.cache.get(1, '这道题用双指针应该怎么做呢'), '先排序')
+        self.assertIsNone(self.cache.get(1, '动态规划的状态转移方程是什么'))
+
+    def test_questions_with_code_only_match_exactly(self):
+        self.cache.set(1, '为什么超时', '复杂度太高', code='for i in a: pass')
+        self.assertEqual(self.cache.get(1, '为什么超时', code='for i in a: pass'), '复杂度太高')
+        self.assertIsNone(self.cache.get(1, '为什么超时', code='while True: pass'))
+        self.assertIsNone(self.cache.get(1, '为什么超时'))
+
+    def test_entries_expire(self):
+        self.cache.set(1, '怎么入手', '提示')
+        self.assertLessEqual(self.redis.ttl('hint:cache:entry:1:' + question_digest('怎么入手')), 60)
+
+    def test_evicts_least_recently_used(self):
+        cache = HintCache(self.redis, ttl=60, max_entries=2, similarity_threshold=0.99, semantic=False)
+        cache.set(1, 'question a', 'a')
+        cache.set(1, 'question b', 'b')
+        cache.get(1, 'question a')  # a 最近被访问
+        cache.set(1, 'question c', 'c')
+        self.assertEqual(cache.get(1, 'question a'), 'a')
+        self.assertIsNone(cache.get(1, 'question b'))
+        self.assertEqual(cache.get(1, 'question c'), 'c')
+
+    def test_vectors_capped_per_problem(self):
+        redis = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        cache = HintCache(redis, ttl=60, max_entries=100, similarity_threshold=0.99)
+        first, second = question_digest('二分查找的边界怎么确定'), question_digest('链表怎么判断有环')
+        with mock.patch('api.hint_cache.MAX_VECTORS_PER_PROBLEM', 2):
+            cache.set(1, '二分查找的边界怎么确定', 'a')
+            cache.set(1, '链表怎么判断有环', 'b')
+            # 第一条最近被访问过
+            redis.zadd('hint:cache:lru', {f'1:{first}': 200, f'1:{second}': 100})
+            cache.set(1, '动态规划的状态怎么定义', 'c')
+
+        vectors = {_decode(digest) for digest in redis.hkeys('hint:cache:vec:1')}
+        self.assertEqual(vectors, {first, question_digest('动态规划的状态怎么定义')})
+        # 条目本身不受影响，仍可精确命中
+        self.assertEqual(cache.get(1, '链表怎么判断有环'), 'b')
+
+    def test_redis_errors_count_as_miss(self):
+        class BrokenRedis:
+            def __getattr__(self, name):
+                raise ConnectionError('redis down')
+
+        cache = HintCache(BrokenRedis(), ttl=60, max_entries=10, similarity_threshold=0.9)
+        self.assertIsNone(cache.get(1, '怎么入手'))
+        cache.set(1, '怎么入手', '提示')  # 不抛出异常
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from django.test import TestCase
+
+from api.hint_stream import HintStreamPublisher, hint_stream_key
+from api.models import CustomUser, HintRequest
+from api.views import _hint_event_stream
+
+try:
+    import fakeredis
+    from fakeredis import aioredis as fake_aioredis
+except ImportError:  # fakeredis 为测试可选依赖
+    fakeredis = None
+
+
+def parse_sse(messages):
+    """把SSE消息解析为 [(event, data)]，忽略心跳"""
+    events = []
+    for message in messages:
+        fields = dict(line.split(': ', 1) for line in message.strip().splitlines() if not line.startswith(':'))
+        if fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+@unittest.skipIf(fakeredis is None, '需要安装 fakeredis')
+class HintEventStreamTests(TestCase):
+    """没有结束事件时SSE连接也要结束"""
+
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server)
+        async_redis = fake_aioredis.FakeRedis(server=server, decode_responses=True)
+        for patcher in (
+            mock.patch('api.hint_stream.get_async_redis', return_value=async_redis),
+            mock.patch('api.views.get_async_redis', return_value=async_redis),
+            mock.patch('api.hint_stream.HINT_STREAM_BLOCK_MS', 50),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        user = CustomUser.objects.create_user(username='student', email='student@example.com', password='pw')
+        self.hint = HintRequest.objects.create(user=user, question='怎么入手？', status='running')
+        self.publisher = HintStreamPublisher(self.redis, self.hint.id)
+
+    async def collect(self, last_id='0-0'):
+        async def consume():
+            return [message async for message in _hint_event_stream(self.hint, last_id)]
+
+        return parse_sse(await asyncio.wait_for(consume(), timeout=5))
+
+    async def finish(self, status, **fields):
+        await HintRequest.objects.filter(id=self.hint.id).aupdate(status=status, **fields)
+
+    async def test_streams_until_done(self):
+        self.publisher.token('先想想')
+        self.publisher.done()
+        events = await self.collect()
+        self.assertEqual([event for event, _ in events], ['token', 'done'])
+
+    async def test_missing_done_event_uses_stored_result(self):
+        self.publisher.token('先想')  # 结束事件推送失败
+        await self.finish('success', answer='先想想哈希表')
+        events = await self.collect()
+        self.assertEqual(events, [
+            ('token', {'text': '先想'}),
+            ('reset', {'job_id': str(self.hint.id)}),
+            ('token', {'text': '先想想哈希表'}),
+            ('done', {'job_id': str(self.hint.id)}),
+        ])
+
+    async def test_reconnect_after_final_event(self):
+        self.publisher.token('提示')
+        self.publisher.error('模型调用失败')
+        await self.finish('failed', error='模型调用失败')
+        last_id = self.redis.xrevrange(hint_stream_key(self.hint.id), count=1)[0][0].decode()
+        events = await self.collect(last_id)
+        self.assertEqual(events, [('error', {'message': '模型调用失败'})])
+
+    async def test_lost_task_without_stream(self):
+        events = await self.collect()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][0], 'error')
+
+    async def test_connection_duration_is_capped(self):
+        self.publisher.token('生成中')
+        with mock.patch('api.hint_stream.HINT_STREAM_MAX_DURATION', 0.2):
+            events = await self.collect()
+        self.assertEqual([event for event, _ in events], ['token', 'error'])
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from api.models import CustomUser, HintRequest
+from api.tasks import call_qwen_max_task
+
+
+class BrokenClient:
+    name = 'broken'
+
+    def stream(self, messages):
+        raise KeyError('choices')
+
+
+class HintTaskFailureTests(TestCase):
+    """非LLM异常也要把请求标记为失败，不能停留在running"""
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='student', email='student@example.com', password='pw')
+        self.hint = HintRequest.objects.create(user=user, question='这道题应该从哪里入手？')
+
+    def test_unexpected_error_marks_request_failed(self):
+        with mock.patch('api.llm.get_llm_client', return_value=BrokenClient()), \
+                mock.patch('api.hint_cache.HintCache.get', return_value=None):
+            result = call_qwen_max_task.apply(args=[self.hint.id])
+
+        self.assertTrue(result.failed())
+        self.hint.refresh_from_db()
+        self.assertEqual(self.hint.status, 'failed')
+        self.assertIn('choices', self.hint.error)
+        self.assertIsNotNone(self.hint.finished_at)
+
+
+class FailingLLMClient:
+    name = 'failing'
+
+    def __init__(self):
+        self.calls = 0
+
+    def stream(self, messages):
+        from api.llm import LLMError
+
+        self.calls += 1
+        raise LLMError('upstream timeout')
+
+
+class HintTaskRetryTests(TestCase):
+    """LLM调用失败：最多重试2次，间隔指数增长"""
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(username='student', email='student@example.com', password='pw')
+        self.hint = HintRequest.objects.create(user=user, question='这道题应该从哪里入手？')
+
+    def test_retry_count_and_countdown(self):
+        self.assertEqual(call_qwen_max_task.max_retries, 2)
+        client = FailingLLMClient()
+        with mock.patch('api.llm.get_llm_client', return_value=client), \
+                mock.patch('api.hint_cache.HintCache.get', return_value=None), \
+                mock.patch.object(call_qwen_max_task, 'retry', wraps=call_qwen_max_task.retry) as retry:
+            call_qwen_max_task.apply(args=[self.hint.id])
+
+        self.assertEqual(client.calls, 3)
+        self.assertEqual([call.kwargs['countdown'] for call in retry.call_args_list], [3, 6])
+        self.hint.refresh_from_db()
+        self.assertEqual(self.hint.status, 'failed')
+        self.assertIn('upstream timeout', self.hint.error)
@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.models import CustomUser, LeetCodeProblem
+from api.tasks import grade_homework_task
+
+try:
+    import fakeredis
+except ImportError:  # fakeredis 为测试可选依赖
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, '需要安装 fakeredis')
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   CELERY_USER_MAX_INFLIGHT={'grading': 2})
+class HomeworkSubmitViewTests(TestCase):
+    """作业提交按用户公平调度"""
+
+    @classmethod
+    def setUpTestData(cls):
+        LeetCodeProblem.objects.create(problem_id=1, title='Echo', title_slug='echo', difficulty='easy')
+        cls.user = CustomUser.objects.create_user(username='student', email='student@example.com', password='pw')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        redis = fakeredis.FakeRedis()
+        patcher = mock.patch('api.task_routing._redis', return_value=redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(grade_homework_task, 'apply_async')
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _submit(self):
+        return self.client.post(reverse('homework-submit'), {'problem_id': 1, 'code': 'def solve(): pass'}, format='json')
+
+    def test_submissions_beyond_quota_are_rejected(self):
+        first, second, third = self._submit(), self._submit(), self._submit()
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual(third.status_code, 429)
+        self.assertEqual(third.json()['code'], 429)
+
+        self.assertEqual(self.apply_async.call_count, 2)
+        # 在途的第二个任务优先级降低一级
+        priorities = [call.kwargs['priority'] for call in self.apply_async.call_args_list]
+        self.assertEqual(priorities, [3, 4])
+        self.assertEqual({call.kwargs['queue'] for call in self.apply_async.call_args_list}, {'grading'})
+
+    def test_result_is_only_visible_to_submitter(self):
+        homework_id = self._submit().json()['data']['homework_id']
+        response = self.client.get(reverse('homework-result', args=[homework_id]))
+        self.assertEqual(response.json()['data']['status'], 'pending')
+
+        other = CustomUser.objects.create_user(username='other', email='other@example.com', password='pw')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(reverse('homework-result', args=[homework_id])).status_code, 404)
+
+    def test_unknown_problem(self):
+        response = self.client.post(reverse('homework-submit'), {'problem_id': 999, 'code': 'x'}, format='json')
+        self.assertEqual(response.status_code, 400)
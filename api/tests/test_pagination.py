@@ -0,0 +1,85 @@
+import base64
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import LeetCodeProblem
+from api.pagination import PaginationError, decode_cursor, encode_cursor, paginate_keyset
+
+
+class CursorTests(SimpleTestCase):
+    """游标编解码"""
+
+    def test_round_trip(self):
+        for key in (0, 1, 42, 10 ** 9):
+            for direction in ('n', 'p'):
+                self.assertEqual(decode_cursor(encode_cursor(key, direction)), (key, direction))
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor(123456, 'n')
+        self.assertNotIn('=', cursor)
+        self.assertRegex(cursor, r'^[A-Za-z0-9_-]+$')
+
+    def test_tampered_cursor(self):
+        cursor = encode_cursor(10, 'n')
+        invalid = [
+            cursor[:-2],
+            '不是游标',
+            base64.urlsafe_b64encode(b'not json').decode('ascii'),
+            base64.urlsafe_b64encode(json.dumps({'k': 10}).encode()).decode('ascii'),
+            base64.urlsafe_b64encode(json.dumps({'k': 'abc', 'd': 'n'}).encode()).decode('ascii'),
+            base64.urlsafe_b64encode(json.dumps({'k': 10, 'd': 'x'}).encode()).decode('ascii'),
+        ]
+        for value in invalid:
+            with self.subTest(cursor=value):
+                with self.assertRaises(PaginationError):
+                    decode_cursor(value)
+
+
+class KeysetPaginationTests(TestCase):
+    """keyset分页：其他字段取值相同时仍按 problem_id 稳定翻页"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # problem_id 不连续，标题/难度/通过率全部相同
+        cls.problem_ids = [3, 7, 8, 15, 16, 23, 42, 43, 99]
+        LeetCodeProblem.objects.bulk_create([
+            LeetCodeProblem(problem_id=problem_id, title='Same', title_slug=f'same-{problem_id}',
+                            difficulty='easy', acceptance_rate=50.0)
+            for problem_id in cls.problem_ids
+        ])
+
+    def _queryset(self):
+        return LeetCodeProblem.objects.order_by('title', 'difficulty').values('problem_id', 'title')
+
+    def _walk(self, direction_key, params):
+        pages = []
+        while True:
+            items, pagination = paginate_keyset(self._queryset(), params)
+            pages.append([item['problem_id'] for item in items])
+            cursor = pagination[direction_key]
+            if not cursor:
+                return pages, pagination
+            params = {'cursor': cursor, 'page_size': params['page_size']}
+
+    def test_forward_pages_cover_every_row_once(self):
+        pages, _ = self._walk('next', {'page_size': 2})
+        self.assertEqual(pages, [[3, 7], [8, 15], [16, 23], [42, 43], [99]])
+
+    def test_backward_pages_mirror_forward_pages(self):
+        _, last = paginate_keyset(self._queryset(), {'page_size': 4, 'cursor': encode_cursor(42, 'n')})
+        self.assertIsNone(last['next'])
+        pages, first = self._walk('prev', {'page_size': 4, 'cursor': last['prev']})
+        self.assertEqual(pages, [[15, 16, 23, 42], [3, 7, 8]])
+        self.assertIsNone(first['prev'])
+        self.assertIsNotNone(first['next'])
+
+    def test_first_page_has_no_prev(self):
+        items, pagination = paginate_keyset(self._queryset(), {'page_size': 20})
+        self.assertEqual([item['problem_id'] for item in items], self.problem_ids)
+        self.assertIsNone(pagination['prev'])
+        self.assertIsNone(pagination['next'])
+
+    def test_tampered_cursor_raises(self):
+        with self.assertRaises(PaginationError):
+            paginate_keyset(self._queryset(), {'cursor': 'garbage!'})
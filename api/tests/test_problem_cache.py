@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from api.problem_cache import is_not_modified
+
+ENTRY = {'etag': '"abc123"', 'last_modified_ts': 1_700_000_000}
+
+
+class ConditionalRequestTests(SimpleTestCase):
+    """If-None-Match / If-Modified-Since"""
+
+    def test_strong_and_weak_etags_match(self):
+        for header in ('"abc123"', 'W/"abc123"', '"other", W/"abc123"', ' "x" ,"abc123" '):
+            with self.subTest(header=header):
+                self.assertTrue(is_not_modified({'If-None-Match': header}, ENTRY))
+
+    def test_weak_stored_etag(self):
+        self.assertTrue(is_not_modified({'If-None-Match': '"abc123"'}, dict(ENTRY, etag='W/"abc123"')))
+
+    def test_wildcard(self):
+        self.assertTrue(is_not_modified({'If-None-Match': '*'}, ENTRY))
+
+    def test_mismatch(self):
+        for header in ('"abc"', 'W/"abc1234"', 'abc123', ''):
+            with self.subTest(header=header):
+                self.assertFalse(is_not_modified({'If-None-Match': header}, ENTRY))
+
+    def test_if_none_match_takes_precedence(self):
+        headers = {'If-None-Match': '"stale"', 'If-Modified-Since': 'Wed, 01 Jan 2030 00:00:00 GMT'}
+        self.assertFalse(is_not_modified(headers, ENTRY))
+
+    def test_if_modified_since(self):
+        self.assertTrue(is_not_modified({'If-Modified-Since': 'Tue, 14 Nov 2023 22:13:20 GMT'}, ENTRY))
+        self.assertFalse(is_not_modified({'If-Modified-Since': 'Tue, 14 Nov 2023 22:13:19 GMT'}, ENTRY))
+        self.assertFalse(is_not_modified({'If-Modified-Since': 'garbage'}, ENTRY))
+        self.assertFalse(is_not_modified({}, ENTRY))
@@ -0,0 +1,131 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.models import LeetCodeProblem, ProblemTag
+from api.problem_writer import ProblemBatchWriter, compute_source_hash, filter_changed
+
+
+def list_entry(problem_id, **overrides):
+    """题目列表接口返回的一项"""
+    entry = {
+        'frontendQuestionId': str(problem_id),
+        'title': f'Problem {problem_id}',
+        'titleSlug': f'problem-{problem_id}',
+        'difficulty': 'EASY',
+        'paidOnly': False,
+        'acRate': 51.234,
+        'topicTags': [{'slug': 'array', 'name': 'Array'}, {'slug': 'hash-table', 'name': 'Hash Table'}],
+    }
+    entry.update(overrides)
+    return entry
+
+
+def problem_dict(problem_id, **overrides):
+    """parse_problem 输出的题目字段字典"""
+    data = {
+        'problem_id': problem_id,
+        'title': f'Problem {problem_id}',
+        'title_slug': f'problem-{problem_id}',
+        'difficulty': 'easy',
+        'is_premium': False,
+        'content': '<p>content</p>',
+        'acceptance_rate': 51.2,
+        'submission_count': 100,
+        'accepted_count': 51,
+        'tags': ['array', 'hash-table'],
+        'source_hash': compute_source_hash(list_entry(problem_id)),
+    }
+    data.update(overrides)
+    return data
+
+
+TAGS = [('array', '数组'), ('hash-table', '哈希表')]
+
+
+class SourceHashTests(SimpleTestCase):
+    """列表项指纹"""
+
+    def test_stable_across_tag_order_and_small_rate_changes(self):
+        entry = list_entry(1)
+        reordered = list_entry(1, topicTags=list(reversed(entry['topicTags'])), acRate=51.2499)
+        self.assertEqual(compute_source_hash(entry), compute_source_hash(reordered))
+        self.assertEqual(compute_source_hash(entry), compute_source_hash(dict(entry)))
+
+    def test_ignores_fields_outside_fingerprint(self):
+        self.assertEqual(compute_source_hash(list_entry(1)),
+                         compute_source_hash(list_entry(1, status='ac', freqBar=12.5)))
+
+    def test_changes_with_listed_fields(self):
+        base = compute_source_hash(list_entry(1))
+        for overrides in ({'title': 'Renamed'}, {'difficulty': 'HARD'}, {'paidOnly': True},
+                          {'acRate': 52.0}, {'topicTags': [{'slug': 'array', 'name': 'Array'}]}):
+            with self.subTest(overrides=overrides):
+                self.assertNotEqual(base, compute_source_hash(list_entry(1, **overrides)))
+
+
+class ProblemBatchWriterTests(TestCase):
+    """批量upsert"""
+
+    def _write(self, *problems):
+        writer = ProblemBatchWriter(batch_size=10)
+        for problem in problems:
+            writer.add(problem, TAGS)
+        return writer.close()
+
+    def test_upsert_is_idempotent(self):
+        self.assertEqual(self._write(problem_dict(1), problem_dict(2)), [1, 2])
+        first = {p.problem_id: p for p in LeetCodeProblem.objects.all()}
+
+        self.assertEqual(self._write(problem_dict(1), problem_dict(2)), [1, 2])
+
+        self.assertEqual(LeetCodeProblem.objects.count(), 2)
+        self.assertEqual(ProblemTag.objects.count(), 2)
+        Through = LeetCodeProblem.problem_tags.through
+        self.assertEqual(Through.objects.count(), 4)
+        for problem in LeetCodeProblem.objects.all():
+            self.assertEqual(problem.pk, first[problem.problem_id].pk)
+            self.assertEqual(problem.created_at, first[problem.problem_id].created_at)
+            self.assertEqual(sorted(problem.problem_tags.values_list('slug', flat=True)), ['array', 'hash-table'])
+
+    def test_upsert_updates_fields_and_tags(self):
+        self._write(problem_dict(1))
+        writer = ProblemBatchWriter()
+        writer.add(problem_dict(1, title='Renamed', tags=['array']), [('array', '数组')])
+        writer.close()
+
+        problem = LeetCodeProblem.objects.get(problem_id=1)
+        self.assertEqual(problem.title, 'Renamed')
+        self.assertEqual(list(problem.problem_tags.values_list('slug', flat=True)), ['array'])
+        self.assertIn('renamed', problem.search_title)
+
+    def test_flushes_when_batch_is_full(self):
+        writer = ProblemBatchWriter(batch_size=2)
+        self.assertEqual(writer.add(problem_dict(1), TAGS), [])
+        self.assertEqual(writer.add(problem_dict(2), TAGS), [1, 2])
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(writer.success_count, 2)
+
+
+class FilterChangedTests(TestCase):
+    """增量同步只抓取新增或变化的题目"""
+
+    def test_skips_unchanged_rows(self):
+        writer = ProblemBatchWriter()
+        writer.add(problem_dict(1), TAGS)
+        writer.add(problem_dict(2), TAGS)
+        writer.add(problem_dict(3, content=''), TAGS)  # 没有描述的题目需要补抓
+        writer.close()
+
+        entries = [
+            list_entry(1),
+            list_entry(2, acRate=60.0),
+            list_entry(3),
+            list_entry(4),
+        ]
+        changed = filter_changed(entries)
+        self.assertEqual([entry['frontendQuestionId'] for entry in changed], ['2', '3', '4'])
+
+    def test_nothing_changed(self):
+        writer = ProblemBatchWriter()
+        writer.add(problem_dict(1), TAGS)
+        writer.close()
+        self.assertEqual(filter_changed([list_entry(1)]), [])
@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from api.models import ScrapeCheckpoint
+from tools.leetcode_scraper import LeetCodeScraper
+from tools.scrape_checkpoint import CheckpointTracker
+
+
+def list_entry(problem_id):
+    return {'frontendQuestionId': str(problem_id), 'titleSlug': f'problem-{problem_id}'}
+
+
+class PagedScraper(LeetCodeScraper):
+    """列表接口按给定的页返回，不访问网络"""
+
+    def __init__(self, pages, total):
+        super().__init__(rps=0)
+        self.pages, self.total = pages, total
+
+    def fetch_list_page(self, skip, limit):
+        return self.pages.get(skip, []), self.total
+
+
+class ListEndDetectionTests(TestCase):
+    """去重后为空的整页不能被当作列表结束"""
+
+    def test_duplicate_full_page_does_not_end_listing(self):
+        page_one = [list_entry(i) for i in range(1, 101)]
+        pages = {
+            0: page_one,
+            100: list(page_one),  # 与第一页完全重复（并发抓取/续跑时的重叠）
+            200: [list_entry(i) for i in range(201, 251)],
+        }
+        calls = []
+        scraper = PagedScraper(pages, total=250)
+        problems = scraper.get_problems_list(
+            500, on_page=lambda next_skip, entries, is_last: calls.append((next_skip, len(entries), is_last))
+        )
+
+        self.assertEqual(len(problems), 150)
+        self.assertEqual(calls, [(100, 100, False), (200, 0, False), (250, 50, False), (250, 0, True)])
+
+    def test_checkpoint_only_finishes_on_last_page(self):
+        tracker = CheckpointTracker.start('test', limit=500, full=False)
+        tracker.page_done(200, [], is_last=False)
+        self.assertFalse(ScrapeCheckpoint.objects.get(name='test').list_done)
+
+        tracker.page_done(300, [list_entry(201)], is_last=True)
+        checkpoint = ScrapeCheckpoint.objects.get(name='test')
+        self.assertTrue(checkpoint.list_done)
+        self.assertEqual(checkpoint.list_skip, 300)
+        self.assertEqual(len(checkpoint.pending), 1)
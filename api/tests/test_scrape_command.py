@@ -0,0 +1,41 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+RESULT = {'success': True, 'total': 1, 'success_count': 1, 'fail_count': 0, 'unchanged_count': 0,
+          'message': '爬取完成！'}
+
+
+class ScrapeCommandLockTests(SimpleTestCase):
+    """手动爬取与定时同步共用锁"""
+
+    def run_command(self, *args):
+        out = StringIO()
+        with mock.patch('api.management.commands.scrape_leetcode.run_scraper', return_value=RESULT) as run:
+            call_command('scrape_leetcode', *args, stdout=out)
+        return run, out.getvalue()
+
+    def test_runs_without_lock_when_redis_unavailable(self):
+        with mock.patch('api.tasks.acquire_scrape_sync_lock', side_effect=ConnectionError('redis down')), \
+                mock.patch('api.tasks.release_scrape_sync_lock') as release:
+            run, output = self.run_command('--offline')
+        run.assert_called_once()
+        self.assertIn('跳过加锁', output)
+        self.assertIn('爬取完成', output)
+        release.assert_not_called()
+
+    def test_refuses_when_lock_held(self):
+        with mock.patch('api.tasks.acquire_scrape_sync_lock', return_value=None):
+            run, output = self.run_command()
+        run.assert_not_called()
+        self.assertIn('已有同步正在运行', output)
+
+    def test_releases_lock_after_run(self):
+        lock = mock.Mock()
+        with mock.patch('api.tasks.acquire_scrape_sync_lock', return_value=lock), \
+                mock.patch('api.tasks.release_scrape_sync_lock') as release:
+            run, _ = self.run_command()
+        run.assert_called_once()
+        release.assert_called_once_with(lock)
@@ -0,0 +1,115 @@
+import threading
+
+from django.test import TestCase
+
+from api.models import LeetCodeProblem
+from tools.leetcode_scraper import LeetCodeScraper
+from tools.scrape_pipeline import StreamingScrapePipeline
+
+
+def list_entry(problem_id):
+    return {
+        'frontendQuestionId': str(problem_id),
+        'title': f'Problem {problem_id}',
+        'titleSlug': f'problem-{problem_id}',
+        'difficulty': 'EASY',
+        'paidOnly': False,
+        'acRate': 50.0,
+        'topicTags': [{'slug': 'array', 'name': 'Array', 'nameTranslated': '数组'}],
+    }
+
+
+def detail(slug):
+    problem_id = int(slug.rsplit('-', 1)[1])
+    return {
+        'questionFrontendId': str(problem_id),
+        'title': f'Problem {problem_id}',
+        'titleSlug': slug,
+        'content': '<p>content</p>',
+        'difficulty': 'Easy',
+        'stats': '{"totalAccepted": "5", "totalSubmission": "10", "acRate": "50.0%"}',
+        'topicTags': [{'slug': 'array', 'name': 'Array', 'translatedName': '数组'}],
+    }
+
+
+class FakeCheckpoint:
+    """内存中的断点（流水线的列表线程不访问测试事务）"""
+
+    def __init__(self, limit):
+        self.limit, self.full, self.list_skip, self.list_done = limit, True, 0, False
+        self.pending = []
+        self.done = set()
+        self._lock = threading.Lock()
+
+    def page_done(self, next_skip, entries, is_last=False):
+        with self._lock:
+            self.pending.extend(entries)
+            self.list_skip = next_skip
+            self.list_done = is_last
+
+    def completed(self, problem_ids):
+        with self._lock:
+            self.done.update(int(problem_id) for problem_id in problem_ids)
+
+
+class FakeScraper(LeetCodeScraper):
+    """列表和详情不访问网络"""
+
+    def __init__(self, count, fail_details=False, **kwargs):
+        super().__init__(rps=0, **kwargs)
+        self.count = count
+        self.fail_details = fail_details
+
+    def get_problems_list(self, limit=200, skip=0, on_page=None):
+        entries = [list_entry(problem_id) for problem_id in range(1, self.count + 1)]
+        for start in range(0, len(entries), 5):
+            on_page(start + 5, entries[start:start + 5], False)
+        on_page(len(entries), [], True)
+        return entries
+
+    def get_problem_details(self, title_slugs):
+        if self.fail_details:
+            raise RuntimeError('detail worker crashed')
+        return {slug: detail(slug) for slug in title_slugs}
+
+
+class StreamingScrapePipelineTests(TestCase):
+
+    def _run(self, scraper, limit):
+        checkpoint = FakeCheckpoint(limit)
+        pipeline = StreamingScrapePipeline(scraper, checkpoint, full=True, flush_interval=0.1)
+        # 写库阶段在调用线程中执行，使用测试事务
+        return pipeline, checkpoint, pipeline.run()
+
+    def test_all_problems_are_written(self):
+        scraper = FakeScraper(23, concurrency=3, detail_batch_size=4, batch_size=10)
+        pipeline, checkpoint, writer = self._run(scraper, 23)
+
+        self.assertIsNone(pipeline.error)
+        self.assertEqual(pipeline.listed_count, 23)
+        self.assertEqual(pipeline.fail_count, 0)
+        self.assertEqual(writer.success_count, 23)
+        self.assertEqual(checkpoint.done, set(range(1, 24)))
+        self.assertEqual(LeetCodeProblem.objects.count(), 23)
+        self.assertEqual(pipeline.metrics_summary()['write']['items'], 23)
+
+    def test_failing_detail_workers_do_not_hang(self):
+        # 详情队列容量远小于题目数：所有详情线程退出后列表线程不能一直阻塞在put上
+        scraper = FakeScraper(200, fail_details=True, concurrency=2, detail_batch_size=1, batch_size=10)
+        done = threading.Event()
+        outcome = {}
+
+        def run():
+            pipeline = StreamingScrapePipeline(scraper, FakeCheckpoint(200), full=True, flush_interval=0.1)
+            outcome['writer'] = pipeline.run()
+            outcome['pipeline'] = pipeline
+            done.set()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        self.assertTrue(done.wait(timeout=10), '流水线在详情线程异常后未能结束')
+
+        pipeline = outcome['pipeline']
+        self.assertIn('detail worker crashed', pipeline.error)
+        self.assertEqual(outcome['writer'].success_count, 0)
+        self.assertLess(pipeline.listed_count, 200)
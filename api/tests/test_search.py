@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.models import LeetCodeProblem
+from api.search import build_search_document, search_problems, strip_html, tokenize
+
+
+class TokenizeTests(SimpleTestCase):
+    """中文单字/二元组切分"""
+
+    def test_cjk_unigrams_and_bigrams(self):
+        self.assertEqual(
+            tokenize('两数之和'),
+            ['两', '数', '之', '和', '两数', '数之', '之和']
+        )
+
+    def test_query_mode_uses_bigrams_only(self):
+        self.assertEqual(tokenize('两数之和', for_query=True), ['两数', '数之', '之和'])
+        self.assertEqual(tokenize('树', for_query=True), ['树'])
+
+    def test_mixed_text(self):
+        self.assertEqual(
+            tokenize('LRU缓存 Two_Sum 2024'),
+            ['lru', '缓', '存', '缓存', 'two', 'sum', '2024']
+        )
+
+    def test_punctuation_splits_cjk_runs(self):
+        self.assertEqual(tokenize('链表，反转', for_query=True), ['链表', '反转'])
+
+    def test_strip_html(self):
+        self.assertEqual(strip_html('<p>a &lt; b</p>').split(), ['a', '<', 'b'])
+        self.assertEqual(build_search_document('二叉树', '<p>节点</p>'),
+                         ('二 叉 树 二叉 叉树', '节 点 节点'))
+
+
+class SearchRankingTests(TestCase):
+    """标题命中排在描述命中之前"""
+
+    @classmethod
+    def setUpTestData(cls):
+        LeetCodeProblem.objects.create(
+            problem_id=1, title='合并区间', title_slug='merge-intervals', difficulty='medium',
+            content='<p>给定若干区间，请合并所有重叠的<b>二叉树</b>节点。</p>'
+        )
+        LeetCodeProblem.objects.create(
+            problem_id=2, title='二叉树的中序遍历', title_slug='binary-tree-inorder-traversal',
+            difficulty='easy', content='<p>给定一个根节点，返回中序遍历。</p>'
+        )
+        LeetCodeProblem.objects.create(
+            problem_id=3, title='两数之和', title_slug='two-sum', difficulty='easy',
+            content='<p>在数组中找出和为目标值的两个整数。</p>'
+        )
+
+    def _search(self, term):
+        return list(search_problems(LeetCodeProblem.objects.all(), term).values_list('problem_id', flat=True))
+
+    def test_title_match_outranks_content_match(self):
+        self.assertEqual(self._search('二叉树'), [2, 1])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search('中序遍历'), [2])
+        self.assertEqual(self._search('两数 中序'), [])
+
+    def test_english_term(self):
+        LeetCodeProblem.objects.create(problem_id=146, title='LRU 缓存', title_slug='lru-cache',
+                                       difficulty='medium')
+        self.assertEqual(self._search('lru'), [146])
+
+    def test_empty_term_returns_nothing(self):
+        self.assertEqual(self._search('，。'), [])
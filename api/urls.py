@@ -4,7 +4,9 @@ from .views import (TestView, RegisterView, LoginView, LogoutView,
                     UserListView, UserRoleUpdateView,UserDetailView,
                     UserStatsView, CustomTokenObtainPairView, CustomTokenRefreshView,
                     CurrentUserView, JWTLogoutView,
-                    LeetCodeProblemListView, LeetCodeProblemDetailView, LeetCodeProblemStatsView)
+                    LeetCodeProblemListView, LeetCodeProblemDetailView, LeetCodeProblemStatsView,
+                    HintRequestCreateView, HintRequestDetailView, hint_stream_view,
+                    HomeworkSubmitView, HomeworkResultView)
 
 # URL 规则列表
 urlpatterns = [
@@ -33,5 +35,16 @@ urlpatterns = [
     path('leetcode/problems/', LeetCodeProblemListView.as_view(), name='leetcode-problem-list'),  # 题目列表
     path('leetcode/problems/<int:problem_id>/', LeetCodeProblemDetailView.as_view(), name='leetcode-problem-detail'),  # 题目详情
     path('leetcode/stats/', LeetCodeProblemStatsView.as_view(), name='leetcode-stats'),  # 题目统计
+
+
+    # 学习提示接口（异步生成，先提交再轮询）
+    path('hints/', HintRequestCreateView.as_view(), name='hint-create'),  # 提交提示请求
+    path('hints/<uuid:job_id>/', HintRequestDetailView.as_view(), name='hint-detail'),  # 查询提示结果
+    path('hints/<uuid:job_id>/stream/', hint_stream_view, name='hint-stream'),  # SSE流式获取提示
+
+
+    # 作业批改接口（异步批改，先提交再轮询）
+    path('homework/', HomeworkSubmitView.as_view(), name='homework-submit'),  # 提交作业代码
+    path('homework/<str:homework_id>/', HomeworkResultView.as_view(), name='homework-result'),  # 查询批改结果
 ]
 
@@ -2,20 +2,33 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.authtoken.models import Token  # 重要：添加这行
 from django.contrib.auth import login, logout
 from .serializers import (UserRegisterSerializer, UserLoginSerializer,
                          UserInfoSerializer, UserRoleUpdateSerializer,
-                         LeetCodeProblemSerializer, LeetCodeProblemListSerializer)
-from .models import CustomUser, LeetCodeProblem, ProblemTag
-from django.db.models import Count, Q
+                         HintRequestCreateSerializer, HintRequestSerializer, HomeworkSubmitSerializer)
+from .models import CustomUser, LeetCodeProblem, HintRequest
+from .pagination import (PaginationError, paginate_keyset, paginate_offset,
+                         wants_cursor_pagination)
+from .search import search_problems
+from .stats import get_problem_stats
+from .problem_cache import get_problem_detail, is_not_modified
+from .fast_serializers import (FieldSelectionError, list_value_fields, parse_list_fields,
+                               serialize_problem_list)
+from .renderers import ORJSONRenderer
+from .catalog_snapshot import query_catalog_snapshot
+from .hint_cache import get_hint_cache
+from .hint_stream import FINAL_EVENTS, format_sse, get_async_redis, hint_stream_key, read_hint_events
+from .tasks import call_qwen_max_task, grade_homework_task
+from .task_routing import (PRIORITY_HIGH, PRIORITY_NORMAL, QUEUE_GRADING, QUEUE_HINTS,
+                           UserQuotaExceeded, dispatch_user_task)
 from django.core.cache import cache
-from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
 from django.utils import timezone
-import json
-import hashlib
-from rest_framework_simplejwt.views import TokenObtainPairView
+import uuid
 
 # JWT相关导入
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -365,13 +378,58 @@ class UserStatsView(APIView):
 
 class LeetCodeProblemListView(APIView):
     """LeetCode题目列表视图"""
+    renderer_classes = [ORJSONRenderer]
+    # 公开接口：不做认证，避免认证查询用户表，数据库不可用时仍能从快照返回列表
+    authentication_classes = []
+    permission_classes = [AllowAny]
 
     def get(self, request):
         # 获取查询参数
         difficulty = request.query_params.get('difficulty')
         is_premium = request.query_params.get('is_premium')
         search = request.query_params.get('search')
+        tag = request.query_params.get('tag')
 
+        try:
+            fields = parse_list_fields(request.query_params.get('fields'))
+        except FieldSelectionError as e:
+            return Response({
+                'code': 400,
+                'message': str(e),
+                'data': {}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        cursor_mode = wants_cursor_pagination(request.query_params)
+
+        # 没有搜索词时优先从Redis中的列表快照分页，快照不可用时再查数据库
+        try:
+            page = None
+            if not search:
+                page = query_catalog_snapshot(
+                    request.query_params, difficulty=difficulty, is_premium=is_premium, tag=tag,
+                    fields=fields, cursor_mode=cursor_mode
+                )
+            if page is None:
+                page = self._query_database(request.query_params, difficulty, is_premium, search, tag,
+                                            fields, cursor_mode)
+        except PaginationError as e:
+            return Response({
+                'code': 400,
+                'message': str(e),
+                'data': {}
+            }, status=status.HTTP_400_BAD_REQUEST)
+        problems, pagination = page
+
+        return Response({
+            'code': 200,
+            'message': '获取题目列表成功',
+            'data': {
+                'problems': problems,
+                'pagination': pagination
+            }
+        })
+
+    def _query_database(self, params, difficulty, is_premium, search, tag, fields, cursor_mode):
+        """从数据库查询一页题目，返回 (题目列表, 分页信息)"""
         # 构建查询集
         queryset = LeetCodeProblem.objects.all()
 
@@ -383,106 +441,318 @@ class LeetCodeProblemListView(APIView):
             is_premium_bool = is_premium.lower() == 'true'
             queryset = queryset.filter(is_premium=is_premium_bool)
 
+        if tag:
+            # 通过标签关联表过滤（slug唯一索引 + 关联表外键索引）
+            queryset = queryset.filter(problem_tags__slug=tag)
+
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search)
-            )
+            # 走GIN索引的全文检索，偏移分页下按相关度排序
+            queryset = search_problems(queryset, search)
 
-        # 分页
-        page = request.query_params.get('page', 1)
-        page_size = request.query_params.get('page_size', 20)
+        # 只读取输出字段需要的列（不会读取题目描述），直接生成字典，跳过ModelSerializer的逐字段处理
+        queryset = queryset.values(*list_value_fields(fields))
 
-        try:
-            page = int(page)
-            page_size = int(page_size)
-            page_size = min(page_size, 500)  # 限制最大页面大小
-        except (ValueError, TypeError):
-            page = 1
-            page_size = 20
+        # 分页：游标模式走keyset，否则在SQL中按偏移切片
+        if cursor_mode:
+            problems, pagination = paginate_keyset(queryset, params)
+        else:
+            problems, pagination = paginate_offset(queryset, params)
+        return serialize_problem_list(problems, fields), pagination
 
-        start = (page - 1) * page_size
-        end = start + page_size
 
-        total_count = queryset.count()
-        problems = queryset
+class LeetCodeProblemDetailView(APIView):
+    """LeetCode题目详情视图"""
+    renderer_classes = [ORJSONRenderer]
 
-        serializer = LeetCodeProblemListSerializer(problems, many=True)
+    def get(self, request, problem_id):
+        # 详情在爬虫同步之间不会变化，优先读取缓存
+        entry = get_problem_detail(problem_id)
+        if entry is None:
+            return Response({
+                'code': 404,
+                'message': '题目不存在',
+                'data': {}
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        headers = {
+            'ETag': entry['etag'],
+            'Last-Modified': entry['last_modified'],
+            'Cache-Control': 'no-cache',  # 允许缓存，但每次使用前需要用ETag重新验证
+        }
+        if is_not_modified(request.headers, entry):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
         return Response({
             'code': 200,
-            'message': '获取题目列表成功',
-            'data': {
-                'problems': serializer.data,
-                'pagination': {
-                    'current_page': page,
-                    'page_size': page_size,
-                    'total_count': total_count,
-                    'total_pages': (total_count + page_size - 1) // page_size
-                }
-            }
+            'message': '获取题目详情成功',
+            'data': entry['data']
+        }, headers=headers)
+
+
+class LeetCodeProblemStatsView(APIView):
+    """LeetCode题目统计视图"""
+
+    def get(self, request):
+        # 统计快照由爬虫写入时刷新，正常情况下只需一次缓存读取
+        stats = get_problem_stats()
+
+        return Response({
+            'code': 200,
+            'message': '获取统计信息成功',
+            'data': stats
         })
 
 
-class LeetCodeProblemDetailView(APIView):
-    """LeetCode题目详情视图"""
+# ==================== 学习提示相关视图 ====================
 
-    def get(self, request, problem_id):
-        try:
-            problem = LeetCodeProblem.objects.get(problem_id=problem_id)
-            serializer = LeetCodeProblemSerializer(problem)
+class HintRequestCreateView(APIView):
+    """提交提示请求：创建记录并投递Celery任务，立即返回任务ID"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = HintRequestCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'code': 400,
+                'message': '提交失败',
+                'data': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
 
+        problem = serializer.validated_data.get('problem_id')
+        question = serializer.validated_data['question']
+        code = serializer.validated_data.get('code', '')
+
+        # 相同或相近的问题已有提示时直接返回，不再排队调用大模型
+        answer = get_hint_cache().get(problem.problem_id if problem else None, question, code)
+        if answer is not None:
+            hint = HintRequest.objects.create(
+                user=request.user, problem=problem, question=question, code=code,
+                status='success', answer=answer, backend='cache', finished_at=timezone.now()
+            )
             return Response({
                 'code': 200,
-                'message': '获取题目详情成功',
-                'data': serializer.data
+                'message': '获取提示成功',
+                'data': {
+                    'job_id': str(hint.id),
+                    'status': hint.status,
+                    'answer': answer
+                }
             })
-        except LeetCodeProblem.DoesNotExist:
+
+        hint = HintRequest.objects.create(user=request.user, problem=problem, question=question, code=code)
+        # 提示走高优先级的hints队列；同一用户在途请求越多优先级越低，超过上限时拒绝
+        try:
+            dispatch_user_task(call_qwen_max_task, args=(str(hint.id),), user_id=request.user.id,
+                               queue=QUEUE_HINTS, priority=PRIORITY_HIGH)
+        except UserQuotaExceeded as e:
+            hint.delete()
+            return Response({
+                'code': 429,
+                'message': str(e),
+                'data': {}
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        return Response({
+            'code': 202,
+            'message': '提示请求已提交',
+            'data': {
+                'job_id': str(hint.id),
+                'status': hint.status
+            }
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class HintRequestDetailView(APIView):
+    """按任务ID查询提示结果（只能查询自己的请求）"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        hint = HintRequest.objects.select_related('problem').filter(id=job_id, user=request.user).first()
+        if hint is None:
             return Response({
                 'code': 404,
-                'message': '题目不存在',
+                'message': '提示请求不存在',
                 'data': {}
             }, status=status.HTTP_404_NOT_FOUND)
 
+        return Response({
+            'code': 200,
+            'message': '获取提示结果成功',
+            'data': HintRequestSerializer(hint).data
+        })
 
-class LeetCodeProblemStatsView(APIView):
-    """LeetCode题目统计视图"""
 
-    def get(self, request):
-        total_problems = LeetCodeProblem.objects.count()
-        easy_count = LeetCodeProblem.objects.filter(difficulty='easy').count()
-        medium_count = LeetCodeProblem.objects.filter(difficulty='medium').count()
-        hard_count = LeetCodeProblem.objects.filter(difficulty='hard').count()
-        premium_count = LeetCodeProblem.objects.filter(is_premium=True).count()
-
-        # 获取热门标签
-        popular_tags = ProblemTag.objects.annotate(
-            problem_count=Count('leetcodeproblem')
-        ).filter(problem_count__gt=0).order_by('-problem_count')[:10]
-
-        tag_stats = [
-            {
-                'name': tag.name,
-                'slug': tag.slug,
-                'count': tag.problem_count
+# ==================== 作业批改相关视图 ====================
+
+HOMEWORK_RESULT_TIMEOUT = 86400  # 与批改任务缓存结果的时间一致
+
+
+class HomeworkSubmitView(APIView):
+    """提交作业代码：投递到grading队列异步批改，立即返回作业ID"""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = HomeworkSubmitSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'code': 400,
+                'message': '提交失败',
+                'data': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        problem = serializer.validated_data['problem_id']
+        homework_id = uuid.uuid4().hex
+        cache.set(f"homework_owner_{homework_id}", request.user.id, HOMEWORK_RESULT_TIMEOUT)
+        # 与提示相同的按用户公平调度：在途批改越多优先级越低，超过上限时拒绝，避免个别学生刷屏提交
+        try:
+            dispatch_user_task(grade_homework_task,
+                               args=(homework_id, serializer.validated_data['code'], problem.problem_id),
+                               user_id=request.user.id, queue=QUEUE_GRADING, priority=PRIORITY_NORMAL)
+        except UserQuotaExceeded as e:
+            cache.delete(f"homework_owner_{homework_id}")
+            return Response({
+                'code': 429,
+                'message': str(e),
+                'data': {}
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        return Response({
+            'code': 202,
+            'message': '作业已提交，正在批改',
+            'data': {
+                'homework_id': homework_id,
+                'status': 'pending'
             }
-            for tag in popular_tags
-        ]
+        }, status=status.HTTP_202_ACCEPTED)
 
-        stats = {
-            'total_problems': total_problems,
-            'difficulty_distribution': {
-                'easy': easy_count,
-                'medium': medium_count,
-                'hard': hard_count
-            },
-            'premium_problems': premium_count,
-            'popular_tags': tag_stats
-        }
 
+class HomeworkResultView(APIView):
+    """按作业ID查询批改结果（只能查询自己的提交）"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, homework_id):
+        if cache.get(f"homework_owner_{homework_id}") != request.user.id:
+            return Response({
+                'code': 404,
+                'message': '作业提交不存在',
+                'data': {}
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        feedback = cache.get(f"homework_feedback_{homework_id}")
         return Response({
             'code': 200,
-            'message': '获取统计信息成功',
-            'data': stats
+            'message': '获取批改结果成功',
+            'data': {
+                'homework_id': homework_id,
+                'status': 'pending' if feedback is None else 'success',
+                'feedback': feedback
+            }
         })
 
+
+async def _authenticate_stream_request(request):
+    """SSE请求认证：浏览器的EventSource不能设置请求头，因此也接受 ?token= 传递的JWT"""
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        validated_token = auth.get_validated_token(raw_token)
+        return await sync_to_async(auth.get_user)(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+HINT_FINISHED_STATUSES = ('success', 'failed')
+
+
+def _hint_result_events(hint, replace: bool):
+    """
+    根据数据库中的记录输出最终结果
+    :param replace: 客户端可能已显示部分内容时先发送 reset，避免内容重复
+    """
+    if hint is None:
+        return [format_sse('error', {'message': '提示请求不存在'})]
+    if hint.status == 'failed':
+        return [format_sse('error', {'message': hint.error})]
+    if hint.status != 'success':
+        return [format_sse('error', {'message': '等待提示结果超时，请稍后刷新查看'})]
+    events = [format_sse('reset', {'job_id': str(hint.id)})] if replace else []
+    events.append(format_sse('token', {'text': hint.answer}))
+    events.append(format_sse('done', {'job_id': str(hint.id)}))
+    return events
+
+
+async def _hint_event_stream(hint, last_id):
+    """把Redis Stream中的提示事件转换为SSE消息"""
+    hint_id = hint.id
+    if hint.status in HINT_FINISHED_STATUSES and not await get_async_redis().exists(hint_stream_key(hint_id)):
+        # 推送记录已过期（或来自缓存命中），直接输出最终结果
+        for message in _hint_result_events(hint, replace=last_id != '0-0'):
+            yield message
+        return
+
+    events = read_hint_events(hint_id, last_id)
+    try:
+        async for event_id, fields in events:
+            if event_id is None:
+                # 心跳超时时检查状态：结束事件可能推送失败，或重连时 Last-Event-ID 已在结束事件之后
+                hint = await HintRequest.objects.filter(id=hint_id).afirst()
+                if hint is None or hint.status in HINT_FINISHED_STATUSES:
+                    for message in _hint_result_events(hint, replace=last_id != '0-0'):
+                        yield message
+                    return
+                yield ': keep-alive\n\n'  # 心跳，防止代理断开空闲连接
+                continue
+            last_id = event_id
+            event, data = fields.get('event'), fields.get('data', '')
+            if event == 'token':
+                yield format_sse(event, {'text': data}, event_id)
+            elif event == 'error':
+                yield format_sse(event, {'message': data}, event_id)
+            else:
+                yield format_sse(event, {'job_id': str(hint_id)}, event_id)
+            if event in FINAL_EVENTS:
+                return
+    finally:
+        await events.aclose()
+
+    # Stream 已不存在（任务丢失）或超过最长连接时间，按数据库中的状态结束
+    hint = await HintRequest.objects.filter(id=hint_id).afirst()
+    for message in _hint_result_events(hint, replace=last_id != '0-0'):
+        yield message
+
+
+@require_GET
+async def hint_stream_view(request, job_id):
+    """
+    以SSE流式返回提示内容（需通过ASGI服务运行，如 uvicorn AiCooding.asgi:application）
+    事件：token（一段文本）、reset（重新生成，清空已显示内容）、done（完成）、error（失败）
+    """
+    user = await _authenticate_stream_request(request)
+    if user is None:
+        return JsonResponse({
+            'code': 401,
+            'message': '身份认证信息未提供或无效',
+            'data': {}
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    hint = await HintRequest.objects.filter(id=job_id, user=user).afirst()
+    if hint is None:
+        return JsonResponse({
+            'code': 404,
+            'message': '提示请求不存在',
+            'data': {}
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    # 断线重连时浏览器会带上最后收到的消息ID，从该位置继续
+    last_id = request.headers.get('Last-Event-ID') or '0-0'
+    response = StreamingHttpResponse(_hint_event_stream(hint, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # 关闭Nginx缓冲，保证逐段送达
+    return response
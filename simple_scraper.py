@@ -4,11 +4,12 @@
 基础版LeetCode爬虫 - 只获取题目列表信息
 """
 
-import requests
 import json
 import logging
-from django.db import transaction
-from api.models import LeetCodeProblem, ProblemTag
+from api.problem_writer import ProblemBatchWriter
+from api.signals import problems_synced
+from tools.http_cache import ResponseCache
+from tools.http_client import LeetCodeHttpClient
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -17,17 +18,16 @@ logger = logging.getLogger(__name__)
 class SimpleLeetCodeScraper:
     """简化版LeetCode爬虫"""
     
-    def __init__(self):
+    def __init__(self, cache: ResponseCache = None, offline: bool = False):
+        """
+        :param cache: GraphQL响应缓存，为None时不使用缓存
+        :param offline: 只从缓存回放响应，不访问网络
+        """
         self.graphql_url = "https://leetcode.cn/graphql"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Content-Type': 'application/json',
-            'Referer': 'https://leetcode.cn/problemset/all/',
-            'Origin': 'https://leetcode.cn',
-        })
+        self.cache = cache if cache is not None or not offline else ResponseCache()
+        self.offline = offline
+        self.client = LeetCodeHttpClient(cache=self.cache, offline=offline)
+        self.session = self.client.session
     
     def get_problems_list(self, limit: int = 200) -> list:
         """获取题目列表"""
@@ -55,13 +55,7 @@ class SimpleLeetCodeScraper:
         variables = {"limit": limit}
         
         try:
-            response = self.session.post(
-                self.graphql_url,
-                json={"query": query, "variables": variables}
-            )
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self.client.post_graphql(self.graphql_url, query, variables)
             if 'errors' in data:
                 logger.error(f"GraphQL错误: {data['errors']}")
                 return []
@@ -74,43 +68,32 @@ class SimpleLeetCodeScraper:
             logger.error(f"获取题目列表失败: {e}")
             return []
     
+    def parse_problem(self, problem_data: dict) -> tuple:
+        """把题目列表项转换为 (题目字段字典, [(标签slug, 标签名称), ...])"""
+        problem_dict = {
+            'problem_id': int(problem_data['frontendQuestionId']),
+            'title': problem_data.get('titleCn') or problem_data['title'],
+            'title_slug': problem_data['titleSlug'],
+            'difficulty': problem_data['difficulty'].lower(),
+            'is_premium': problem_data.get('paidOnly', False),
+            'content': '',  # 暂时不获取详细内容
+            'acceptance_rate': float(problem_data.get('acRate', 0)),
+            'submission_count': 0,  # 暂时设为0
+            'accepted_count': 0,    # 暂时设为0
+            'tags': [tag['slug'] for tag in problem_data.get('topicTags', [])]
+        }
+        tags = [
+            (tag['slug'], tag.get('nameTranslated') or tag['name'])
+            for tag in problem_data.get('topicTags', [])
+        ]
+        return problem_dict, tags
+    
     def save_problem_to_db(self, problem_data: dict) -> bool:
-        """保存题目到数据库"""
+        """保存单道题目到数据库"""
         try:
-            with transaction.atomic():
-                # 准备题目数据
-                problem_dict = {
-                    'problem_id': int(problem_data['frontendQuestionId']),
-                    'title': problem_data.get('titleCn') or problem_data['title'],
-                    'title_slug': problem_data['titleSlug'],
-                    'difficulty': problem_data['difficulty'].lower(),
-                    'is_premium': problem_data.get('paidOnly', False),
-                    'content': '',  # 暂时不获取详细内容
-                    'acceptance_rate': float(problem_data.get('acRate', 0)),
-                    'submission_count': 0,  # 暂时设为0
-                    'accepted_count': 0,    # 暂时设为0
-                    'tags': [tag['slug'] for tag in problem_data.get('topicTags', [])]
-                }
-                
-                # 更新或创建题目
-                problem_obj, created = LeetCodeProblem.objects.update_or_create(
-                    problem_id=problem_dict['problem_id'],
-                    defaults=problem_dict
-                )
-                
-                # 保存标签
-                for tag_data in problem_data.get('topicTags', []):
-                    tag_obj, _ = ProblemTag.objects.get_or_create(
-                        slug=tag_data['slug'],
-                        defaults={
-                            'name': tag_data.get('nameTranslated') or tag_data['name']
-                        }
-                    )
-                
-                action = "创建" if created else "更新"
-                logger.info(f"{action}题目: {problem_obj.problem_id}. {problem_obj.title}")
-                return True
-                
+            writer = ProblemBatchWriter(batch_size=1)
+            writer.add(*self.parse_problem(problem_data))
+            return bool(writer.close())
         except Exception as e:
             logger.error(f"保存题目到数据库失败: {e}")
             return False
@@ -125,18 +108,27 @@ class SimpleLeetCodeScraper:
             logger.error("无法获取题目列表")
             return {"success": False, "message": "无法获取题目列表"}
         
-        success_count = 0
+        writer = ProblemBatchWriter()
         fail_count = 0
         
-        # 保存题目到数据库
+        # 批量保存题目到数据库
         for i, problem in enumerate(problems_list, 1):
             logger.info(f"处理第 {i}/{len(problems_list)} 道题目: {problem['title']}")
             
-            if self.save_problem_to_db(problem):
-                success_count += 1
-            else:
+            try:
+                writer.add(*self.parse_problem(problem))
+            except Exception as e:
+                logger.error(f"解析题目数据失败 {problem.get('titleSlug')}: {e}")
                 fail_count += 1
         
+        saved_ids = writer.close()
+        success_count = writer.success_count
+        fail_count += writer.fail_count
+        
+        # 通知统计快照等派生缓存刷新
+        if saved_ids:
+            problems_synced.send(sender=self.__class__, problem_ids=saved_ids)
+        
         result = {
             "success": True,
             "total": len(problems_list),
@@ -148,9 +140,9 @@ class SimpleLeetCodeScraper:
         logger.info(result["message"])
         return result
 
-def run_simple_scraper(limit: int = 200):
+def run_simple_scraper(limit: int = 200, cache: ResponseCache = None, offline: bool = False):
     """运行简化爬虫"""
-    scraper = SimpleLeetCodeScraper()
+    scraper = SimpleLeetCodeScraper(cache=cache, offline=offline)
     return scraper.scrape_problems(limit=limit)
 
 if __name__ == "__main__":
@@ -0,0 +1,180 @@
+# tools/http_cache.py
+"""
+GraphQL 响应的磁盘缓存
+
+- 以 (query, variables) 的哈希作为键，每个响应存为一个JSON文件
+- 超过TTL的缓存如果带有 ETag / Last-Modified，会发条件请求，304时直接复用
+- 缓存目录超过容量上限时按最近访问时间淘汰（读取命中会刷新文件mtime）
+- offline 模式只从缓存回放，不访问网络，便于离线调试和基准测试
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / '.scrape_cache'
+DEFAULT_CACHE_TTL = 3600
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class CacheMissError(Exception):
+    """离线模式下缓存中没有对应的响应"""
+
+
+class ResponseCache:
+    """线程安全的磁盘响应缓存"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl: int = DEFAULT_CACHE_TTL,
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        """
+        :param directory: 缓存目录
+        :param ttl: 缓存有效期（秒）
+        :param max_bytes: 缓存目录容量上限，超出后淘汰最久未访问的文件
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, variables: Optional[Dict]) -> str:
+        """生成缓存键（忽略query中的空白差异和variables的键顺序）"""
+        normalized = _WHITESPACE_RE.sub(' ', query).strip()
+        raw = json.dumps({'q': normalized, 'v': variables or {}}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Dict]:
+        """读取缓存条目 {'stored_at', 'etag', 'last_modified', 'body'}，不存在时返回None"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)  # 记录最近访问时间，供LRU淘汰使用
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get('stored_at', 0) < self.ttl
+
+    def set(self, key: str, body: Dict, etag: str = None, last_modified: str = None):
+        """写入缓存条目（先写临时文件再原子替换）"""
+        entry = {
+            'stored_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+        }
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def touch(self, key: str):
+        """条件请求返回304时刷新缓存时间"""
+        entry = self.get(key)
+        if entry is not None:
+            self.set(key, entry['body'], entry.get('etag'), entry.get('last_modified'))
+
+    def _files(self):
+        return list(self.directory.glob('*/*.json'))
+
+    def _scan_size(self) -> int:
+        return sum(path.stat().st_size for path in self._files())
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到容量降到上限的90%"""
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        size = sum(item[1] for item in files)
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, file_size, path in files:
+            if size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            size -= file_size
+            removed += 1
+        self._size = size
+        logger.info(f"响应缓存淘汰 {removed} 个文件，当前大小 {size / 1024 / 1024:.1f} MB")
+
+
+def post_graphql(session, url: str, query: str, variables: Optional[Dict] = None,
+                 cache: Optional[ResponseCache] = None, offline: bool = False,
+                 before_request: Optional[Callable[[], None]] = None, **kwargs) -> Dict:
+    """
+    发送GraphQL请求，优先使用响应缓存
+    :param session: requests.Session
+    :param cache: 响应缓存，为None时直接请求
+    :param offline: 只从缓存回放（忽略TTL），缓存缺失时抛出CacheMissError
+    :param before_request: 真正发出网络请求前的回调（如限流）
+    :return: 解析后的JSON响应
+    """
+    key = entry = None
+    if cache is not None:
+        key = cache.make_key(query, variables)
+        entry = cache.get(key)
+        if entry is not None and (offline or cache.is_fresh(entry)):
+            return entry['body']
+    if offline:
+        raise CacheMissError(f"离线模式缓存未命中: {variables}")
+
+    headers = {}
+    if entry is not None:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    if before_request:
+        before_request()
+    response = session.post(url, json={"query": query, "variables": variables or {}},
+                            headers=headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(key)
+        return entry['body']
+    response.raise_for_status()
+
+    data = response.json()
+    # 只缓存没有错误的响应，避免把临时失败固化下来
+    if cache is not None and 'errors' not in data:
+        cache.set(key, data, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return data
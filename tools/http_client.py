@@ -0,0 +1,146 @@
+# tools/http_client.py
+"""
+爬虫共用的HTTP客户端
+
+- 连接池大小与并发数匹配，每个请求都有连接/读取超时
+- 连接错误、超时、429和5xx自动重试：指数退避 + 随机抖动，优先遵循 Retry-After
+- 与 AdaptiveRateLimiter 配合：上游健康时逐步提速，被限流时减速
+- GraphQL 请求经过 ResponseCache（可选）
+"""
+
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.http_cache import ResponseCache, post_graphql
+from tools.rate_limiter import AdaptiveRateLimiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (5, 30)  # (连接超时, 读取超时)，单位秒
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+THROTTLE_STATUS = {429, 503}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': '*/*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Content-Type': 'application/json',
+    'Referer': 'https://leetcode.cn/problemset/all/',
+    'Origin': 'https://leetcode.cn',
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或HTTP日期），无法解析时返回None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class LeetCodeHttpClient:
+    """带超时、重试和自适应限流的HTTP客户端（线程安全）"""
+
+    def __init__(self, headers: Dict = None, pool_size: int = 10,
+                 rate_limiter: AdaptiveRateLimiter = None, timeout=DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX, cache: Optional[ResponseCache] = None,
+                 offline: bool = False):
+        """
+        :param headers: 请求头，默认使用 DEFAULT_HEADERS
+        :param pool_size: 连接池大小，应不小于并发线程数
+        :param rate_limiter: 限流器，默认不限速
+        :param timeout: 请求超时 (连接, 读取)
+        :param max_retries: 最大重试次数
+        :param backoff_base: 指数退避的基础等待时间（秒）
+        :param backoff_max: 单次退避的最长等待时间（秒）
+        :param cache: GraphQL响应缓存
+        :param offline: 只从缓存回放响应
+        """
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(0)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.offline = offline
+
+        self.request_count = 0
+        self.retry_count = 0
+        self.throttled_count = 0
+        self._stats_lock = threading.Lock()
+
+    def _backoff(self, attempt: int) -> float:
+        """指数退避 + 全量抖动"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """发送POST请求，失败时按策略重试；重试耗尽后返回最后一次响应或抛出最后一次异常"""
+        kwargs.setdefault('timeout', self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            self._count('request_count')
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"请求异常，{delay:.1f} 秒后重试 ({attempt + 1}/{self.max_retries}): {e}")
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    self.rate_limiter.on_success()
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code in THROTTLE_STATUS:
+                    self._count('throttled_count')
+                    self.rate_limiter.on_throttle(retry_after)
+                if attempt >= self.max_retries:
+                    return response
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.warning(f"HTTP {response.status_code}，{delay:.1f} 秒后重试 "
+                               f"({attempt + 1}/{self.max_retries})，当前速率 {self.rate_limiter.rate:.2f} 次/秒")
+
+            self._count('retry_count')
+            time.sleep(delay)
+
+    def post_graphql(self, url: str, query: str, variables: Dict = None) -> Dict:
+        """发送GraphQL请求（经过响应缓存）"""
+        return post_graphql(self, url, query, variables, cache=self.cache, offline=self.offline)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                'requests': self.request_count,
+                'retries': self.retry_count,
+                'throttled': self.throttled_count,
+                'rate': round(self.rate_limiter.rate, 3),
+            }
@@ -1,12 +1,15 @@
 # tools/leetcode_scraper.py
-import requests
 import json
-import time
-import random
 import logging
-from typing import List, Dict, Optional
-from django.db import transaction
-from api.models import LeetCodeProblem, ProblemTag
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
+from api.problem_writer import DEFAULT_BATCH_SIZE, ProblemBatchWriter, compute_source_hash
+from api.signals import problems_synced
+from tools.http_cache import ResponseCache
+from tools.http_client import DEFAULT_HEADERS, LeetCodeHttpClient
+from tools.rate_limiter import AdaptiveRateLimiter
+from tools.scrape_checkpoint import CheckpointTracker
+from tools.scrape_pipeline import StreamingScrapePipeline
 
 # 配置日志
 logging.basicConfig(
@@ -19,93 +22,190 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONCURRENCY = 1
+DEFAULT_RPS = 0.5  # 与原来每题随机等待1~3秒的平均速率相当
+DEFAULT_DETAIL_BATCH_SIZE = 10  # 每次GraphQL请求获取的题目详情数
+CHECKPOINT_NAME = 'leetcode'
+
+# 批量详情查询中每个题目的字段（与单题查询一致）
+QUESTION_DETAIL_FIELDS = """
+    questionId
+    questionFrontendId
+    title
+    titleSlug
+    content
+    translatedTitle
+    translatedContent
+    difficulty
+    stats
+    topicTags {
+        name
+        slug
+        translatedName
+    }
+"""
+
 class LeetCodeScraper:
     """LeetCode题目爬虫类"""
 
-    def __init__(self):
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, rps: float = DEFAULT_RPS,
+                 batch_size: int = DEFAULT_BATCH_SIZE, cache: Optional[ResponseCache] = None,
+                 offline: bool = False, detail_batch_size: int = DEFAULT_DETAIL_BATCH_SIZE,
+                 max_rps: Optional[float] = None, rate_limiter=None):
+        """
+        :param concurrency: 并发获取题目详情的线程数
+        :param rps: 所有线程共享的初始每秒请求数（<=0 表示不限速），之后按上游状况自适应调整
+        :param max_rps: 自适应提速的上限，默认为 rps 的4倍
+        :param rate_limiter: 自定义限流器（如分布式爬取时的 RedisTokenBucket），传入时忽略 rps/max_rps
+        :param batch_size: 每批写入数据库的题目数
+        :param cache: GraphQL响应缓存，为None时不使用缓存
+        :param offline: 只从缓存回放响应，不访问网络
+        :param detail_batch_size: 每次请求获取的题目详情数（1表示逐题请求）
+        """
         self.base_url = "https://leetcode.cn"
         self.graphql_url = "https://leetcode.cn/graphql"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': '*/*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Content-Type': 'application/json',
-            'Referer': 'https://leetcode.cn/problemset/all/',
-            'Origin': 'https://leetcode.cn',
-            'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"Windows"',
-            'Sec-Fetch-Dest': 'empty',
-            'Sec-Fetch-Mode': 'cors',
-            'Sec-Fetch-Site': 'same-origin',
-        })
-
-
-    def get_problems_list(self, limit: int = 200) -> List[Dict]:
-        """获取LeetCode题目列表（支持分页）"""
-        all_problems = []
-        skip = 0
-        page_size = 100  # 每页获取100道题目
-        
-        while len(all_problems) < limit:
-            current_limit = min(page_size, limit - len(all_problems))
-            
-            # 使用已验证的工作查询，添加skip参数
-            query = """
-            query getProblems($limit: Int, $skip: Int) {
-                problemsetQuestionList(limit: $limit, skip: $skip) {
-                    questions {
-                        frontendQuestionId
-                        title
-                        titleSlug
-                        difficulty
-                        acRate
-                        paidOnly
-                        status
-                        topicTags {
-                            name
-                            slug
-                            nameTranslated
-                        }
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size
+        self.detail_batch_size = max(1, detail_batch_size)
+        self.cache = cache if cache is not None or not offline else ResponseCache()
+        self.offline = offline
+        # 共用HTTP客户端：超时、退避重试、自适应限流；连接池大小与并发数匹配
+        self.client = LeetCodeHttpClient(
+            headers={
+                **DEFAULT_HEADERS,
+                'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+                'sec-ch-ua-mobile': '?0',
+                'sec-ch-ua-platform': '"Windows"',
+                'Sec-Fetch-Dest': 'empty',
+                'Sec-Fetch-Mode': 'cors',
+                'Sec-Fetch-Site': 'same-origin',
+            },
+            pool_size=max(10, self.concurrency),
+            rate_limiter=rate_limiter or AdaptiveRateLimiter(rps, max_rate=max_rps),
+            cache=self.cache,
+            offline=offline
+        )
+        self.session = self.client.session
+        self.rate_limiter = self.client.rate_limiter
+
+    def post_graphql(self, query: str, variables: Dict) -> Dict:
+        """发送GraphQL请求（经过响应缓存、限流和失败重试）"""
+        return self.client.post_graphql(self.graphql_url, query, variables)
+
+    def fetch_list_page(self, skip: int, limit: int) -> Tuple[List[Dict], Optional[int]]:
+        """
+        获取一页题目列表
+        :return: (本页题目, 题目总数)，请求失败时抛出异常
+        """
+        # 使用已验证的工作查询，添加skip参数
+        query = """
+        query getProblems($limit: Int, $skip: Int) {
+            problemsetQuestionList(limit: $limit, skip: $skip) {
+                total
+                questions {
+                    frontendQuestionId
+                    title
+                    titleSlug
+                    difficulty
+                    acRate
+                    paidOnly
+                    status
+                    topicTags {
+                        name
+                        slug
+                        nameTranslated
                     }
                 }
             }
-            """
-            
-            variables = {
-                "limit": current_limit,
-                "skip": skip
-            }
-            
+        }
+        """
+
+        logger.info(f"获取第 {skip+1}-{skip+limit} 道题目...")
+        data = self.post_graphql(query, {"limit": limit, "skip": skip})
+        if 'errors' in data:
+            raise RuntimeError(f"GraphQL错误: {data['errors']}")
+
+        question_list = data['data']['problemsetQuestionList']
+        return question_list['questions'], question_list.get('total')
+
+    def get_problems_list(self, limit: int = 200, skip: int = 0,
+                          on_page: Optional[Callable[[int, List[Dict], bool], None]] = None) -> List[Dict]:
+        """
+        获取LeetCode题目列表（支持分页）
+        先抓第一页拿到题目总数，其余页并发抓取（共享限流器），按页序回调和汇总
+        :param limit: 题目总数限制（从第0道开始计）
+        :param skip: 起始偏移，断点续跑时从上次的位置继续
+        :param on_page: 每页抓取成功后的回调 (下一页偏移, 本页新题目, 是否最后一页)
+                        本页题目按已抓到的题目去重，可能为空，是否结束以第三个参数为准
+        """
+        all_problems = []
+        seen = set()
+        page_size = 100  # 每页获取100道题目
+
+        def accept(page_skip: int, page_limit: int, problems: List[Dict]) -> bool:
+            """处理一页结果（按frontendQuestionId去重），返回是否继续"""
+            if not problems:  # 没有更多数据了
+                if on_page:
+                    on_page(page_skip, [], True)
+                return False
+
+            fresh = []
+            for problem in problems:
+                if problem['frontendQuestionId'] not in seen:
+                    seen.add(problem['frontendQuestionId'])
+                    fresh.append(problem)
+            all_problems.extend(fresh)
+            logger.info(f"本次获取 {len(fresh)} 道题目，累计 {len(all_problems)} 道")
+            # 以接口返回的原始条数判断是否到底，去重后为空的整页不代表列表结束
+            is_last = len(problems) < page_limit
+            if on_page:
+                on_page(page_skip + page_limit, fresh, is_last)
+            return not is_last
+
+        if skip >= limit:
+            return all_problems
+
+        # 第一页：获取题目总数
+        first_limit = min(page_size, limit - skip)
+        try:
+            problems, total = self.fetch_list_page(skip, first_limit)
+        except Exception as e:
+            logger.error(f"获取题目失败: {e}")
+            return all_problems
+        if not accept(skip, first_limit, problems):
+            return all_problems
+
+        end = min(limit, total) if total is not None else limit
+        pages = [
+            (page_skip, min(page_size, end - page_skip))
+            for page_skip in range(skip + first_limit, end, page_size)
+        ]
+        if not pages:
+            if total is not None and end < limit and on_page:
+                on_page(end, [], True)  # 已抓到最后一题
+            return all_problems
+
+        # 其余页并发抓取，map按提交顺序返回，保证回调和断点按页序推进
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(pages))) as executor:
+            futures = [executor.submit(self.fetch_list_page, page_skip, page_limit)
+                       for page_skip, page_limit in pages]
             try:
-                logger.info(f"获取第 {skip+1}-{skip+current_limit} 道题目...")
-                response = self.session.post(
-                    self.graphql_url,
-                    json={"query": query, "variables": variables}
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                if 'errors' in data:
-                    logger.error(f"GraphQL错误: {data['errors']}")
-                    break
-                
-                problems = data['data']['problemsetQuestionList']['questions']
-                if not problems:  # 没有更多数据了
-                    break
-                    
-                all_problems.extend(problems)
-                logger.info(f"本次获取 {len(problems)} 道题目，累计 {len(all_problems)} 道")
-                
-                skip += current_limit
-                time.sleep(1)  # 避免请求过于频繁
-                
-            except Exception as e:
-                logger.error(f"获取题目失败: {e}")
-                break
-        
-        return all_problems[:limit]  # 确保不超过限制数量
+                for (page_skip, page_limit), future in zip(pages, futures):
+                    try:
+                        problems, _ = future.result()
+                    except Exception as e:
+                        logger.error(f"获取题目失败: {e}")
+                        break
+                    if not accept(page_skip, page_limit, problems):
+                        break
+                else:
+                    if total is not None and end < limit and on_page:
+                        on_page(end, [], True)  # 已抓到最后一题
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return all_problems
 
     def get_problem_detail(self, title_slug: str) -> Optional[Dict]:
         """获取单个题目的详细信息"""
@@ -131,16 +231,7 @@ class LeetCodeScraper:
         """
 
         try:
-            response = self.session.post(
-                self.graphql_url,
-                json={
-                    "query": query,
-                    "variables": {"titleSlug": title_slug}
-                }
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            data = self.post_graphql(query, {"titleSlug": title_slug})
             if 'errors' in data:
                 logger.warning(f"获取题目详情失败 {title_slug}: {data['errors']}")
                 return None
@@ -151,6 +242,45 @@ class LeetCodeScraper:
             logger.warning(f"获取题目详情异常 {title_slug}: {e}")
             return None
 
+    def get_problem_details(self, title_slugs: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        一次请求获取多个题目的详细信息（GraphQL别名批量查询）
+        出错或缺失的题目回退为单个请求
+        :return: {titleSlug: 题目详情或None}
+        """
+        if len(title_slugs) == 1:
+            return {title_slugs[0]: self.get_problem_detail(title_slugs[0])}
+
+        params = ', '.join(f'$s{i}: String!' for i in range(len(title_slugs)))
+        selections = '\n'.join(
+            f'q{i}: question(titleSlug: $s{i}) {{{QUESTION_DETAIL_FIELDS}}}'
+            for i in range(len(title_slugs))
+        )
+        query = f"query questionDataBatch({params}) {{\n{selections}\n}}"
+        variables = {f's{i}': slug for i, slug in enumerate(title_slugs)}
+
+        results = {}
+        try:
+            data = self.post_graphql(query, variables)
+            payload = data.get('data') or {}
+            errors = data.get('errors') or []
+            failed = {error['path'][0] for error in errors if error.get('path')}
+            if errors and not failed:
+                # 无法定位到具体题目的错误，整批回退
+                logger.warning(f"批量获取题目详情失败: {errors}")
+                payload = {}
+            for i, slug in enumerate(title_slugs):
+                alias = f'q{i}'
+                if alias not in failed and payload.get(alias):
+                    results[slug] = payload[alias]
+        except Exception as e:
+            logger.warning(f"批量获取题目详情异常: {e}")
+
+        for slug in title_slugs:
+            if slug not in results:
+                results[slug] = self.get_problem_detail(slug)
+        return results
+
     def parse_stats(self, stats_str: str) -> Dict:
         """解析统计数据"""
         try:
@@ -167,97 +297,108 @@ class LeetCodeScraper:
                 'ac_rate': 0.0
             }
 
-    def save_problem_to_db(self, problem_data: Dict) -> bool:
-        """将题目数据保存到数据库"""
-        try:
-            with transaction.atomic():
-                # 解析统计数据
-                stats_info = self.parse_stats(problem_data.get('stats', '{}'))
-
-                # 准备题目数据
-                problem_dict = {
-                    'problem_id': int(problem_data['questionFrontendId']),
-                    'title': problem_data.get('translatedTitle') or problem_data['title'],
-                    'title_slug': problem_data['titleSlug'],
-                    'difficulty': problem_data['difficulty'].lower(),
-                    'is_premium': problem_data.get('paidOnly', False),
-                    'content': problem_data.get('translatedContent') or problem_data.get('content', ''),
-                    'acceptance_rate': stats_info['ac_rate'],
-                    'submission_count': stats_info['total_submission'],
-                    'accepted_count': stats_info['total_accepted'],
-                    'tags': [tag['slug'] for tag in problem_data.get('topicTags', [])]
-                }
+    def parse_problem(self, problem_data: Dict) -> Tuple[Dict, List[Tuple[str, str]]]:
+        """把题目详情转换为 (题目字段字典, [(标签slug, 标签名称), ...])"""
+        # 解析统计数据
+        stats_info = self.parse_stats(problem_data.get('stats', '{}'))
 
-                # 更新或创建题目
-                problem_obj, created = LeetCodeProblem.objects.update_or_create(
-                    problem_id=problem_dict['problem_id'],
-                    defaults=problem_dict
-                )
-
-                # 保存标签
-                for tag_data in problem_data.get('topicTags', []):
-                    tag_obj, _ = ProblemTag.objects.get_or_create(
-                        slug=tag_data['slug'],
-                        defaults={
-                            'name': tag_data.get('translatedName') or tag_data['name']
-                        }
-                    )
-
-                action = "创建" if created else "更新"
-                logger.info(f"{action}题目: {problem_obj.problem_id}. {problem_obj.title}")
-                return True
+        # 准备题目数据
+        problem_dict = {
+            'problem_id': int(problem_data['questionFrontendId']),
+            'title': problem_data.get('translatedTitle') or problem_data['title'],
+            'title_slug': problem_data['titleSlug'],
+            'difficulty': problem_data['difficulty'].lower(),
+            'is_premium': problem_data.get('paidOnly', False),
+            'content': problem_data.get('translatedContent') or problem_data.get('content', ''),
+            'acceptance_rate': stats_info['ac_rate'],
+            'submission_count': stats_info['total_submission'],
+            'accepted_count': stats_info['total_accepted'],
+            'tags': [tag['slug'] for tag in problem_data.get('topicTags', [])],
+            'source_hash': problem_data.get('sourceHash', '')
+        }
+        tags = [
+            (tag['slug'], tag.get('translatedName') or tag['name'])
+            for tag in problem_data.get('topicTags', [])
+        ]
+        return problem_dict, tags
 
+    def save_problem_to_db(self, problem_data: Dict) -> bool:
+        """将单道题目保存到数据库"""
+        try:
+            writer = ProblemBatchWriter(batch_size=1)
+            writer.add(*self.parse_problem(problem_data))
+            return bool(writer.close())
         except Exception as e:
             logger.error(f"保存题目到数据库失败: {e}")
             return False
 
-    def scrape_problems(self, limit: int = 200, delay_range: tuple = (1, 3)) -> Dict:
-        """爬取LeetCode题目并保存到数据库"""
-        logger.info(f"开始爬取LeetCode题目，目标数量: {limit}")
+    def merge_list_entry(self, detail: Dict, entry: Dict) -> Dict:
+        """把列表项中详情接口没有的字段（会员标记、指纹）合并进题目详情"""
+        detail.setdefault('paidOnly', entry.get('paidOnly', False))
+        detail['sourceHash'] = compute_source_hash(entry)
+        return detail
 
-        # 获取题目列表
-        problems_list = self.get_problems_list(limit)
-        if not problems_list:
+    def scrape_problems(self, limit: int = 200, full: bool = False, resume: bool = False) -> Dict:
+        """
+        爬取LeetCode题目并保存到数据库
+        :param full: 为False时只抓取新增或列表字段有变化的题目详情
+        :param resume: 从上次中断的断点继续（沿用断点中的limit和full）
+        """
+        checkpoint = CheckpointTracker.start(CHECKPOINT_NAME, limit, full, resume)
+        limit, full = checkpoint.limit, checkpoint.full
+        logger.info(f"开始爬取LeetCode题目，目标数量: {limit}，并发数: {self.concurrency}，"
+                    f"模式: {'全量' if full else '增量'}")
+
+        # 列表、详情、写库三个阶段流式并行
+        pipeline = StreamingScrapePipeline(self, checkpoint, full=full)
+        writer = pipeline.run()
+        checkpoint.finish()
+
+        if not pipeline.listed_count:
             logger.error("无法获取题目列表")
             return {"success": False, "message": "无法获取题目列表"}
 
-        success_count = 0
-        fail_count = 0
-
-        # 逐个获取题目详情并保存
-        for i, problem in enumerate(problems_list, 1):
-            logger.info(f"处理第 {i}/{len(problems_list)} 道题目: {problem['title']}")
+        saved_ids = writer.written_ids
+        success_count = writer.success_count
+        fail_count = pipeline.fail_count + writer.fail_count
+        unchanged_count = pipeline.unchanged_count
+        metrics = pipeline.metrics_summary()
+        metrics['http'] = self.client.stats()
+        for stage, stage_metrics in metrics.items():
+            logger.info(f"阶段 {stage}: {stage_metrics}")
 
-            # 获取详细信息
-            detail = self.get_problem_detail(problem['titleSlug'])
-            if detail:
-                if self.save_problem_to_db(detail):
-                    success_count += 1
-                else:
-                    fail_count += 1
-            else:
-                fail_count += 1
+        # 通知统计快照等派生缓存刷新
+        if saved_ids:
+            problems_synced.send(sender=self.__class__, problem_ids=saved_ids)
 
-            # 随机延迟，避免请求过于频繁
-            if i < len(problems_list):  # 最后一个不需要延迟
-                delay = random.uniform(*delay_range)
-                time.sleep(delay)
+        message = f"爬取完成！成功: {success_count}, 失败: {fail_count}, 未变化: {unchanged_count}"
+        if pipeline.error:
+            message = f"爬取中断（{pipeline.error}），已成功: {success_count}，可使用 --resume 继续"
 
         result = {
-            "success": True,
-            "total": len(problems_list),
+            "success": pipeline.error is None,
+            "total": pipeline.listed_count,
             "success_count": success_count,
             "fail_count": fail_count,
-            "message": f"爬取完成！成功: {success_count}, 失败: {fail_count}"
+            "unchanged_count": unchanged_count,
+            "metrics": metrics,
+            "message": message
         }
 
-        logger.info(result["message"])
+        if pipeline.error:
+            logger.error(result["message"])
+        else:
+            logger.info(result["message"])
         return result
 
-def run_scraper(limit: int = 200):
+def run_scraper(limit: int = 200, concurrency: int = DEFAULT_CONCURRENCY, rps: float = DEFAULT_RPS,
+                full: bool = False, resume: bool = False, cache: Optional[ResponseCache] = None,
+                offline: bool = False, detail_batch_size: int = DEFAULT_DETAIL_BATCH_SIZE,
+                max_rps: Optional[float] = None):
     """运行爬虫的便捷函数"""
-    scraper = LeetCodeScraper()
-    return scraper.scrape_problems(limit=limit)
+    scraper = LeetCodeScraper(concurrency=concurrency, rps=rps, cache=cache, offline=offline,
+                              detail_batch_size=detail_batch_size, max_rps=max_rps)
+    return scraper.scrape_problems(limit=limit, full=full, resume=resume)
 
 if __name__ == "__main__":
     # 测试运行
@@ -0,0 +1,209 @@
+# tools/rate_limiter.py
+import threading
+import time
+
+
+class TokenBucket:
+    """线程安全的令牌桶限流器，多个抓取线程共享同一个实例"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: 每秒补充的令牌数（即平均请求速率），<=0 表示不限速
+        :param capacity: 桶容量（允许的突发请求数），默认 max(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0):
+        """阻塞直到取得令牌"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    AIMD 自适应限流器
+
+    - 请求成功：速率加法增长（每次 + increase_step），不超过 max_rate
+    - 被限流（429/503）：速率乘法下降（× decrease_factor），不低于 min_rate
+    - 上游给出 Retry-After 时，所有线程暂停到指定时间
+    """
+
+    def __init__(self, rate: float, min_rate: float = 0.1, max_rate: float = None,
+                 increase_step: float = 0.05, decrease_factor: float = 0.5):
+        """
+        :param rate: 初始速率（次/秒），<=0 表示不限速（也不做自适应调整）
+        :param min_rate: 速率下限
+        :param max_rate: 速率上限，默认为初始速率的4倍
+        :param increase_step: 每次成功请求增加的速率
+        :param decrease_factor: 被限流时速率的缩减系数
+        """
+        super().__init__(rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._paused_until = 0.0
+
+    def acquire(self, tokens: float = 1.0):
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        super().acquire(tokens)
+
+    def on_success(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self.capacity = max(1.0, self.rate)
+
+    def on_throttle(self, retry_after: float = None):
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.capacity = max(1.0, self.rate)
+                self._tokens = min(self._tokens, self.capacity)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+# 令牌桶状态（令牌数、时间戳、当前速率）保存在Redis哈希中，时间取Redis服务器时间，避免各worker时钟不一致
+# 每次取得令牌时速率加法增长（不超过 max_rate）
+_REDIS_TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local max_rate = tonumber(ARGV[1])
+local max_capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local ttl_ms = tonumber(ARGV[4])
+local increase_step = tonumber(ARGV[5])
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local data = redis.call('HMGET', key, 'tokens', 'ts', 'rate')
+local rate = tonumber(data[3]) or max_rate
+local capacity = math.min(max_capacity, math.max(1, rate))
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    rate = math.min(max_rate, rate + increase_step)
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now), 'rate', tostring(rate))
+redis.call('PEXPIRE', key, ttl_ms)
+return tostring(wait)
+"""
+
+# 被限流时所有worker共享的速率乘法下降
+_REDIS_THROTTLE_SCRIPT = """
+local key = KEYS[1]
+local max_rate = tonumber(ARGV[1])
+local min_rate = tonumber(ARGV[2])
+local decrease_factor = tonumber(ARGV[3])
+local ttl_ms = tonumber(ARGV[4])
+
+local rate = tonumber(redis.call('HGET', key, 'rate')) or max_rate
+rate = math.max(min_rate, rate * decrease_factor)
+local tokens = tonumber(redis.call('HGET', key, 'tokens'))
+if tokens then
+    redis.call('HSET', key, 'tokens', tostring(math.min(tokens, math.max(1, rate))))
+end
+redis.call('HSET', key, 'rate', tostring(rate))
+redis.call('PEXPIRE', key, ttl_ms)
+return tostring(rate)
+"""
+
+STATE_TTL_MS = 60000  # 令牌桶状态的过期时间，空闲超过该时间后恢复初始速率
+
+
+class RedisTokenBucket:
+    """
+    基于Redis的全局令牌桶，多个Celery worker共享同一个速率上限
+    与 AdaptiveRateLimiter 接口一致（AIMD），速率保存在Redis中由所有worker共享：
+    - 取得令牌：速率加法增长，不超过初始速率（在取令牌的脚本中完成，不额外访问Redis）
+    - 被限流：速率乘法下降，不低于 min_rate
+    - 上游给出 Retry-After 时，通过共享的暂停键让所有worker一起等待
+    """
+
+    def __init__(self, redis_client, key: str, rate: float, capacity: float = None,
+                 min_rate: float = 0.1, increase_step: float = 0.05, decrease_factor: float = 0.5):
+        """
+        :param redis_client: redis-py 客户端
+        :param key: 令牌桶在Redis中的键
+        :param rate: 全局每秒请求数上限，<=0 表示不限速
+        :param capacity: 桶容量，默认 max(1, rate)
+        :param min_rate: 速率下限
+        :param increase_step: 每次取得令牌增加的速率
+        :param decrease_factor: 被限流时速率的缩减系数
+        """
+        self.redis = redis_client
+        self.key = key
+        self.pause_key = f'{key}:pause'
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.min_rate = min_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._script = redis_client.register_script(_REDIS_TOKEN_BUCKET_SCRIPT)
+        self._throttle_script = redis_client.register_script(_REDIS_THROTTLE_SCRIPT)
+
+    def current_rate(self) -> float:
+        """所有worker共享的当前速率"""
+        rate = self.redis.hget(self.key, 'rate')
+        return float(rate) if rate is not None else self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+        while True:
+            pause_ms = self.redis.pttl(self.pause_key)
+            if pause_ms and pause_ms > 0:
+                time.sleep(pause_ms / 1000)
+                continue
+            wait = float(self._script(
+                keys=[self.key],
+                args=[self.rate, self.capacity, tokens, STATE_TTL_MS, self.increase_step]
+            ))
+            if wait <= 0:
+                return
+            # 未取得令牌（脚本不扣减），等待后重试
+            time.sleep(wait)
+
+    def on_success(self):
+        pass  # 加法增长已在取令牌时完成
+
+    def on_throttle(self, retry_after: float = None):
+        if self.rate > 0:
+            self._throttle_script(
+                keys=[self.key],
+                args=[self.rate, self.min_rate, self.decrease_factor, STATE_TTL_MS]
+            )
+        if retry_after:
+            self.redis.set(self.pause_key, 1, px=int(retry_after * 1000), nx=True)
@@ -0,0 +1,103 @@
+# tools/scrape_checkpoint.py
+import logging
+import threading
+from typing import Dict, List
+
+from api.models import ScrapeCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointTracker:
+    """
+    爬虫断点跟踪器
+
+    - 列表阶段：每抓完一页记录下一页的偏移，并把列表项加入待处理集合
+    - 详情阶段：每批写库成功后把对应题目从待处理集合中移除
+    列表抓完且待处理集合为空时删除断点；否则保留，供 --resume 继续。
+    列表线程和写库线程会同时更新断点，所有修改都在锁内进行。
+    """
+
+    def __init__(self, checkpoint: ScrapeCheckpoint):
+        self.checkpoint = checkpoint
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start(cls, name: str, limit: int, full: bool, resume: bool = False) -> 'CheckpointTracker':
+        """开始一次爬取：resume为True且存在断点时从断点继续，否则新建断点"""
+        if resume:
+            checkpoint = ScrapeCheckpoint.objects.filter(name=name).first()
+            if checkpoint:
+                logger.info(f"从断点继续: 列表偏移 {checkpoint.list_skip}，"
+                            f"待处理 {len(checkpoint.pending)} 道题目")
+                return cls(checkpoint)
+            logger.info("没有可用的断点，重新开始爬取")
+
+        checkpoint, _ = ScrapeCheckpoint.objects.update_or_create(
+            name=name,
+            defaults={
+                'limit': limit,
+                'full': full,
+                'list_skip': 0,
+                'list_done': False,
+                'pending': [],
+            }
+        )
+        return cls(checkpoint)
+
+    @property
+    def limit(self) -> int:
+        return self.checkpoint.limit
+
+    @property
+    def full(self) -> bool:
+        return self.checkpoint.full
+
+    @property
+    def list_skip(self) -> int:
+        return self.checkpoint.list_skip
+
+    @property
+    def list_done(self) -> bool:
+        return self.checkpoint.list_done
+
+    @property
+    def pending(self) -> List[Dict]:
+        with self._lock:
+            return list(self.checkpoint.pending)
+
+    def page_done(self, next_skip: int, entries: List[Dict], is_last: bool = False):
+        """
+        列表页抓取完成
+        :param entries: 本页新题目（已去重，可能为空）
+        :param is_last: 是否已没有更多题目
+        """
+        with self._lock:
+            checkpoint = self.checkpoint
+            checkpoint.pending.extend(entries)
+            checkpoint.list_skip = next_skip
+            if is_last or next_skip >= checkpoint.limit:
+                checkpoint.list_done = True
+            checkpoint.save(update_fields=['pending', 'list_skip', 'list_done', 'updated_at'])
+
+    def completed(self, problem_ids: List[int]):
+        """题目已写入数据库（或无需更新），从待处理集合中移除"""
+        if not problem_ids:
+            return
+        done = {str(problem_id) for problem_id in problem_ids}
+        with self._lock:
+            self.checkpoint.pending = [
+                entry for entry in self.checkpoint.pending
+                if str(entry['frontendQuestionId']) not in done
+            ]
+            self.checkpoint.save(update_fields=['pending', 'updated_at'])
+
+    def finish(self) -> bool:
+        """结束本次爬取，全部完成时删除断点；返回是否全部完成"""
+        with self._lock:
+            if self.checkpoint.list_done and not self.checkpoint.pending:
+                self.checkpoint.delete()
+                return True
+        logger.warning(f"爬取未全部完成，已保存断点: 列表偏移 {self.checkpoint.list_skip}，"
+                       f"待处理 {len(self.checkpoint.pending)} 道题目，可使用 --resume 继续")
+        return False
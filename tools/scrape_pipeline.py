@@ -0,0 +1,293 @@
+# tools/scrape_pipeline.py
+"""
+流式爬取流水线
+
+    列表线程 --(detail_queue)--> 详情线程 x N --(write_queue)--> 写库（调用线程）
+
+- 详情线程每次从队列取最多 detail_batch_size 道题目，用一次批量请求获取
+
+- 列表每抓到一页就做增量过滤并送入详情队列，不必等列表全部抓完
+- 两个队列都有容量上限，下游处理不过来时上游阻塞（背压），内存占用与题目总数无关
+- 写库阶段攒批写入，同时按时间间隔刷新，保证第一批题目几秒内就能入库
+- 每个阶段记录处理数量、忙碌时间和吞吐量
+- 任一详情线程异常退出时设置停止标记，其余阶段不再阻塞在队列上，流水线尽快结束并记录错误
+  （未写入的题目仍留在断点中，可用 --resume 续跑）
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Dict, List
+
+from django.db import connection
+
+from api.problem_writer import ProblemBatchWriter, filter_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 5.0  # 写库阶段最长攒批时间（秒）
+QUEUE_POLL_INTERVAL = 0.5  # 队列阻塞时检查停止标记的间隔（秒）
+
+_STOP = object()
+
+
+class PipelineAborted(Exception):
+    """流水线已停止（其他阶段异常）"""
+
+
+class StageMetrics:
+    """单个流水线阶段的吞吐统计（线程安全）"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.monotonic()
+
+    def record(self, items: int, seconds: float):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += seconds
+
+    def as_dict(self) -> Dict:
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return {
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'elapsed_seconds': round(elapsed, 3),
+            'items_per_second': round(self.items / elapsed, 3) if elapsed > 0 else 0.0,
+        }
+
+
+class StreamingScrapePipeline:
+    """列表 -> 详情 -> 写库 的流式流水线"""
+
+    def __init__(self, scraper, checkpoint, full: bool = False,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        :param scraper: LeetCodeScraper 实例（提供列表/详情抓取与解析）
+        :param checkpoint: CheckpointTracker 断点跟踪器
+        :param full: 为False时列表阶段过滤掉未变化的题目
+        :param flush_interval: 写库阶段最长攒批时间（秒）
+        """
+        self.scraper = scraper
+        self.checkpoint = checkpoint
+        self.full = full
+        self.flush_interval = flush_interval
+        self.concurrency = scraper.concurrency
+
+        # 队列容量决定背压：详情队列只需保证工作线程不空转，写库队列约一批
+        self.detail_queue = queue.Queue(maxsize=self.concurrency * scraper.detail_batch_size * 2)
+        self.write_queue = queue.Queue(maxsize=max(scraper.batch_size, 1))
+
+        self.metrics = {
+            'list': StageMetrics('list'),
+            'detail': StageMetrics('detail'),
+            'write': StageMetrics('write'),
+        }
+        self.listed_count = 0
+        self.unchanged_count = 0
+        self.fail_count = 0
+        self.error = None  # 导致流水线中止的异常信息
+        self._count_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _abort(self, error: Exception):
+        """记录错误并通知所有阶段停止"""
+        with self._count_lock:
+            if self.error is None:
+                self.error = f'{type(error).__name__}: {error}'
+        self._stop_event.set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """放入队列（队列满时阻塞），流水线停止时放弃并返回False"""
+        while not self._stop_event.is_set():
+            try:
+                q.put(item, timeout=QUEUE_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ==================== 列表阶段 ====================
+
+    def _enqueue(self, entries: List[Dict]):
+        """增量过滤后送入详情队列（队列满时阻塞）"""
+        changed = entries if self.full else filter_changed(entries)
+        if len(changed) < len(entries):
+            changed_ids = {entry['frontendQuestionId'] for entry in changed}
+            unchanged = [int(entry['frontendQuestionId']) for entry in entries
+                         if entry['frontendQuestionId'] not in changed_ids]
+            self.checkpoint.completed(unchanged)
+            with self._count_lock:
+                self.unchanged_count += len(unchanged)
+        for entry in changed:
+            if not self._put(self.detail_queue, entry):
+                raise PipelineAborted()
+
+    def _on_page(self, next_skip: int, entries: List[Dict], is_last: bool = False):
+        # 忙碌时间按两次回调之间的间隔计算（包含请求和限流等待）
+        now = time.monotonic()
+        self.metrics['list'].record(len(entries), now - self._last_page_at)
+        self.checkpoint.page_done(next_skip, entries, is_last)
+        with self._count_lock:
+            self.listed_count += len(entries)
+        self._enqueue(entries)
+        self._last_page_at = time.monotonic()
+
+    def _list_stage(self):
+        metrics = self.metrics['list']
+        metrics.start()
+        self._last_page_at = time.monotonic()
+        try:
+            # 断点续跑：先处理上次未完成的题目
+            pending = self.checkpoint.pending
+            if pending:
+                with self._count_lock:
+                    self.listed_count += len(pending)
+                self._enqueue(pending)
+            if not self.checkpoint.list_done:
+                self.scraper.get_problems_list(
+                    self.checkpoint.limit, skip=self.checkpoint.list_skip, on_page=self._on_page
+                )
+        except PipelineAborted:
+            logger.warning("流水线已中止，停止抓取列表")
+        except Exception as e:
+            logger.error(f"列表阶段异常: {e}")
+        finally:
+            metrics.finish()
+            for _ in range(self.concurrency):
+                if not self._put(self.detail_queue, _STOP):
+                    break
+            connection.close()  # 释放本线程的数据库连接
+
+    # ==================== 详情阶段 ====================
+
+    def _next_batch(self):
+        """
+        从详情队列取一批题目：阻塞等待第一个，其余只取队列中已有的
+        :return: (题目列表, 是否收到结束标记)
+        """
+        batch = []
+        while True:
+            try:
+                item = self.detail_queue.get(timeout=QUEUE_POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    return batch, True
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.scraper.detail_batch_size:
+                return batch, False
+            try:
+                item = self.detail_queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _detail_stage(self):
+        metrics = self.metrics['detail']
+        metrics.start()
+        try:
+            stopped = False
+            while not stopped and not self._stop_event.is_set():
+                batch, stopped = self._next_batch()
+                if not batch:
+                    continue
+                started = time.monotonic()
+                details = self.scraper.get_problem_details([entry['titleSlug'] for entry in batch])
+                metrics.record(len(batch), time.monotonic() - started)
+                for entry in batch:
+                    self.write_queue.put((entry, details.get(entry['titleSlug'])))
+        except Exception as e:
+            logger.error(f"详情阶段异常: {e}")
+            self._abort(e)
+        finally:
+            metrics.finish()
+            self.write_queue.put(_STOP)  # 写库阶段在调用线程中持续消费，不会阻塞
+
+    # ==================== 写库阶段 ====================
+
+    def _record_flush(self, written: List[int], before: int, started: float):
+        """一批写库完成：更新断点和统计"""
+        self.checkpoint.completed(written)
+        self.metrics['write'].record(self._writer.success_count - before, time.monotonic() - started)
+        self._last_flush = time.monotonic()
+
+    def _add(self, entry: Dict, detail: Dict):
+        """解析题目并加入写入缓冲区，缓冲区满时写入器会自动写库"""
+        detail = self.scraper.merge_list_entry(detail, entry)
+        problem_dict, tags = self.scraper.parse_problem(detail)
+        before, started = self._writer.success_count, time.monotonic()
+        written = self._writer.add(problem_dict, tags)
+        if not len(self._writer):  # 本次加入触发了写库
+            self._record_flush(written, before, started)
+
+    def _flush(self):
+        before, started = self._writer.success_count, time.monotonic()
+        self._record_flush(self._writer.flush(), before, started)
+
+    def run(self) -> ProblemBatchWriter:
+        """
+        运行流水线直到全部阶段结束，返回写入器（含写入结果）
+        阶段异常中止时 self.error 不为None，已取到的详情仍会写库
+        """
+        self._writer = ProblemBatchWriter(batch_size=self.scraper.batch_size)
+        threads = [threading.Thread(target=self._list_stage, name='scrape-list', daemon=True)]
+        threads += [
+            threading.Thread(target=self._detail_stage, name=f'scrape-detail-{i}', daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        metrics = self.metrics['write']
+        metrics.start()
+        running = self.concurrency
+        self._last_flush = time.monotonic()
+        while running:
+            try:
+                item = self.write_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                running -= 1
+            elif item is not None:
+                entry, detail = item
+                try:
+                    if not detail:
+                        raise ValueError("未获取到题目详情")
+                    self._add(entry, detail)
+                except Exception as e:
+                    logger.error(f"处理题目失败 {entry['titleSlug']}: {e}")
+                    with self._count_lock:
+                        self.fail_count += 1
+
+            # 按时间间隔刷新，避免小批量数据长时间停留在缓冲区
+            if len(self._writer) and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+        self._flush()
+        metrics.finish()
+        for thread in threads:
+            thread.join()
+        return self._writer
+
+    def metrics_summary(self) -> Dict:
+        return {name: stage.as_dict() for name, stage in self.metrics.items()}